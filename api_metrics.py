@@ -0,0 +1,155 @@
+import math
+import re
+import threading
+import urllib.parse
+from typing import Dict, List, Optional
+
+# Constants
+HISTOGRAM_MIN = 0.0001  # seconds (0.1 ms)
+HISTOGRAM_MAX = 300.0  # seconds
+HISTOGRAM_PRECISION = 0.01  # relative bucket width (1%)
+_ID_SEGMENT = re.compile(r"^\d+$")
+PHASES = ["dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "download_ms", "decode_ms"]
+
+
+class LatencyHistogram:
+    """HDR-style log-bucketed histogram with bounded relative error
+
+    Values are counted in buckets whose width grows by HISTOGRAM_PRECISION,
+    so percentiles are accurate to ~1% using a few hundred integers no matter
+    how many samples are recorded.
+    """
+
+    def __init__(self, precision: float = HISTOGRAM_PRECISION):
+        self._log_base = math.log1p(precision)
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _index(self, value: float) -> int:
+        value = min(max(value, HISTOGRAM_MIN), HISTOGRAM_MAX)
+        return int(math.log(value / HISTOGRAM_MIN) / self._log_base)
+
+    def _value(self, index: int) -> float:
+        # Midpoint of the bucket
+        return HISTOGRAM_MIN * math.exp((index + 0.5) * self._log_base)
+
+    def record(self, value: float) -> None:
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, p: float) -> float:
+        """Return the p-th percentile (0-100), or 0 when empty"""
+        if not self.total:
+            return 0.0
+        rank = max(1, math.ceil(self.total * p / 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.total if self.total else 0.0
+
+
+class EndpointStats:
+    """Streaming aggregates for one endpoint"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+        self.last_status: Optional[int] = None
+        self.last_seen: Optional[str] = None
+        self.timed = 0
+        self.phase_totals = {phase: 0.0 for phase in PHASES}
+        self.bytes = 0
+
+    def record(self, status_code: int, response_time: float, timestamp: str, timings: Optional[Dict] = None) -> None:
+        self.count += 1
+        if not status_code or status_code >= 400:
+            self.errors += 1
+        self.latency.record(response_time)
+        self.last_status = status_code
+        self.last_seen = timestamp
+        if timings:
+            self.timed += 1
+            for phase in PHASES:
+                self.phase_totals[phase] += timings.get(phase, 0.0)
+            self.bytes += timings.get("response_size", 0)
+
+    def phase_means(self) -> Dict[str, float]:
+        """Mean milliseconds spent in each phase"""
+        return {phase: (total / self.timed if self.timed else 0.0) for phase, total in self.phase_totals.items()}
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.count if self.count else 0.0
+
+
+class ApiStats:
+    """Per-endpoint request aggregates that never need the raw log rows"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.overall = EndpointStats()
+
+    def record(self, endpoint: str, method: str, status_code: int, response_time: float, timestamp: str,
+               timings: Optional[Dict] = None) -> None:
+        key = f"{method} {normalize_endpoint(endpoint)}"
+        with self._lock:
+            if key not in self.endpoints:
+                self.endpoints[key] = EndpointStats()
+            self.endpoints[key].record(status_code, response_time, timestamp, timings)
+            self.overall.record(status_code, response_time, timestamp, timings)
+
+    def summary(self) -> List[Dict]:
+        """One row per endpoint, busiest first"""
+        with self._lock:
+            items = list(self.endpoints.items())
+        rows = [
+            {
+                "Endpoint": key,
+                "Requests": stats.count,
+                "Error Rate (%)": round(stats.error_rate * 100, 2),
+                "p50 (ms)": round(stats.latency.percentile(50) * 1000, 1),
+                "p95 (ms)": round(stats.latency.percentile(95) * 1000, 1),
+                "p99 (ms)": round(stats.latency.percentile(99) * 1000, 1),
+                "Max (ms)": round(stats.latency.max * 1000, 1),
+                "Avg Size (KB)": round(stats.bytes / stats.timed / 1024, 1) if stats.timed else 0,
+                "Last Status": stats.last_status,
+                "Last Seen": stats.last_seen,
+            }
+            for key, stats in items
+        ]
+        return sorted(rows, key=lambda row: row["Requests"], reverse=True)
+
+    def phase_summary(self) -> List[Dict]:
+        """Mean time per phase for each endpoint, for stacked breakdown charts"""
+        with self._lock:
+            items = list(self.endpoints.items())
+        return [
+            {"Endpoint": key, "Phase": phase.replace("_ms", "").upper(), "Mean (ms)": round(mean, 2)}
+            for key, stats in items
+            for phase, mean in stats.phase_means().items()
+        ]
+
+
+def normalize_endpoint(url: str) -> str:
+    """Reduce a request URL to a low-cardinality endpoint key
+
+    https://site/wp-json/wp/v2/posts/42?per_page=10 -> /wp-json/wp/v2/posts/{id}
+    """
+    path = urllib.parse.urlsplit(url).path or "/"
+    segments = ["{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/")]
+    return "/".join(segments)
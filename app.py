@@ -1,6 +1,13 @@
 import streamlit as st
 import requests
 import json
+import time
+
+import auth_provider
+import metrics
+from content_cache import credential_scope
+from delivery_queue import DeliveryQueue
+from feed_loader import DEFAULT_MAX_WORKERS, fetch_json_urls, flatten_record, stream_json
 
 st.set_page_config(page_title="WordPress CPT to n8n", layout="wide")
 
@@ -22,7 +29,7 @@ if not st.session_state.get("credentials_saved"):
         st.session_state["wp_user"] = wp_user
         st.session_state["wp_pass"] = wp_pass
         st.session_state["credentials_saved"] = True
-        st.experimental_rerun()
+        st.rerun()
 else:
     st.sidebar.success("✅ Credentials saved!")
     wp_url = st.session_state.get("wp_url", "")
@@ -42,14 +49,34 @@ refresh_token = st.sidebar.text_input("Refresh Token (Optional)", type="password
 # Sidebar - n8n Webhook
 st.sidebar.header("n8n")
 n8n_webhook = st.sidebar.text_input("n8n Webhook URL")
+webhook_secret = st.sidebar.text_input("Webhook Secret (Optional, signs payloads)", type="password")
+
+# Outbound delivery queue shared by every session of this process
+@st.cache_resource
+def get_delivery_queue():
+    queue = DeliveryQueue().start()
+    registry = metrics.get_registry()
+    registry.gauge(
+        "wp_hub_outbound_queue_items", "Outbound deliveries by status", ("status",),
+        callback=lambda: {(status,): count for status, count in queue.stats().items()
+                          if status in ("pending", "in_flight", "delivered", "dead")}
+    )
+    registry.gauge(
+        "wp_hub_outbound_queue_lag_seconds", "Age of the oldest undelivered outbound item",
+        callback=lambda: {(): queue.stats()["lag_seconds"]}
+    )
+    try:
+        metrics.start_metrics_server()
+    except OSError:
+        pass  # Another process already serves /metrics on this port
+    return queue
+
+delivery_queue = get_delivery_queue()
 
-# Function to generate bearer token
+# Function to generate bearer token; the JWT is cached until shortly before it expires
 def get_bearer_token(wp_url, username, password):
     try:
-        auth_url = f"{wp_url}/wp-json/jwt-auth/v1/token"
-        res = requests.post(auth_url, data={"username": username, "password": password})
-        res.raise_for_status()
-        return res.json().get("token")
+        return auth_provider.get_provider(wp_url, username, password, use_jwt=True).token()
     except Exception as e:
         st.error(f"Token Error: {e}")
         return None
@@ -71,20 +98,47 @@ if st.button("Generate & Send JSON"):
     st.json(cpt_json)
 
     if n8n_webhook:
-        try:
-            headers = {"Authorization": f"Bearer {oauth_token}"} if oauth_token else {}
-            r = requests.post(n8n_webhook, json=cpt_json, headers=headers)
-            r.raise_for_status()
-            st.success(f"✅ Sent to n8n! Status Code: {r.status_code}")
-            try:
-                st.json(r.json())
-            except:
-                st.text(r.text)
-        except Exception as e:
-            st.error(f"❌ n8n error: {e}")
+        # The queue stores only the auth source's name; the bearer header is built at delivery time
+        auth = None
+        if oauth_token:
+            auth = f"oauth:{credential_scope(wp_url, oauth_token, refresh_token)}"
+            delivery_queue.register_auth(
+                auth, auth_provider.get_provider(wp_url, token=oauth_token, refresh_token=refresh_token)
+            )
+        delivery_id = delivery_queue.enqueue(n8n_webhook, cpt_json, secret=webhook_secret or None, auth=auth)
+        st.session_state["last_delivery_id"] = delivery_id
+        st.success(f"📬 Queued for n8n (delivery {delivery_id[:8]}). Failed attempts are retried, "
+                   f"{delivery_queue.max_attempts} attempts in all; after that it is listed under Dead Letters.")
     else:
         st.download_button("Download .json", data=json.dumps(cpt_json, indent=2), file_name="cpt.json")
 
+# Outbound delivery status
+with st.expander("📬 Outbound Queue"):
+    last_delivery_id = st.session_state.get("last_delivery_id")
+    if last_delivery_id:
+        last_delivery = delivery_queue.get(last_delivery_id)
+        if last_delivery:
+            st.write(f"Last delivery: **{last_delivery['status']}** after {last_delivery['attempts']} attempt(s)")
+            if last_delivery["last_error"]:
+                st.caption(last_delivery["last_error"])
+
+    queue_stats = delivery_queue.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Pending", queue_stats["pending"] + queue_stats["in_flight"])
+    col2.metric("Delivered", queue_stats["delivered"])
+    col3.metric("Dead Letters", queue_stats["dead"])
+    col4.metric("Lag (s)", queue_stats["lag_seconds"])
+    st.caption(f"Throughput: {queue_stats['throughput_per_sec']} deliveries/s over the last minute")
+
+    dead_letters = delivery_queue.dead_letters()
+    if dead_letters:
+        for item in dead_letters:
+            item["created_at"] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(item["created_at"]))
+        st.dataframe(dead_letters, use_container_width=True)
+        if st.button("Retry Dead Letters"):
+            requeued = delivery_queue.retry_dead()
+            st.success(f"Requeued {requeued} deliveries")
+
 # Divider
 st.divider()
 
@@ -96,6 +150,9 @@ if st.button("Get WordPress Token"):
         if token:
             st.success("JWT Token")
             st.code(token)
+            expires_at = auth_provider.get_provider(wp_url, wp_user, wp_pass, use_jwt=True).expires_at
+            if expires_at:
+                st.caption(f"Expires {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(expires_at))}; renewed automatically before then")
         else:
             st.warning("Could not retrieve token.")
     else:
@@ -107,24 +164,67 @@ st.divider()
 # Pull .json files from DOM endpoint
 st.subheader("3. 🌐 Load .json Files from Remote Endpoint")
 json_feed_url = st.text_input("Enter Endpoint or Folder URL (must return .json or list of URLs)", placeholder="https://jsonplaceholder.typicode.com/posts")
+col1, col2 = st.columns(2)
+with col1:
+    fetch_linked = st.checkbox("Fetch linked .json files concurrently", value=True)
+with col2:
+    feed_workers = st.number_input("Parallel downloads", min_value=1, max_value=128, value=DEFAULT_MAX_WORKERS)
 
 if st.button("Fetch JSON Data"):
     try:
-        res = requests.get(json_feed_url)
-        res.raise_for_status()
-        content = res.json()
-
-        if isinstance(content, list):
-            st.write(f"🗂 Found {len(content)} items")
-            for i, item in enumerate(content, 1):
-                if isinstance(item, str) and item.endswith(".json"):
-                    st.markdown(f"{i}. 📁 [{item}]({item})")
-                elif isinstance(item, dict):
-                    with st.expander(f"Item {i}"):
-                        st.json(item)
-                else:
-                    st.write(item)
-        else:
-            st.json(content)
+        start_time = time.perf_counter()
+        # A single object streams as one item, so it is handled like a one-item list
+        feed_result = {"rows": [], "errors": [], "files": 0, "links": []}
+        for item in stream_json(json_feed_url):
+            if isinstance(item, str) and item.endswith(".json"):
+                feed_result["links"].append(item)
+            else:
+                feed_result["rows"].append(flatten_record(item))
+
+        if feed_result["links"] and fetch_linked:
+            links = feed_result["links"]
+            progress = st.progress(0.0, text=f"Fetching {len(links)} files...")
+            linked = fetch_json_urls(
+                links,
+                max_workers=int(feed_workers),
+                on_progress=lambda done, total: progress.progress(done / total, text=f"Fetched {done}/{total} files"),
+            )
+            progress.empty()
+            feed_result["rows"].extend(linked["rows"])
+            feed_result["errors"] = linked["errors"]
+            feed_result["files"] = linked["files"]
+            feed_result["links"] = []
+
+        feed_result["elapsed"] = time.perf_counter() - start_time
+        st.session_state["feed_result"] = feed_result
+        st.session_state["feed_page"] = 1
     except Exception as e:
         st.error(f"❌ Could not load JSON: {e}")
+
+# Render the last result as a paginated table rather than one expander per item
+feed_result = st.session_state.get("feed_result")
+if feed_result:
+    rows = feed_result["rows"]
+    summary = f"🗂 {len(rows)} records"
+    if feed_result["files"]:
+        summary += f" from {feed_result['files']} files"
+    st.write(f"{summary} in {feed_result['elapsed']:.2f}s")
+
+    if feed_result["errors"]:
+        with st.expander(f"⚠️ {len(feed_result['errors'])} files failed"):
+            st.dataframe(feed_result["errors"], use_container_width=True)
+
+    for i, link in enumerate(feed_result["links"], 1):
+        st.markdown(f"{i}. 📁 [{link}]({link})")
+
+    if rows:
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            page_size = st.selectbox("Rows per page", [25, 50, 100, 500], index=1)
+        page_count = max((len(rows) - 1) // page_size + 1, 1)
+        if st.session_state.get("feed_page", 1) > page_count:
+            st.session_state["feed_page"] = page_count
+        with col2:
+            page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, key="feed_page")
+        start = (page - 1) * page_size
+        st.dataframe(rows[start:start + page_size], use_container_width=True)
@@ -1,7 +1,6 @@
 import streamlit as st
 import requests
 import json
-import base64
 import time
 import uuid
 import webbrowser
@@ -12,17 +11,49 @@ import hashlib
 import hmac
 import random
 import string
+from collections import deque
+from itertools import islice
 from typing import Dict, List, Any, Optional, Tuple, Union
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
-import altair as alt
-from PIL import Image
 from io import BytesIO
 
+from signing import SIGNATURE_HEADER, calculate_hash
+from delivery_queue import DEFAULT_MAX_ATTEMPTS, DEFAULT_RETRY_INTERVAL
+from content_cache import ContentCache, all_site_caches, credential_scope, get_content_cache
+from api_metrics import ApiStats
+import wp_http
+import tracing
+from tracing import traced
+import metrics
+import profiling
+from profiling import profiled
+from webhook_receiver import WebhookReceiver, public_url as webhook_public_url
+from view_cache import ViewCache
+from data_grid import ListSource, RestSource, VirtualGrid, SORT_KEYS
+from synthetic_data import SyntheticSite
+from async_client import SyncWordPressClient
+import sites
+from sites import SiteRegistry, DEFAULT_SYNC_INTERVAL
+from lazy_imports import lazy_module, lazy_callable
+import static_assets
+import auth_provider
+import resilience
+import exporter
+import bulk_writer
+from media_index import MediaIndex, site_directory
+from media_mirror import MediaMirror, MIRROR_WORKERS
+import media_mirror
+
+# Heavy dependencies are imported by the first view that touches them, so the
+# login sidebar paints without loading pandas, plotly, altair or PIL
+pd = lazy_module("pandas")
+np = lazy_module("numpy")
+px = lazy_module("plotly.express")
+go = lazy_module("plotly.graph_objects")
+make_subplots = lazy_callable("plotly.subplots", "make_subplots")
+alt = lazy_module("altair")
+Image = lazy_module("PIL.Image")
+
 # Set page config
 st.set_page_config(
     page_title="Enterprise WordPress Integration Hub",
@@ -31,9 +62,68 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Load custom CSS
-with open("styles/main.css") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+# Load custom CSS (read, minified and fingerprinted once per process)
+stylesheet = static_assets.stylesheet_tag(
+    "styles/main.css",
+    static_serving=st.get_option("server.enableStaticServing")
+)
+if stylesheet:
+    st.markdown(stylesheet, unsafe_allow_html=True)
+
+# Constants
+MAX_API_LOGS = 1000  # raw rows kept in the ring buffer; aggregates cover every request
+MAX_RECENT_ITEMS = 10
+MAX_TRACES = 20  # reruns kept for the trace waterfall
+SESSION_METRICS_INTERVAL = 30  # seconds between per-session memory estimates
+SESSION_SIZE_LIMIT = 200_000  # objects visited per session-state estimate; larger states are undercounted
+INTEGRATION_PLATFORMS = ["n8n", "Zapier", "Make (Integromat)", "Pipedream", "Power Automate", "Custom Webhook"]
+SYNC_INTERVALS = [5, 15, 30, 60, 120, 360, 720, 1440]  # minutes
+STAT_CARD_HTML = """
+<div class="stat-card">
+    <div class="stat-title">{title}</div>
+    <div class="stat-value">{value}</div>
+    <div class="stat-description">{description}</div>
+</div>
+"""
+ACTION_CARD_HTML = """
+<div class="action-card">
+    <div class="action-title">{title}</div>
+    <div class="action-description">{description}</div>
+    <button class="action-button" onclick="parent.window.location.href='#'">{label}</button>
+</div>
+"""
+ACTION_CARD_HEADER_HTML = """
+<div class="action-card">
+    <div class="action-title">{title}</div>
+    <div class="action-description">{description}</div>
+</div>
+"""
+VIRTUAL_GRID_THRESHOLD = 1000  # rows above which the explorer defaults to the windowed grid
+GRID_WINDOW_SIZES = [25, 50, 100, 250]
+WP_POST_STATUSES = ["publish", "future", "draft", "pending", "private"]
+DEMO_SIZES = [10, 100, 1000, 10000]  # posts per content type in Quick Demo
+DEMO_SEED = 42
+SITE_STATE_DEFAULTS = {  # per-site session state, saved and restored when switching sites
+    "site_info": dict,
+    "user_info": dict,
+    "custom_post_types": list,
+    "taxonomies": list,
+    "cpt_stats": dict,
+    "cpt_data": dict,
+    "cpt_cache_versions": dict,
+    "taxonomy_stats": dict,
+    "taxonomy_data": dict,
+    "media_data": dict,
+    "selected_cpt": lambda: None,
+    "selected_taxonomy": lambda: None,
+    "last_refresh": lambda: None,
+    "virtual_grids": dict,
+}
+MAX_DOWNLOAD_BYTES = 200 * 1024 * 1024  # larger exports are only saved to EXPORT_DIR
+EXPORT_SOURCES = ["WordPress", "Local cache"]
+MEDIA_BROWSER_PAGE_SIZE = 48
+MEDIA_BROWSER_COLUMNS = 6
+DEFAULT_TEMPLATE_TYPES = ["Content Sync", "E-commerce", "Membership", "Events", "Newsletter", "CRM"]
 
 # Initialize session state variables
 if "authenticated" not in st.session_state:
@@ -66,6 +156,8 @@ if "auth_callback_received" not in st.session_state:
     st.session_state.auth_callback_received = False
 if "cpt_data" not in st.session_state:
     st.session_state.cpt_data = {}
+if "cpt_cache_versions" not in st.session_state:
+    st.session_state.cpt_cache_versions = {}
 if "taxonomy_data" not in st.session_state:
     st.session_state.taxonomy_data = {}
 if "media_data" not in st.session_state:
@@ -80,8 +172,18 @@ if "error_message" not in st.session_state:
     st.session_state.error_message = None
 if "success_message" not in st.session_state:
     st.session_state.success_message = None
+if "rerun_app" not in st.session_state:
+    st.session_state.rerun_app = False  # set by callbacks inside fragments whose results show outside them
 if "site_info" not in st.session_state:
     st.session_state.site_info = {}
+if "deferred" not in st.session_state:
+    st.session_state.deferred = {}  # name -> (future, apply) for optional background calls
+if "last_export" not in st.session_state:
+    st.session_state.last_export = None
+if "last_mirror" not in st.session_state:
+    st.session_state.last_mirror = None
+if "bulk_results" not in st.session_state:
+    st.session_state.bulk_results = {}  # post type -> last BulkResult
 if "user_info" not in st.session_state:
     st.session_state.user_info = {}
 if "dark_mode" not in st.session_state:
@@ -98,7 +200,9 @@ if "sync_settings" not in st.session_state:
         "sync_targets": []
     }
 if "api_logs" not in st.session_state:
-    st.session_state.api_logs = []
+    st.session_state.api_logs = deque(maxlen=MAX_API_LOGS)
+if "api_stats" not in st.session_state:
+    st.session_state.api_stats = ApiStats()
 if "favorites" not in st.session_state:
     st.session_state.favorites = []
 if "recent_items" not in st.session_state:
@@ -107,20 +211,118 @@ if "custom_templates" not in st.session_state:
     st.session_state.custom_templates = []
 if "active_tab" not in st.session_state:
     st.session_state.active_tab = "dashboard"
+if "trace_ids" not in st.session_state:
+    st.session_state.trace_ids = deque(maxlen=MAX_TRACES)
+if "profile_reruns" not in st.session_state:
+    st.session_state.profile_reruns = profiling.PROFILE_FROM_ENV
+if "profile_history" not in st.session_state:
+    st.session_state.profile_history = profiling.new_history()
+if "state_versions" not in st.session_state:
+    st.session_state.state_versions = {"cpt_stats": 0, "api_logs": 0}
+if "view_cache" not in st.session_state:
+    st.session_state.view_cache = ViewCache("dashboard_views")
+if "site_states" not in st.session_state:
+    st.session_state.site_states = {}  # wordpress_url -> SITE_STATE_DEFAULTS keys, kept across site switches
+if "site_credentials" not in st.session_state:
+    st.session_state.site_credentials = {}  # wordpress_url -> (username, password, auth_token) this session logged in with
 
-# Constants
-MAX_API_LOGS = 100
-MAX_RECENT_ITEMS = 10
-INTEGRATION_PLATFORMS = ["n8n", "Zapier", "Make (Integromat)", "Pipedream", "Power Automate", "Custom Webhook"]
-SYNC_INTERVALS = [5, 15, 30, 60, 120, 360, 720, 1440]  # minutes
-DEFAULT_TEMPLATE_TYPES = ["Content Sync", "E-commerce", "Membership", "Events", "Newsletter", "CRM"]
+# Every rerun is recorded as one trace
+st.session_state.trace_ids.append(tracing.new_trace("rerun"))
+
+# And, in profiling mode, as one cProfile/tracemalloc profile
+profiling.begin_rerun(
+    st.session_state.profile_history,
+    st.session_state.trace_ids[-1][:8],
+    st.session_state.profile_reruns
+)
+
+# Shared Resources
+@st.cache_resource
+def get_webhook_receiver() -> Optional[WebhookReceiver]:
+    """Start the embedded receiver for WordPress save_post webhooks (one per process)"""
+    try:
+        return WebhookReceiver(get_content_cache()).start()
+    except OSError:
+        return None  # Port already in use, e.g. by another Streamlit process
+
+get_webhook_receiver()
+
+@st.cache_resource
+def get_metrics_server():
+    """Serve Prometheus metrics on /metrics beside Streamlit (one per process)"""
+    def cached_posts() -> Dict[tuple, int]:
+        counts: Dict[tuple, int] = {}
+        for site, _, content_cache in all_site_caches():  # summed over credential scopes
+            for post_type in content_cache.versions():
+                key = (site, post_type)
+                counts[key] = counts.get(key, 0) + len(content_cache.get_posts(post_type))
+        return counts
+    
+    metrics.get_registry().gauge(
+        "wp_hub_content_cache_posts", "Posts held in the per-site content caches", ("site", "post_type"),
+        callback=cached_posts
+    )
+    try:
+        return metrics.start_metrics_server()
+    except OSError:
+        return None  # Port already in use, e.g. by another Streamlit process
+
+get_metrics_server()
+
+@st.cache_resource
+def get_site_registry() -> SiteRegistry:
+    """Registered WordPress sites with their pooled clients and caches (one registry per process)"""
+    return sites.get_registry()
+
+@st.cache_resource
+def get_media_index(url: str, scope: str) -> MediaIndex:
+    """Media index and thumbnail cache for a site and credential scope, loaded from disk if it was built before
+
+    Indexes crawled with credentials list private and draft attachments, so
+    each scope gets its own, as with the content cache.
+    """
+    return MediaIndex(url, site_directory(url, scope=scope))
+
+@st.cache_resource
+def get_async_client(url: str) -> SyncWordPressClient:
+    """Pooled async client for fanning out reads to one site (one per site per process)"""
+    return SyncWordPressClient(url)
+
+def record_session_metrics() -> None:
+    """Update per-session gauges (sync lag, state size) at most every SESSION_METRICS_INTERVAL seconds"""
+    now = time.time()
+    if now - st.session_state.get("metrics_updated_at", 0) < SESSION_METRICS_INTERVAL:
+        return
+    st.session_state.metrics_updated_at = now
+    
+    if st.session_state.last_refresh:
+        last_refresh = datetime.strptime(st.session_state.last_refresh, "%Y-%m-%d %H:%M:%S")
+        metrics.SYNC_LAG.set((datetime.now() - last_refresh).total_seconds(), site=st.session_state.wordpress_url)
+    
+    # Walking the state can take a while, so it runs off the script thread on a bounded sample
+    values = [st.session_state[key] for key in list(st.session_state.keys())]
+    resilience.defer(record_state_size, values, st.session_state.auth_state[:8])
+
+def record_state_size(values: List[Any], session: str) -> None:
+    """Set the session memory gauge from an estimate of ``values`` (runs in the background)"""
+    try:
+        size = metrics.estimate_size(values, limit=SESSION_SIZE_LIMIT)
+    except RuntimeError:  # the session changed a container mid-walk; the next interval tries again
+        return
+    metrics.SESSION_MEMORY.set(size, session=session)
+
+record_session_metrics()
 
 # Utility Functions
 def generate_api_key() -> str:
     """Generate a random API key"""
     return ''.join(random.choices(string.ascii_letters + string.digits, k=32))
 
-def log_api_request(endpoint: str, method: str, status_code: int, response_time: float) -> None:
+def bump_state_version(name: str) -> None:
+    """Mark a piece of session state as changed so views derived from it are rebuilt"""
+    st.session_state.state_versions[name] = st.session_state.state_versions.get(name, 0) + 1
+
+def log_api_request(endpoint: str, method: str, status_code: int, response_time: float, timings: Dict = None) -> None:
     """Log API request to session state"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     log_entry = {
@@ -131,10 +333,77 @@ def log_api_request(endpoint: str, method: str, status_code: int, response_time:
         "response_time": response_time
     }
     
-    # Add to beginning of list and maintain max size
-    st.session_state.api_logs.insert(0, log_entry)
-    if len(st.session_state.api_logs) > MAX_API_LOGS:
-        st.session_state.api_logs = st.session_state.api_logs[:MAX_API_LOGS]
+    # Phase breakdown (dns/connect/tls/ttfb/download/decode) and response size
+    if timings:
+        log_entry.update(timings)
+    
+    # Newest first; the deque drops the oldest entry once MAX_API_LOGS is reached
+    st.session_state.api_logs.appendleft(log_entry)
+    st.session_state.api_stats.record(endpoint, method, status_code, response_time, timestamp, timings)
+    bump_state_version("api_logs")
+
+def wordpress_get(url: str, headers: Dict, timeout: int = 15) -> requests.Response:
+    """GET a WordPress REST URL and log it with its phase timings
+    
+    The decoded JSON body is available as ``response.data``.
+    """
+    with tracing.span("http.get", url=url) as span:
+        response = wp_http.get(url, headers=headers, timeout=timeout)
+        if span:
+            span.set_attribute("http.status_code", response.status_code)
+            for phase, value in response.timings.items():
+                span.set_attribute(f"http.{phase}", value)
+    log_api_request(url, "GET", response.status_code, response.timings["total_ms"] / 1000, response.timings)
+    return response
+
+def auth_headers(url: str) -> Dict[str, str]:
+    """Authorization header for the connected site: the session's token if any, otherwise basic auth
+    
+    Headers (and any token exchange) are cached by the shared credential provider.
+    """
+    return auth_provider.get_provider(
+        url,
+        st.session_state.username,
+        st.session_state.password,
+        token=st.session_state.auth_token
+    ).headers()
+
+def session_content_cache() -> ContentCache:
+    """The connected site's shared content cache for this session's credentials"""
+    return get_content_cache(
+        st.session_state.wordpress_url,
+        credential_scope(st.session_state.username, st.session_state.password, st.session_state.auth_token)
+    )
+
+def session_media_index(url: str) -> MediaIndex:
+    """The site's media index for this session's credentials"""
+    return get_media_index(
+        url,
+        credential_scope(st.session_state.username, st.session_state.password, st.session_state.auth_token)
+    )
+
+def defer_request(name: str, url: str, headers: Dict, apply) -> None:
+    """GET an optional URL in the background; ``apply(data)`` runs on a later rerun once it succeeds"""
+    future = resilience.defer(wp_http.get, url, headers=headers, timeout=10)
+    st.session_state.deferred[name] = (future, apply)
+
+def resolve_deferred() -> None:
+    """Apply finished background requests; unfinished ones are checked again next rerun"""
+    for name, (future, apply) in list(st.session_state.deferred.items()):
+        if not future.done():
+            continue
+        del st.session_state.deferred[name]
+        try:
+            response = future.result()
+        except Exception:
+            continue  # Ignore errors for optional data
+        log_api_request(response.url, "GET", response.status_code, response.timings["total_ms"] / 1000, response.timings)
+        if response.status_code == 200 and isinstance(response.data, dict):
+            apply(response.data)
+
+def apply_site_logo(settings: Dict) -> None:
+    if "site_logo" in settings:
+        st.session_state.site_info["site_logo"] = settings["site_logo"]
 
 def add_to_recent_items(item_type: str, item_id: str, item_name: str) -> None:
     """Add item to recent items list"""
@@ -188,14 +457,6 @@ def get_content_preview(content: Any) -> str:
     
     return ""
 
-def calculate_hash(data: str, secret: str) -> str:
-    """Calculate HMAC hash for webhook security"""
-    return hmac.new(
-        secret.encode('utf-8'),
-        data.encode('utf-8'),
-        hashlib.sha256
-    ).hexdigest()
-
 # Authentication Functions
 def generate_wordpress_auth_url(site_url: str) -> str:
     """
@@ -238,30 +499,23 @@ def handle_auth_callback() -> None:
     # Fetch custom post types and taxonomies
     fetch_wordpress_data()
 
+@traced()
 def authenticate_with_credentials(url: str, username: str, password: str) -> bool:
     """Authenticate with WordPress REST API using username and password"""
-    start_time = time.time()
     try:
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
             
         auth_url = f"{url}/wp-json/wp/v2/users/me"
-        credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
-        headers = {
-            "Authorization": f"Basic {credentials}"
-        }
-        response = requests.get(auth_url, headers=headers, timeout=10)
-        
-        # Log the API request
-        response_time = time.time() - start_time
-        log_api_request(auth_url, "GET", response.status_code, response_time)
+        headers = auth_provider.get_provider(url, username, password).headers()
+        response = wordpress_get(auth_url, headers, timeout=10)
         
         if response.status_code == 200:
             st.session_state.authenticated = True
             st.session_state.wordpress_url = url
             st.session_state.username = username
             st.session_state.password = password
-            st.session_state.user_info = response.json()
+            st.session_state.user_info = response.data
             st.session_state.success_message = "Authentication successful! You can now access your WordPress site data."
             
             # Fetch site information
@@ -278,9 +532,9 @@ def authenticate_with_credentials(url: str, username: str, password: str) -> boo
         st.session_state.error_message = f"Error connecting to WordPress: {str(e)}"
         return False
 
+@traced()
 def fetch_site_info() -> None:
     """Fetch WordPress site information"""
-    start_time = time.time()
     try:
         url = st.session_state.wordpress_url
         if not url.startswith(('http://', 'https://')):
@@ -288,22 +542,12 @@ def fetch_site_info() -> None:
             
         site_url = f"{url}/wp-json"
         
-        # Use token if available, otherwise use basic auth
-        headers = {}
-        if st.session_state.auth_token:
-            headers["Authorization"] = f"Bearer {st.session_state.auth_token}"
-        elif st.session_state.username and st.session_state.password:
-            credentials = base64.b64encode(f"{st.session_state.username}:{st.session_state.password}".encode()).decode()
-            headers["Authorization"] = f"Basic {credentials}"
-        
-        response = requests.get(site_url, headers=headers, timeout=10)
+        headers = auth_headers(url)
         
-        # Log the API request
-        response_time = time.time() - start_time
-        log_api_request(site_url, "GET", response.status_code, response_time)
+        response = wordpress_get(site_url, headers, timeout=10)
         
         if response.status_code == 200:
-            site_data = response.json()
+            site_data = response.data
             st.session_state.site_info = {
                 "name": site_data.get("name", "WordPress Site"),
                 "description": site_data.get("description", ""),
@@ -311,26 +555,19 @@ def fetch_site_info() -> None:
                 "home": site_data.get("home", url),
                 "gmt_offset": site_data.get("gmt_offset", 0),
                 "timezone": site_data.get("timezone_string", "UTC"),
-                "site_logo": None,  # Would need additional API call
+                "site_logo": None,  # Filled in by the deferred settings call
                 "api_version": "v2"  # Default to v2
             }
             
-            # Try to get site icon if available
-            try:
-                icon_url = f"{url}/wp-json/wp/v2/settings"
-                icon_response = requests.get(icon_url, headers=headers, timeout=10)
-                if icon_response.status_code == 200:
-                    settings = icon_response.json()
-                    if "site_logo" in settings:
-                        st.session_state.site_info["site_logo"] = settings["site_logo"]
-            except:
-                pass  # Ignore errors for optional data
+            # The logo is optional, so /wp/v2/settings (often slow) runs in the background
+            defer_request("site_logo", f"{url}/wp-json/wp/v2/settings", headers, apply_site_logo)
         else:
             st.session_state.error_message = f"Could not retrieve site information: {response.status_code} - {response.text}"
     except Exception as e:
         st.session_state.error_message = f"Error getting site information: {str(e)}"
 
 # Data Fetching Functions
+@traced()
 def fetch_wordpress_data() -> None:
     """Fetch all WordPress data (post types, taxonomies, etc.)"""
     fetch_custom_post_types()
@@ -340,9 +577,9 @@ def fetch_wordpress_data() -> None:
     # Update last refresh timestamp
     st.session_state.last_refresh = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+@traced()
 def fetch_custom_post_types() -> None:
     """Fetch custom post types from WordPress"""
-    start_time = time.time()
     try:
         url = st.session_state.wordpress_url
         if not url.startswith(('http://', 'https://')):
@@ -350,22 +587,12 @@ def fetch_custom_post_types() -> None:
             
         types_url = f"{url}/wp-json/wp/v2/types"
         
-        # Use token if available, otherwise use basic auth
-        headers = {}
-        if st.session_state.auth_token:
-            headers["Authorization"] = f"Bearer {st.session_state.auth_token}"
-        elif st.session_state.username and st.session_state.password:
-            credentials = base64.b64encode(f"{st.session_state.username}:{st.session_state.password}".encode()).decode()
-            headers["Authorization"] = f"Basic {credentials}"
-        
-        response = requests.get(types_url, headers=headers, timeout=10)
+        headers = auth_headers(url)
         
-        # Log the API request
-        response_time = time.time() - start_time
-        log_api_request(types_url, "GET", response.status_code, response_time)
+        response = wordpress_get(types_url, headers, timeout=10)
         
         if response.status_code == 200:
-            types_data = response.json()
+            types_data = response.data
             # Filter out built-in post types
             custom_types = [
                 post_type for post_type, data in types_data.items() 
@@ -396,14 +623,15 @@ def fetch_custom_post_types() -> None:
                         "supports": types_data[cpt].get("supports", {}),
                         "viewable": types_data[cpt].get("viewable", True)
                     })
+            bump_state_version("cpt_stats")
         else:
             st.session_state.error_message = f"Could not retrieve post types: {response.status_code} - {response.text}"
     except Exception as e:
         st.session_state.error_message = f"Error getting custom post types: {str(e)}"
 
+@traced()
 def fetch_taxonomies() -> None:
     """Fetch taxonomies from WordPress"""
-    start_time = time.time()
     try:
         url = st.session_state.wordpress_url
         if not url.startswith(('http://', 'https://')):
@@ -411,22 +639,12 @@ def fetch_taxonomies() -> None:
             
         taxonomies_url = f"{url}/wp-json/wp/v2/taxonomies"
         
-        # Use token if available, otherwise use basic auth
-        headers = {}
-        if st.session_state.auth_token:
-            headers["Authorization"] = f"Bearer {st.session_state.auth_token}"
-        elif st.session_state.username and st.session_state.password:
-            credentials = base64.b64encode(f"{st.session_state.username}:{st.session_state.password}".encode()).decode()
-            headers["Authorization"] = f"Basic {credentials}"
+        headers = auth_headers(url)
         
-        response = requests.get(taxonomies_url, headers=headers, timeout=10)
-        
-        # Log the API request
-        response_time = time.time() - start_time
-        log_api_request(taxonomies_url, "GET", response.status_code, response_time)
+        response = wordpress_get(taxonomies_url, headers, timeout=10)
         
         if response.status_code == 200:
-            taxonomies_data = response.json()
+            taxonomies_data = response.data
             # Get all taxonomies
             taxonomies = list(taxonomies_data.keys())
             st.session_state.taxonomies = taxonomies
@@ -457,9 +675,9 @@ def fetch_taxonomies() -> None:
     except Exception as e:
         st.session_state.error_message = f"Error getting taxonomies: {str(e)}"
 
+@traced()
 def fetch_media_library_stats() -> None:
     """Fetch media library statistics"""
-    start_time = time.time()
     try:
         url = st.session_state.wordpress_url
         if not url.startswith(('http://', 'https://')):
@@ -467,19 +685,9 @@ def fetch_media_library_stats() -> None:
             
         media_url = f"{url}/wp-json/wp/v2/media?per_page=1"
         
-        # Use token if available, otherwise use basic auth
-        headers = {}
-        if st.session_state.auth_token:
-            headers["Authorization"] = f"Bearer {st.session_state.auth_token}"
-        elif st.session_state.username and st.session_state.password:
-            credentials = base64.b64encode(f"{st.session_state.username}:{st.session_state.password}".encode()).decode()
-            headers["Authorization"] = f"Basic {credentials}"
-        
-        response = requests.get(media_url, headers=headers, timeout=10)
+        headers = auth_headers(url)
         
-        # Log the API request
-        response_time = time.time() - start_time
-        log_api_request(media_url, "GET", response.status_code, response_time)
+        response = wordpress_get(media_url, headers, timeout=10)
         
         if response.status_code == 200:
             # Get total count from headers
@@ -495,9 +703,9 @@ def fetch_media_library_stats() -> None:
     except Exception as e:
         st.session_state.error_message = f"Error getting media stats: {str(e)}"
 
+@traced()
 def get_cpt_posts(post_type: str, params: Dict = None) -> List[Dict]:
     """Get posts of a specific custom post type with optional filtering"""
-    start_time = time.time()
     try:
         url = st.session_state.wordpress_url
         if not url.startswith(('http://', 'https://')):
@@ -514,22 +722,12 @@ def get_cpt_posts(post_type: str, params: Dict = None) -> List[Dict]:
         else:
             posts_url = f"{base_url}?per_page=100"
         
-        # Use token if available, otherwise use basic auth
-        headers = {}
-        if st.session_state.auth_token:
-            headers["Authorization"] = f"Bearer {st.session_state.auth_token}"
-        elif st.session_state.username and st.session_state.password:
-            credentials = base64.b64encode(f"{st.session_state.username}:{st.session_state.password}".encode()).decode()
-            headers["Authorization"] = f"Basic {credentials}"
+        headers = auth_headers(url)
         
-        response = requests.get(posts_url, headers=headers, timeout=15)
-        
-        # Log the API request
-        response_time = time.time() - start_time
-        log_api_request(posts_url, "GET", response.status_code, response_time)
+        response = wordpress_get(posts_url, headers, timeout=15)
         
         if response.status_code == 200:
-            posts = response.json()
+            posts = response.data
             
             # Get total count from headers
             total_posts = int(response.headers.get('X-WP-Total', len(posts)))
@@ -539,10 +737,16 @@ def get_cpt_posts(post_type: str, params: Dict = None) -> List[Dict]:
                 "count": total_posts,
                 "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             })
+            bump_state_version("cpt_stats")
             
             # Add to recent items
             add_to_recent_items("cpt", post_type, st.session_state.cpt_stats[post_type]["name"])
             
+            # Share with the process-wide cache that webhook events update
+            content_cache = session_content_cache()
+            content_cache.merge(post_type, posts)
+            st.session_state.cpt_cache_versions[post_type] = content_cache.version(post_type)
+            
             return posts
         else:
             st.session_state.error_message = f"Could not retrieve posts: {response.status_code} - {response.text}"
@@ -551,9 +755,9 @@ def get_cpt_posts(post_type: str, params: Dict = None) -> List[Dict]:
         st.session_state.error_message = f"Error getting posts: {str(e)}"
         return []
 
+@traced()
 def get_taxonomy_terms(taxonomy: str, params: Dict = None) -> List[Dict]:
     """Get terms of a specific taxonomy with optional filtering"""
-    start_time = time.time()
     try:
         url = st.session_state.wordpress_url
         if not url.startswith(('http://', 'https://')):
@@ -570,22 +774,12 @@ def get_taxonomy_terms(taxonomy: str, params: Dict = None) -> List[Dict]:
         else:
             terms_url = f"{base_url}?per_page=100"
         
-        # Use token if available, otherwise use basic auth
-        headers = {}
-        if st.session_state.auth_token:
-            headers["Authorization"] = f"Bearer {st.session_state.auth_token}"
-        elif st.session_state.username and st.session_state.password:
-            credentials = base64.b64encode(f"{st.session_state.username}:{st.session_state.password}".encode()).decode()
-            headers["Authorization"] = f"Basic {credentials}"
-        
-        response = requests.get(terms_url, headers=headers, timeout=15)
+        headers = auth_headers(url)
         
-        # Log the API request
-        response_time = time.time() - start_time
-        log_api_request(terms_url, "GET", response.status_code, response_time)
+        response = wordpress_get(terms_url, headers, timeout=15)
         
         if response.status_code == 200:
-            terms = response.json()
+            terms = response.data
             
             # Get total count from headers
             total_terms = int(response.headers.get('X-WP-Total', len(terms)))
@@ -607,9 +801,9 @@ def get_taxonomy_terms(taxonomy: str, params: Dict = None) -> List[Dict]:
         st.session_state.error_message = f"Error getting terms: {str(e)}"
         return []
 
+@traced()
 def get_media_items(params: Dict = None) -> List[Dict]:
     """Get media items with optional filtering"""
-    start_time = time.time()
     try:
         url = st.session_state.wordpress_url
         if not url.startswith(('http://', 'https://')):
@@ -623,22 +817,12 @@ def get_media_items(params: Dict = None) -> List[Dict]:
         else:
             media_url = f"{base_url}?per_page=20"  # Default to smaller page size for media
         
-        # Use token if available, otherwise use basic auth
-        headers = {}
-        if st.session_state.auth_token:
-            headers["Authorization"] = f"Bearer {st.session_state.auth_token}"
-        elif st.session_state.username and st.session_state.password:
-            credentials = base64.b64encode(f"{st.session_state.username}:{st.session_state.password}".encode()).decode()
-            headers["Authorization"] = f"Basic {credentials}"
+        headers = auth_headers(url)
         
-        response = requests.get(media_url, headers=headers, timeout=15)
-        
-        # Log the API request
-        response_time = time.time() - start_time
-        log_api_request(media_url, "GET", response.status_code, response_time)
+        response = wordpress_get(media_url, headers, timeout=15)
         
         if response.status_code == 200:
-            media_items = response.json()
+            media_items = response.data
             
             # Get total count from headers
             total_media = int(response.headers.get('X-WP-Total', len(media_items)))
@@ -658,6 +842,7 @@ def get_media_items(params: Dict = None) -> List[Dict]:
         return []
 
 # Integration Generation Functions
+@traced()
 def convert_to_n8n_node(post_type: str, posts: List[Dict]) -> Dict:
     """Convert WordPress custom post type to n8n node format"""
     if not posts:
@@ -855,6 +1040,7 @@ def convert_to_n8n_node(post_type: str, posts: List[Dict]) -> Dict:
     
     return node
 
+@traced()
 def generate_n8n_workflow(post_type: str, node_definition: Dict) -> Dict:
     """Generate a complete n8n workflow for a custom post type"""
     # Get post type info
@@ -951,7 +1137,7 @@ def generate_n8n_workflow(post_type: str, node_definition: Dict) -> Dict:
                     ]
                 ]
             },
-            [f"WordPress {post_type_name}"]: {
+            f"WordPress {post_type_name}": {
                 "main": [
                     [
                         {
@@ -965,11 +1151,11 @@ def generate_n8n_workflow(post_type: str, node_definition: Dict) -> Dict:
         },
         "settings": {
             "executionOrder": "v1",
-            "saveManualExecutions": true,
+            "saveManualExecutions": True,
             "callerPolicy": "any",
             "errorWorkflow": ""
         },
-        "staticData": null,
+        "staticData": None,
         "tags": [
             "WordPress",
             "Integration",
@@ -984,6 +1170,7 @@ def generate_n8n_workflow(post_type: str, node_definition: Dict) -> Dict:
     
     return workflow
 
+@traced()
 def generate_zapier_integration(post_type: str, posts: List[Dict]) -> Dict:
     """Generate Zapier integration for a custom post type"""
     if not posts:
@@ -1181,6 +1368,7 @@ def generate_zapier_integration(post_type: str, posts: List[Dict]) -> Dict:
     
     return integration
 
+@traced()
 def generate_make_scenario(post_type: str, posts: List[Dict]) -> Dict:
     """Generate Make (Integromat) scenario for a custom post type"""
     if not posts:
@@ -1307,14 +1495,26 @@ def generate_make_scenario(post_type: str, posts: List[Dict]) -> Dict:
     
     return scenario
 
-def generate_webhook_config(post_type: str) -> Dict:
-    """Generate webhook configuration for a custom post type"""
+@traced()
+def generate_webhook_config(post_type: str, rotate_secret: bool = False) -> Dict:
+    """Generate webhook configuration for a custom post type
+    
+    The secret is the receiver's stored one for this site and post type, so
+    regenerating the config never breaks snippets already deployed; pass
+    ``rotate_secret`` to replace it.
+    """
     # Get post type info
     post_type_info = st.session_state.cpt_stats.get(post_type, {})
     post_type_name = post_type_info.get("name", post_type.capitalize())
     
-    # Generate a webhook secret
-    webhook_secret = generate_api_key()
+    # The embedded receiver verifies events signed with this secret
+    receiver = get_webhook_receiver()
+    if receiver:
+        webhook_secret = receiver.secret_for(post_type, site=st.session_state.wordpress_url, rotate=rotate_secret)
+        webhook_url = receiver.public_url
+    else:
+        webhook_secret = generate_api_key()
+        webhook_url = webhook_public_url()  # served by another process on the default port
     
     # Create webhook configuration
     webhook_config = {
@@ -1325,17 +1525,17 @@ def generate_webhook_config(post_type: str) -> Dict:
             "update",
             "delete"
         ],
-        "target_url": "https://your-webhook-endpoint.com/webhook",
+        "target_url": webhook_url,
         "secret": webhook_secret,
         "status": "active",
         "format": "json",
         "post_type": post_type,
         "delivery": {
-            "max_attempts": 3,
-            "retry_interval": 60  # seconds
+            "max_attempts": DEFAULT_MAX_ATTEMPTS,
+            "retry_interval": DEFAULT_RETRY_INTERVAL  # seconds
         },
         "security": {
-            "signature_header": "X-WordPress-Signature",
+            "signature_header": SIGNATURE_HEADER,
             "signature_algorithm": "sha256"
         },
         "sample_payload": {
@@ -1370,6 +1570,7 @@ function trigger_{post_type}_webhook($post_id, $post, $update) {{
     // Prepare payload
     $payload = array(
         'event' => $update ? 'update' : 'create',
+        'site' => home_url(),
         'post_type' => '{post_type}',
         'post_id' => $post_id,
         'timestamp' => date('c'),
@@ -1390,6 +1591,7 @@ function trigger_{post_type}_delete_webhook($post_id) {{
     // Prepare payload
     $payload = array(
         'event' => 'delete',
+        'site' => home_url(),
         'post_type' => '{post_type}',
         'post_id' => $post_id,
         'timestamp' => date('c')
@@ -1402,7 +1604,7 @@ function trigger_{post_type}_delete_webhook($post_id) {{
 // Function to send webhook request
 function send_webhook_request($payload) {{
     // Webhook URL
-    $webhook_url = 'https://your-webhook-endpoint.com/webhook';
+    $webhook_url = '{webhook_url}';
     
     // Webhook secret
     $webhook_secret = '{webhook_secret}';
@@ -1435,6 +1637,7 @@ function send_webhook_request($payload) {{
     return webhook_config
 
 # Data Analysis Functions
+@traced()
 def analyze_cpt_data(posts: List[Dict]) -> Dict:
     """Analyze custom post type data and generate statistics"""
     if not posts:
@@ -1588,6 +1791,7 @@ def analyze_cpt_data(posts: List[Dict]) -> Dict:
     
     return analysis
 
+@traced()
 def analyze_taxonomy_data(terms: List[Dict]) -> Dict:
     """Analyze taxonomy terms and generate statistics"""
     if not terms:
@@ -1671,8 +1875,12 @@ def analyze_taxonomy_data(terms: List[Dict]) -> Dict:
     return analysis
 
 # UI Components
+@profiled
+@traced()
 def render_header():
     """Render the application header"""
+    resolve_deferred()
+    
     col1, col2 = st.columns([3, 1])
     
     with col1:
@@ -1696,6 +1904,162 @@ def render_header():
                 </div>
                 """, unsafe_allow_html=True)
 
+# Widget Callbacks
+def navigate_to(tab: str) -> None:
+    st.session_state.active_tab = tab
+
+def open_recent_item(item_type: str, item_id: str) -> None:
+    if item_type == "cpt":
+        st.session_state.selected_cpt = item_id
+        st.session_state.active_tab = "content"
+    elif item_type == "taxonomy":
+        st.session_state.selected_taxonomy = item_id
+        st.session_state.active_tab = "content"
+
+def refresh_data() -> None:
+    fetch_wordpress_data()
+    st.session_state.success_message = "Data refreshed successfully!"
+
+def disconnect() -> None:
+    # Clear session state
+    for key in list(st.session_state.keys()):
+        if key not in ["dark_mode"]:  # Keep some settings
+            del st.session_state[key]
+    
+    # Reset authentication state
+    st.session_state.authenticated = False
+
+def remember_site_credentials(url: str, username: str, password: str, token: str = "") -> None:
+    """Keep credentials for a site in this session only; the shared site registry never holds them"""
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    st.session_state.site_credentials[url.rstrip("/")] = (username, password, token)
+
+def switch_site(name: str) -> None:
+    """Make a registered site the active connection, keeping the loaded data of the one being left
+    
+    The session reuses credentials it entered for that site itself; without
+    any it is asked to log in rather than borrowing someone else's.
+    """
+    site = get_site_registry().get(name)
+    if site is None:
+        return
+    
+    current = st.session_state.wordpress_url
+    if current:
+        st.session_state.site_states[current] = {
+            key: st.session_state.get(key, default()) for key, default in SITE_STATE_DEFAULTS.items()
+        }
+        if st.session_state.authenticated and (st.session_state.username or st.session_state.auth_token):
+            remember_site_credentials(current, st.session_state.username, st.session_state.password,
+                                      st.session_state.auth_token)
+    saved = st.session_state.site_states.pop(site.url, None)
+    for key, default in SITE_STATE_DEFAULTS.items():
+        st.session_state[key] = saved[key] if saved else default()
+    
+    credentials = st.session_state.site_credentials.get(site.url)
+    st.session_state.wordpress_url = site.url
+    st.session_state.username, st.session_state.password, st.session_state.auth_token = credentials or ("", "", "")
+    st.session_state.authenticated = credentials is not None
+    bump_state_version("cpt_stats")
+    
+    if credentials is None:
+        st.session_state.success_message = f"Log in to {site.name} to continue"
+        return
+    if saved is None:
+        fetch_site_info()
+        fetch_wordpress_data()
+    st.session_state.active_tab = "dashboard"
+    st.session_state.success_message = f"Switched to {site.name}"
+
+def register_current_site() -> None:
+    """Add the active connection to the site registry under its site name (name and URL only)"""
+    name = st.session_state.site_info.get("name") or st.session_state.wordpress_url
+    site = get_site_registry().add(
+        name,
+        st.session_state.wordpress_url,
+        sync_interval=st.session_state.sync_settings["sync_interval"]
+    )
+    remember_site_credentials(site.url, st.session_state.username, st.session_state.password,
+                              st.session_state.auth_token)
+    st.session_state.success_message = f"Registered {name}"
+
+def select_cpt(cpt: str) -> None:
+    """Select a post type in the explorer, fetching and analysing it on first use"""
+    st.session_state.selected_cpt = cpt
+    # Fetch data if not already loaded
+    cached = bool(st.session_state.cpt_data.get(cpt))
+    metrics.record_cache_lookup("cpt_data", cached)
+    if not cached:
+        error = st.session_state.error_message
+        load_cpt_data(cpt)
+        # A fetch error is shown by the page, which this fragment's rerun would not redraw
+        st.session_state.rerun_app = st.session_state.error_message != error
+
+def load_cpt_data(cpt: str) -> bool:
+    """Fetch a post type's posts into cpt_data with their analysis"""
+    posts = get_cpt_posts(cpt)
+    if not posts:
+        return False
+    st.session_state.cpt_data[cpt] = posts
+    # Generate analysis
+    analysis = analyze_cpt_data(posts)
+    st.session_state.cpt_stats[cpt]["analysis"] = analysis
+    return True
+
+def load_all_cpt_data() -> None:
+    """Fetch every page of every post type concurrently through the async client, then analyse them"""
+    url = st.session_state.wordpress_url
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    
+    client = get_async_client(url)
+    rest_bases = {
+        cpt: st.session_state.cpt_stats.get(cpt, {}).get("rest_base", cpt)
+        for cpt in st.session_state.custom_post_types
+    }
+    start = time.perf_counter()
+    with tracing.span("fetch.all_cpt_posts", post_types=len(rest_bases), backend=client.backend):
+        results = client.get_collections(list(rest_bases.values()), headers=auth_headers(url))
+    elapsed = time.perf_counter() - start
+    for endpoint, status_code, seconds in client.drain_log():
+        log_api_request(endpoint, "GET", status_code, seconds)
+    
+    content_cache = session_content_cache()
+    loaded = 0
+    items = 0
+    errors = []
+    for cpt, rest_base in rest_bases.items():
+        result = results.get(rest_base)
+        if isinstance(result, Exception):
+            errors.append(f"{cpt} ({result})")  # a partial or failed fetch never replaces cached posts
+            continue
+        if not result[0]:
+            continue
+        posts, total = result
+        st.session_state.cpt_data[cpt] = posts
+        st.session_state.cpt_stats[cpt].update({
+            "count": total,
+            "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "analysis": analyze_cpt_data(posts)
+        })
+        content_cache.replace(cpt, posts)
+        st.session_state.cpt_cache_versions[cpt] = content_cache.version(cpt)
+        loaded += 1
+        items += len(posts)
+    bump_state_version("cpt_stats")
+    
+    failed = len(rest_bases) - loaded
+    st.session_state.success_message = f"Loaded {items} items from {loaded} post types in {elapsed:.1f}s"
+    if failed:
+        st.session_state.error_message = f"{failed} post types could not be loaded" + (
+            f": {'; '.join(errors)}" if errors else ""
+        )
+    # The counts, the dashboard and the status messages are all outside the explorer fragment
+    st.session_state.rerun_app = True
+
+@profiled
+@traced()
 def render_sidebar():
     """Render the application sidebar"""
     with st.sidebar:
@@ -1711,11 +2075,18 @@ def render_sidebar():
             else:
                 st.session_state.dark_mode = False
         
+        st.toggle(
+            "Profile reruns",
+            key="profile_reruns",
+            help="Record cProfile, tracemalloc and stack samples for every rerun (see API Logs)"
+        )
+        
         if not st.session_state.authenticated:
             render_auth_sidebar()
         else:
             render_authenticated_sidebar()
 
+@traced()
 def render_auth_sidebar():
     """Render the authentication sidebar"""
     st.markdown("### Connect to WordPress")
@@ -1746,7 +2117,7 @@ def render_auth_sidebar():
                 # Simulate the callback after a delay
                 if st.button("Complete Authentication", key="complete_auth", use_container_width=True):
                     handle_auth_callback()
-                    st.experimental_rerun()
+                    st.rerun()
             else:
                 st.warning("Please enter your WordPress site URL")
     
@@ -1766,25 +2137,39 @@ def render_auth_sidebar():
                     st.session_state.password = password
                     
                     if authenticate_with_credentials(wordpress_url, username, password):
-                        st.experimental_rerun()
+                        st.rerun()
                 else:
                     st.warning("Please fill in all fields")
     
     # Quick demo option
     with st.expander("Quick Demo"):
         st.markdown("Try the app with demo data without connecting to WordPress.")
+        demo_size = st.select_slider(
+            "Posts per content type",
+            options=DEMO_SIZES,
+            value=DEMO_SIZES[1],
+            key="demo_size",
+            help="Generated content is seeded, so the same size always yields the same site"
+        )
         if st.button("Load Demo Data", key="demo_button", use_container_width=True):
+            site = SyntheticSite(
+                seed=DEMO_SEED,
+                posts=demo_size,
+                terms=max(demo_size // 5, 10),
+                media=max(demo_size // 2, 10)
+            )
+            
             # Simulate authentication with demo data
             st.session_state.authenticated = True
-            st.session_state.wordpress_url = "https://demo-wordpress-site.com"
+            st.session_state.wordpress_url = site.site_url
             st.session_state.auth_token = f"demo_token_{uuid.uuid4()}"
             
             # Load demo site info
             st.session_state.site_info = {
                 "name": "Demo WordPress Site",
                 "description": "A demo site for testing the WordPress Integration Hub",
-                "url": "https://demo-wordpress-site.com",
-                "home": "https://demo-wordpress-site.com",
+                "url": site.site_url,
+                "home": site.site_url,
                 "gmt_offset": 0,
                 "timezone": "UTC",
                 "site_logo": None,
@@ -1792,61 +2177,59 @@ def render_auth_sidebar():
             }
             
             # Load demo user info
-            st.session_state.user_info = {
-                "id": 1,
-                "name": "Demo User",
-                "url": "",
-                "description": "",
-                "link": "https://demo-wordpress-site.com/author/demo-user/",
-                "slug": "demo-user",
-                "avatar_urls": {
-                    "24": "",
-                    "48": "",
-                    "96": ""
-                }
-            }
+            st.session_state.user_info = site.author(1)
             
-            # Load demo custom post types
-            st.session_state.custom_post_types = ["post", "page", "product", "event", "testimonial"]
+            # Load demo custom post types and taxonomies
+            post_types = site.post_types()
+            taxonomies = site.taxonomies()
+            st.session_state.custom_post_types = list(post_types)
+            st.session_state.taxonomies = list(taxonomies)
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
-            # Load demo taxonomies
-            st.session_state.taxonomies = ["category", "post_tag", "product_cat", "event_type"]
-            
-            # Initialize demo stats
-            for cpt in st.session_state.custom_post_types:
-                st.session_state.cpt_stats[cpt] = {
-                    "count": random.randint(10, 100),
-                    "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "rest_base": cpt,
-                    "name": cpt.capitalize(),
-                    "description": f"Demo {cpt} post type",
-                    "hierarchical": False,
-                    "supports": {"title": True, "editor": True},
-                    "viewable": True
-                }
-            
-            for tax in st.session_state.taxonomies:
-                st.session_state.taxonomy_stats[tax] = {
-                    "count": random.randint(5, 30),
-                    "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "rest_base": tax,
-                    "name": tax.replace("_", " ").capitalize(),
-                    "description": f"Demo {tax} taxonomy",
-                    "hierarchical": tax in ["category", "product_cat"],
-                    "types": ["post"] if tax in ["category", "post_tag"] else ["product"] if tax == "product_cat" else ["event"]
+            with st.spinner(f"Generating {demo_size * len(post_types):,} demo posts..."):
+                for cpt, info in post_types.items():
+                    posts = list(site.iter_posts(cpt))
+                    st.session_state.cpt_data[cpt] = posts
+                    st.session_state.cpt_stats[cpt] = {
+                        "count": len(posts),
+                        "last_updated": now,
+                        "rest_base": info["rest_base"],
+                        "name": info["name"],
+                        "description": info["description"],
+                        "hierarchical": info["hierarchical"],
+                        "supports": info["supports"],
+                        "viewable": info["viewable"],
+                        "analysis": analyze_cpt_data(posts)
+                    }
+                bump_state_version("cpt_stats")
+                
+                for tax, info in taxonomies.items():
+                    terms = list(site.iter_terms(tax))
+                    st.session_state.taxonomy_data[tax] = terms
+                    st.session_state.taxonomy_stats[tax] = {
+                        "count": len(terms),
+                        "last_updated": now,
+                        "rest_base": info["rest_base"],
+                        "name": info["name"],
+                        "description": info["description"],
+                        "hierarchical": info["hierarchical"],
+                        "types": info["types"],
+                        "analysis": analyze_taxonomy_data(terms)
+                    }
+                
+                # Load demo media
+                st.session_state.media_data = {
+                    "total_count": site.sizes["media"],
+                    "items": list(site.iter_media()),
+                    "last_updated": now
                 }
             
-            # Load demo media stats
-            st.session_state.media_data = {
-                "total_count": random.randint(50, 200),
-                "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
             st.session_state.last_refresh = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             st.session_state.success_message = "Demo data loaded successfully!"
             
-            st.experimental_rerun()
+            st.rerun()
 
+@traced()
 def render_authenticated_sidebar():
     """Render the sidebar for authenticated users"""
     # Connection status
@@ -1866,35 +2249,31 @@ def render_authenticated_sidebar():
         {"id": "integrations", "icon": "🔄", "label": "Integrations"},
         {"id": "sync", "icon": "⏱️", "label": "Sync Settings"},
         {"id": "templates", "icon": "📋", "label": "Templates"},
+        {"id": "sites", "icon": "🌐", "label": "Sites"},
         {"id": "logs", "icon": "📝", "label": "API Logs"},
         {"id": "settings", "icon": "⚙️", "label": "Settings"}
     ]
     
+    # Callbacks update state before the click's own rerun, so navigating costs
+    # one rerun instead of two and never recomputes the view being left
     for item in nav_items:
-        if st.button(f"{item['icon']} {item['label']}", key=f"nav_{item['id']}", use_container_width=True):
-            st.session_state.active_tab = item['id']
-            st.experimental_rerun()
+        st.button(
+            f"{item['icon']} {item['label']}",
+            key=f"nav_{item['id']}",
+            use_container_width=True,
+            on_click=navigate_to,
+            args=(item['id'],)
+        )
     
     # Quick actions
     st.markdown("### Quick Actions")
     
     col1, col2 = st.columns(2)
     with col1:
-        if st.button("Refresh Data", key="refresh_data_btn"):
-            fetch_wordpress_data()
-            st.session_state.success_message = "Data refreshed successfully!"
-            st.experimental_rerun()
+        st.button("Refresh Data", key="refresh_data_btn", on_click=refresh_data)
     
     with col2:
-        if st.button("Disconnect", key="disconnect_btn"):
-            # Clear session state
-            for key in list(st.session_state.keys()):
-                if key not in ["dark_mode"]:  # Keep some settings
-                    del st.session_state[key]
-            
-            # Reset authentication state
-            st.session_state.authenticated = False
-            st.experimental_rerun()
+        st.button("Disconnect", key="disconnect_btn", on_click=disconnect)
     
     # Recent items
     if st.session_state.recent_items:
@@ -1905,14 +2284,13 @@ def render_authenticated_sidebar():
             item_id = item["id"]
             item_name = item["name"]
             
-            if st.button(f"{item_name}", key=f"recent_{item_type}_{item_id}", use_container_width=True):
-                if item_type == "cpt":
-                    st.session_state.selected_cpt = item_id
-                    st.session_state.active_tab = "content"
-                elif item_type == "taxonomy":
-                    st.session_state.selected_taxonomy = item_id
-                    st.session_state.active_tab = "content"
-                st.experimental_rerun()
+            st.button(
+                f"{item_name}",
+                key=f"recent_{item_type}_{item_id}",
+                use_container_width=True,
+                on_click=open_recent_item,
+                args=(item_type, item_id)
+            )
     
     # Footer
     st.markdown("""
@@ -1922,6 +2300,54 @@ def render_authenticated_sidebar():
     </div>
     """, unsafe_allow_html=True)
 
+def build_distribution_view() -> Tuple[Optional["pd.DataFrame"], Optional["go.Figure"]]:
+    """Content-distribution DataFrame and bar chart, or (None, None) when nothing is loaded"""
+    chart_data = []
+    for cpt in st.session_state.custom_post_types:
+        count = st.session_state.cpt_stats.get(cpt, {}).get("count", 0)
+        name = st.session_state.cpt_stats.get(cpt, {}).get("name", cpt.capitalize())
+        if count > 0:
+            chart_data.append({
+                "Content Type": name,
+                "Count": count
+            })
+    
+    if not chart_data:
+        return None, None
+    
+    with tracing.span("dashboard.distribution_dataframe", rows=len(chart_data)):
+        chart_df = pd.DataFrame(chart_data)
+    with tracing.span("dashboard.distribution_figure"):
+        fig = px.bar(
+            chart_df, 
+            x="Content Type", 
+            y="Count", 
+            title="Content Items by Type",
+            color="Content Type"
+        )
+    return chart_df, fig
+
+def build_recent_logs_view() -> "pd.DataFrame":
+    """The five most recent API requests"""
+    with tracing.span("dashboard.api_logs_dataframe"):
+        return pd.DataFrame([
+            {
+                "Time": log["timestamp"],
+                "Endpoint": truncate_text(log["endpoint"], 30),
+                "Method": log["method"],
+                "Status": log["status_code"],
+                "Response Time (s)": round(log["response_time"], 2)
+            }
+            for log in islice(st.session_state.api_logs, 5)  # Show only 5 most recent
+        ])
+
+def build_integration_status_view(integration_status: List[Dict]) -> "pd.DataFrame":
+    with tracing.span("dashboard.integration_status_dataframe"):
+        return pd.DataFrame(integration_status)
+
+@st.fragment
+@profiled
+@traced()
 def render_dashboard():
     """Render the dashboard view"""
     st.markdown('<div class="section-header">Dashboard</div>', unsafe_allow_html=True)
@@ -1931,13 +2357,12 @@ def render_dashboard():
     
     with col1:
         cpt_count = len(st.session_state.custom_post_types)
-        st.markdown(f"""
-        <div class="stat-card">
-            <div class="stat-title">Content Types</div>
-            <div class="stat-value">{cpt_count}</div>
-            <div class="stat-description">Custom post types</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(static_assets.fragment(
+            STAT_CARD_HTML,
+            title="Content Types",
+            value=cpt_count,
+            description="Custom post types"
+        ), unsafe_allow_html=True)
     
     with col2:
         # Count total items across all CPTs
@@ -1947,61 +2372,46 @@ def render_dashboard():
             if "count" in st.session_state.cpt_stats[cpt]
         )
         
-        st.markdown(f"""
-        <div class="stat-card">
-            <div class="stat-title">Content Items</div>
-            <div class="stat-value">{total_items}</div>
-            <div class="stat-description">Total content entries</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(static_assets.fragment(
+            STAT_CARD_HTML,
+            title="Content Items",
+            value=total_items,
+            description="Total content entries"
+        ), unsafe_allow_html=True)
     
     with col3:
         # Count total taxonomies
         tax_count = len(st.session_state.taxonomies)
         
-        st.markdown(f"""
-        <div class="stat-card">
-            <div class="stat-title">Taxonomies</div>
-            <div class="stat-value">{tax_count}</div>
-            <div class="stat-description">Classification systems</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(static_assets.fragment(
+            STAT_CARD_HTML,
+            title="Taxonomies",
+            value=tax_count,
+            description="Classification systems"
+        ), unsafe_allow_html=True)
     
     with col4:
         # Media count
         media_count = st.session_state.media_data.get("total_count", 0)
         
-        st.markdown(f"""
-        <div class="stat-card">
-            <div class="stat-title">Media Items</div>
-            <div class="stat-value">{media_count}</div>
-            <div class="stat-description">Images, videos, etc.</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(static_assets.fragment(
+            STAT_CARD_HTML,
+            title="Media Items",
+            value=media_count,
+            description="Images, videos, etc."
+        ), unsafe_allow_html=True)
     
     # Content distribution chart
     st.markdown('<div class="subsection-header">Content Distribution</div>', unsafe_allow_html=True)
     
-    # Create data for the chart
-    chart_data = []
-    for cpt in st.session_state.custom_post_types:
-        count = st.session_state.cpt_stats.get(cpt, {}).get("count", 0)
-        name = st.session_state.cpt_stats.get(cpt, {}).get("name", cpt.capitalize())
-        if count > 0:
-            chart_data.append({
-                "Content Type": name,
-                "Count": count
-            })
+    # Rebuilt only when post types or their stats change
+    chart_df, fig = st.session_state.view_cache.get(
+        "dashboard.distribution",
+        (st.session_state.state_versions["cpt_stats"], tuple(st.session_state.custom_post_types)),
+        build_distribution_view
+    )
     
-    if chart_data:
-        chart_df = pd.DataFrame(chart_data)
-        fig = px.bar(
-            chart_df, 
-            x="Content Type", 
-            y="Count", 
-            title="Content Items by Type",
-            color="Content Type"
-        )
+    if fig is not None:
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("No content data available. Select content types from the sidebar to load data.")
@@ -2014,17 +2424,11 @@ def render_dashboard():
         
         # Show recent API logs
         if st.session_state.api_logs:
-            logs_df = pd.DataFrame([
-                {
-                    "Time": log["timestamp"],
-                    "Endpoint": truncate_text(log["endpoint"], 30),
-                    "Method": log["method"],
-                    "Status": log["status_code"],
-                    "Response Time (s)": round(log["response_time"], 2)
-                }
-                for log in st.session_state.api_logs[:5]  # Show only 5 most recent
-            ])
-            
+            logs_df = st.session_state.view_cache.get(
+                "dashboard.api_logs",
+                st.session_state.state_versions["api_logs"],
+                build_recent_logs_view
+            )
             st.dataframe(logs_df, use_container_width=True, hide_index=True)
         else:
             st.info("No recent activity to display.")
@@ -2041,7 +2445,12 @@ def render_dashboard():
             {"Platform": "Data Sync", "Status": "Active" if st.session_state.sync_settings["auto_sync"] else "Disabled"}
         ]
         
-        status_df = pd.DataFrame(integration_status)
+        # The statuses are their own version: five strings are cheaper to compare than to tabulate
+        status_df = st.session_state.view_cache.get(
+            "dashboard.integration_status",
+            tuple(row["Status"] for row in integration_status),
+            lambda: build_integration_status_view(integration_status)
+        )
         st.dataframe(status_df, use_container_width=True, hide_index=True)
     
     # Quick actions
@@ -2050,32 +2459,318 @@ def render_dashboard():
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.markdown("""
-        <div class="action-card">
-            <div class="action-title">Create Integration</div>
-            <div class="action-description">Generate a new integration for your WordPress content</div>
-            <button class="action-button" onclick="parent.window.location.href='#'">Start</button>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(static_assets.fragment(
+            ACTION_CARD_HTML,
+            title="Create Integration",
+            description="Generate a new integration for your WordPress content",
+            label="Start"
+        ), unsafe_allow_html=True)
     
     with col2:
-        st.markdown("""
-        <div class="action-card">
-            <div class="action-title">Configure Sync</div>
-            <div class="action-description">Set up automatic data synchronization</div>
-            <button class="action-button" onclick="parent.window.location.href='#'">Configure</button>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(static_assets.fragment(
+            ACTION_CARD_HTML,
+            title="Configure Sync",
+            description="Set up automatic data synchronization",
+            label="Configure"
+        ), unsafe_allow_html=True)
     
     with col3:
-        st.markdown("""
-        <div class="action-card">
-            <div class="action-title">Export Data</div>
-            <div class="action-description">Export your WordPress data in various formats</div>
-            <button class="action-button" onclick="parent.window.location.href='#'">Export</button>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(static_assets.fragment(
+            ACTION_CARD_HEADER_HTML,
+            title="Export Data",
+            description="Export your WordPress data in various formats"
+        ), unsafe_allow_html=True)
+        with st.popover("Export", use_container_width=True):
+            render_export_panel()
 
+def run_export(cpt: str, source: str, fmt: str, compression: Optional[str], fields: List[str], progress) -> exporter.ExportResult:
+    """Stream one post type to a file in EXPORT_DIR, page by page"""
+    url = st.session_state.wordpress_url
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    
+    if source == "Local cache":
+        posts = session_content_cache().get_posts(cpt) or st.session_state.cpt_data.get(cpt, [])
+        pages = exporter.iter_list_pages(posts)
+    else:
+        rest_base = st.session_state.cpt_stats.get(cpt, {}).get("rest_base", cpt)
+        log = deque()
+        params = {"_fields": ",".join(fields)} if fields else {}
+        pages = exporter.iter_rest_pages(exporter.rest_page_fetcher(url, rest_base, auth_headers(url), log=log), params=params)
+    
+    def on_progress(rows: int, total: int) -> None:
+        progress.progress(min(rows / total, 1.0) if total else 1.0, text=f"{rows:,} of {total:,} rows")
+    
+    exporter.prune_exports()
+    path = exporter.export_path(cpt, fmt, compression)
+    try:
+        with tracing.span("export", post_type=cpt, format=fmt, source=source):
+            return exporter.export(pages, path, fmt, compression, columns=fields or None, on_progress=on_progress)
+    finally:
+        if source != "Local cache":
+            for endpoint, status_code, seconds in log:
+                log_api_request(endpoint, "GET", status_code, seconds)
+
+@st.fragment
+@profiled
+@traced()
+def render_export_panel():
+    """Render the streaming export form and the last export's download"""
+    if not st.session_state.custom_post_types:
+        st.info("No content types loaded yet. Click 'Refresh Data' in the sidebar first.")
+        return
+    
+    cpt = st.selectbox(
+        "Content type",
+        st.session_state.custom_post_types,
+        format_func=lambda cpt: st.session_state.cpt_stats.get(cpt, {}).get("name", cpt.capitalize()),
+        key="export_cpt"
+    )
+    source = st.radio("Source", EXPORT_SOURCES, horizontal=True, key="export_source")
+    formats = [fmt for fmt in exporter.FORMATS if fmt != "parquet" or exporter.parquet_available()]
+    fmt = st.selectbox("Format", formats, key="export_format")
+    compression = st.selectbox(
+        "Compression",
+        exporter.PARQUET_COMPRESSIONS if fmt == "parquet" else exporter.TEXT_COMPRESSIONS,
+        format_func=lambda codec: codec or "none",
+        key=f"export_compression_{fmt}"
+    )
+    fields = st.text_input(
+        "Fields",
+        key="export_fields",
+        placeholder="id,date,title,status",
+        help="Comma-separated columns; empty exports every field"
+    )
+    fields = [field.strip() for field in fields.split(",") if field.strip()]
+    
+    if st.button("Start Export", key="export_start", type="primary", use_container_width=True):
+        progress = st.progress(0.0, text="Starting export...")
+        try:
+            st.session_state.last_export = run_export(cpt, source, fmt, compression, fields, progress)
+        except (requests.RequestException, exporter.ExportError, OSError) as e:
+            st.session_state.last_export = None
+            st.error(f"Export failed: {str(e)}")
+        progress.empty()
+    
+    result = st.session_state.last_export
+    if result is not None and os.path.exists(result.path):
+        st.success(f"Exported {result.rows:,} rows in {result.seconds:.1f}s "
+                   f"({result.rows_per_second:,.0f} rows/s, {result.bytes / 1024 / 1024:.1f} MB)")
+        st.caption(f"Saved to {result.path}")
+        if result.bytes <= MAX_DOWNLOAD_BYTES:
+            def read_export(path: str = result.path) -> bytes:
+                with open(path, "rb") as f:
+                    return f.read()
+            
+            # Deferred: the file is read when the button is clicked, not on every rerun
+            st.download_button(
+                "Download",
+                data=read_export,
+                file_name=os.path.basename(result.path),
+                key="export_download",
+                use_container_width=True
+            )
+
+@st.fragment
+@profiled
+@traced()
+def render_sites():
+    """Render the cross-site dashboard and site registry"""
+    st.markdown('<div class="section-header">Sites</div>', unsafe_allow_html=True)
+    
+    registry = get_site_registry()
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Sites", len(registry))
+    col2.metric("Cached Content", f"{registry.cache_bytes / 1024 / 1024:.1f} MB",
+                help=f"Budget {registry.memory_budget / 1024 / 1024:.0f} MB across all sites")
+    col3.metric("Connections per Site", max(registry.connection_budget // max(len(registry), 1), 1),
+                help=f"Budget {registry.connection_budget} in-flight requests across all sites")
+    
+    if len(registry):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if st.button("Refresh All Sites", key="sites_refresh", use_container_width=True):
+                with st.spinner(f"Refreshing {len(registry)} sites..."):
+                    registry.refresh_all(force=True)
+        with col2:
+            if st.button("Sync Due Sites", key="sites_sync", use_container_width=True):
+                with st.spinner("Syncing..."):
+                    synced = registry.sync_due()
+                st.success(f"Synced {len(synced)} sites" if synced else "No site is due for sync")
+        with col3:
+            active = st.selectbox("Active site", registry.names(), key="sites_active", label_visibility="collapsed")
+            st.button("Switch", key="sites_switch", use_container_width=True, on_click=switch_site, args=(active,))
+        
+        st.dataframe(pd.DataFrame(registry.dashboard()), use_container_width=True, hide_index=True)
+    else:
+        st.info("No sites registered yet. Add one below, or list them in the JSON file named by WP_HUB_SITES.")
+    
+    if st.session_state.authenticated and st.session_state.wordpress_url not in [site.url for site in registry]:
+        st.button("Register Current Site", key="sites_register_current", on_click=register_current_site)
+    
+    with st.expander("Add Site"):
+        with st.form("add_site_form"):
+            name = st.text_input("Name")
+            url = st.text_input("WordPress URL", placeholder="example.com")
+            username = st.text_input("Username")
+            password = st.text_input("Application Password", type="password",
+                                     help="Kept in this session only; other users of the hub log in themselves")
+            sync_interval = st.number_input("Sync Interval (minutes)", min_value=0, value=DEFAULT_SYNC_INTERVAL,
+                                            help="0 disables scheduled syncs")
+            if st.form_submit_button("Add Site"):
+                if name and url:
+                    site = registry.add(name, url, sync_interval=int(sync_interval))
+                    if username and password:
+                        remember_site_credentials(site.url, username, password)
+                    st.rerun(scope="fragment")
+                else:
+                    st.warning("Name and URL are required")
+
+@st.fragment
+@profiled
+@traced()
+def render_api_logs():
+    """Render the API logs view from streaming aggregates"""
+    st.markdown('<div class="section-header">API Logs</div>', unsafe_allow_html=True)
+    
+    api_stats = st.session_state.api_stats
+    overall = api_stats.overall
+    
+    if not overall.count:
+        st.info("No API requests recorded yet.")
+        render_rerun_profiles()
+        return
+    
+    # Overall latency and error metrics
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("Requests", overall.count)
+    col2.metric("Error Rate", f"{overall.error_rate * 100:.1f}%")
+    col3.metric("p50", f"{overall.latency.percentile(50) * 1000:.0f} ms")
+    col4.metric("p95", f"{overall.latency.percentile(95) * 1000:.0f} ms")
+    col5.metric("p99", f"{overall.latency.percentile(99) * 1000:.0f} ms")
+    
+    # Per-endpoint aggregates
+    st.markdown('<div class="subsection-header">Endpoints</div>', unsafe_allow_html=True)
+    summary = api_stats.summary()
+    st.dataframe(pd.DataFrame(summary), use_container_width=True, hide_index=True)
+    
+    fig = px.bar(
+        pd.DataFrame(summary),
+        x="Endpoint",
+        y=["p50 (ms)", "p95 (ms)", "p99 (ms)"],
+        barmode="group",
+        title="Latency Percentiles by Endpoint"
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Where the time goes: network phases vs. server think time vs. payload size
+    phase_fig = px.bar(
+        pd.DataFrame(api_stats.phase_summary()),
+        x="Endpoint",
+        y="Mean (ms)",
+        color="Phase",
+        title="Mean Time per Phase (DNS / Connect / TLS / TTFB / Download / Decode)"
+    )
+    st.plotly_chart(phase_fig, use_container_width=True)
+    
+    # Most recent raw requests
+    with st.expander(f"Recent Requests (last {len(st.session_state.api_logs)})"):
+        st.dataframe(pd.DataFrame(list(st.session_state.api_logs)), use_container_width=True, hide_index=True)
+    
+    render_trace_waterfall()
+    render_rerun_profiles()
+
+def render_trace_waterfall():
+    """Render a waterfall of the spans recorded during a recent rerun"""
+    st.markdown('<div class="subsection-header">Rerun Traces</div>', unsafe_allow_html=True)
+    
+    tracer = tracing.get_tracer()
+    # Group the span buffer by trace once; the current rerun is still running, so offer the previous ones
+    spans = tracer.spans_by_trace(list(st.session_state.trace_ids))
+    trace_ids = [trace_id for trace_id in reversed(st.session_state.trace_ids) if spans[trace_id]]
+    if not trace_ids:
+        st.info("No traces recorded yet.")
+        return
+    
+    trace_id = st.selectbox(
+        "Rerun",
+        trace_ids,
+        format_func=lambda tid: f"{tid[:8]} ({len(spans[tid])} spans)"
+    )
+    rows = tracer.waterfall(trace_id, spans[trace_id])
+    labels = [f"{'  ' * row['depth']}{row['name']}" for row in rows]
+    
+    fig = go.Figure(go.Bar(
+        y=labels,
+        x=[row["duration_ms"] for row in rows],
+        base=[row["offset_ms"] for row in rows],
+        orientation="h",
+        marker_color=["#d62728" if row["status"] == "error" else "#1f77b4" for row in rows],
+        hovertext=[json.dumps(row["attributes"], default=str)[:300] for row in rows]
+    ))
+    fig.update_layout(
+        title="Span Waterfall (ms from rerun start)",
+        yaxis={"autorange": "reversed"},
+        height=max(300, 22 * len(rows))
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    session_spans = [span for trace_id in st.session_state.trace_ids for span in spans[trace_id]]
+    st.download_button(
+        "Download OTLP/JSON",
+        data=json.dumps(tracer.export_otlp(spans=session_spans)),
+        file_name="traces.otlp.json",
+        mime="application/json"
+    )
+
+def render_rerun_profiles():
+    """Render the per-rerun profiles collected in profiling mode"""
+    st.markdown('<div class="subsection-header">Rerun Profiles</div>', unsafe_allow_html=True)
+    
+    # The current rerun's profile is finalised when the next rerun starts
+    profiles = [profile for profile in reversed(st.session_state.profile_history) if profile.finished]
+    if not profiles:
+        st.info("No profiles recorded yet. Turn on \"Profile reruns\" in the sidebar or set WP_HUB_PROFILE=1.")
+        return
+    
+    history_df = pd.DataFrame([profile.summary() for profile in reversed(profiles)])
+    st.dataframe(history_df, use_container_width=True, hide_index=True)
+    
+    fig = px.line(
+        history_df,
+        x="Rerun",
+        y=[column for column in history_df.columns if column.endswith("(ms)")],
+        markers=True,
+        title="Rerun Wall Time by Section"
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    profile = st.selectbox(
+        "Profile",
+        profiles,
+        format_func=lambda p: f"{p.label} ({p.started_at}, {p.wall_time * 1000:.0f} ms)"
+    )
+    st.dataframe(pd.DataFrame(profile.top_functions()), use_container_width=True, hide_index=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            "Download .pstats",
+            data=profile.pstats_bytes(),
+            file_name=f"rerun-{profile.label}.pstats",
+            mime="application/octet-stream"
+        )
+    with col2:
+        st.download_button(
+            "Download speedscope JSON",
+            data=profile.speedscope_json(),
+            file_name=f"rerun-{profile.label}.speedscope.json",
+            mime="application/json"
+        )
+
+@profiled
+@traced()
 def render_content_explorer():
     """Render the content explorer view"""
     st.markdown('<div class="section-header">Content Explorer</div>', unsafe_allow_html=True)
@@ -2091,11 +2786,179 @@ def render_content_explorer():
     
     with tab3:
         render_media_explorer()
+        render_media_index()
+
+def index_media_library(progress) -> None:
+    """Crawl every media page into the site's media index"""
+    url = st.session_state.wordpress_url
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    
+    log = deque()
+    
+    def on_progress(done: int, total: int) -> None:
+        progress.progress(min(done / total, 1.0) if total else 1.0, text=f"{done:,} of {total:,} media items")
+    
+    try:
+        with tracing.span("fetch.media_index"):
+            count = session_media_index(url).crawl(auth_headers(url), on_progress=on_progress, log=log)
+        st.session_state.media_data.update({
+            "total_count": count,
+            "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        })
+    except requests.RequestException as e:
+        st.error(f"Error indexing media: {str(e)}")
+    finally:
+        for endpoint, status_code, seconds in log:
+            log_api_request(endpoint, "GET", status_code, seconds)
 
+@st.fragment
+@profiled
+@traced()
+def render_media_index():
+    """Render the media index: size breakdowns and a thumbnail browser"""
+    st.markdown('<div class="subsection-header">Media Index</div>', unsafe_allow_html=True)
+    
+    url = st.session_state.wordpress_url
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    index = session_media_index(url)
+    
+    if st.button("Index Media Library" if not index.records else "Rebuild Index", key="media_index_build",
+                 help="Crawl every media page in parallel and save the index locally"):
+        progress = st.progress(0.0, text="Indexing media...")
+        index_media_library(progress)
+        progress.empty()
+    
+    if not index.records:
+        st.info("No media index yet. Index the library to see size breakdowns and browse thumbnails.")
+        return
+    
+    summary = index.summary()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Files", f"{summary['files']:,}")
+    col2.metric("Total Size", f"{summary['bytes'] / 1024 / 1024:,.1f} MB")
+    col3.metric("Images", f"{summary['images']:,}")
+    col4.metric("Unattached", f"{summary['unattached']:,}")
+    st.caption(f"Indexed {datetime.fromtimestamp(index.built_at).strftime('%Y-%m-%d %H:%M:%S')} "
+               f"in {index.crawl_seconds:.1f}s")
+    
+    breakdown_tab, browse_tab, mirror_tab = st.tabs(["Breakdown", "Browse", "Mirror"])
+    
+    with breakdown_tab:
+        by_mime = pd.DataFrame(index.breakdown("mime_type"))
+        by_mime["MB"] = (by_mime.pop("bytes") / 1024 / 1024).round(1)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.dataframe(by_mime, use_container_width=True, hide_index=True)
+        with col2:
+            st.bar_chart(by_mime.set_index("mime_type")["files"])
+        size_classes = pd.DataFrame(index.size_classes())
+        size_classes["MB"] = (size_classes.pop("bytes") / 1024 / 1024).round(1)
+        st.dataframe(size_classes, use_container_width=True, hide_index=True)
+    
+    with browse_tab:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            mime_types = ["All"] + [group["mime_type"] for group in index.breakdown("mime_type")]
+            mime_type = st.selectbox("MIME type", mime_types, key="media_browse_mime")
+        with col2:
+            attached = st.selectbox("Attached", ["All", "Attached", "Unattached"], key="media_browse_attached")
+        records = index.filter(
+            mime_type=None if mime_type == "All" else mime_type,
+            attached=None if attached == "All" else attached == "Attached"
+        )
+        pages = max((len(records) + MEDIA_BROWSER_PAGE_SIZE - 1) // MEDIA_BROWSER_PAGE_SIZE, 1)
+        with col3:
+            page = st.number_input("Page", min_value=1, max_value=pages, value=1, key="media_browse_page")
+        
+        # Only the visible page's thumbnails are generated; the rest wait until they are browsed
+        visible = records[(page - 1) * MEDIA_BROWSER_PAGE_SIZE:page * MEDIA_BROWSER_PAGE_SIZE]
+        # Uploads are public static files, often on a CDN, so no credentials are sent with them
+        thumbnails = index.thumbnails.ensure(visible)
+        st.caption(f"{len(records):,} items, page {page} of {pages}")
+        cols = st.columns(MEDIA_BROWSER_COLUMNS)
+        for i, record in enumerate(visible):
+            with cols[i % MEDIA_BROWSER_COLUMNS]:
+                path = thumbnails.get(record["id"])
+                if path:
+                    st.image(path, caption=truncate_text(record["title"] or str(record["id"]), 30),
+                             use_container_width=True)
+                else:
+                    st.markdown(f"📄 {truncate_text(record['title'] or str(record['id']), 30)}  \n"
+                                f"`{record['mime_type']}`")
+    
+    with mirror_tab:
+        render_media_mirror(url, index)
+
+def mirror_media_library(url: str, items: List[Dict], workers: int, progress) -> media_mirror.MirrorResult:
+    """Stream every indexed upload into the site's local mirror"""
+    mirror = MediaMirror(os.path.join(site_directory(url), "uploads"), workers=workers)
+    start = time.perf_counter()
+    
+    def on_progress(done: int, total: int, received: int) -> None:
+        rate = received / max(time.perf_counter() - start, 1e-6) / 1024 / 1024
+        progress.progress(done / total if total else 1.0,
+                          text=f"{done:,} of {total:,} files, {received / 1024 / 1024:,.1f} MB at {rate:,.1f} MB/s")
+    
+    with tracing.span("media_mirror", files=len(items), workers=workers):
+        return mirror.run(items, on_progress=on_progress)
+
+def render_media_mirror(url: str, index: MediaIndex):
+    """Render the uploads mirror: run it over the index and report throughput"""
+    directory = os.path.join(site_directory(url), "uploads")
+    st.caption(f"Copies every indexed file to {directory}. Unchanged files are skipped by ETag or size, "
+               "interrupted downloads resume, and identical files are stored once.")
+    workers = st.slider("Parallel downloads", 1, 32, MIRROR_WORKERS, key="media_mirror_workers")
+    
+    if st.button(f"Mirror {len(index.records):,} Files", key="media_mirror_start", type="primary"):
+        progress = st.progress(0.0, text="Starting mirror...")
+        st.session_state.last_mirror = mirror_media_library(url, index.records, workers, progress)
+        progress.empty()
+    
+    result = st.session_state.last_mirror
+    if result is not None:
+        col1, col2, col3, col4, col5 = st.columns(5)
+        col1.metric("Downloaded", result.count(media_mirror.DOWNLOADED) + result.count(media_mirror.RESUMED),
+                    help=f"{result.count(media_mirror.RESUMED)} resumed")
+        col2.metric("Unchanged", result.count(media_mirror.UNCHANGED))
+        col3.metric("Deduplicated", result.count(media_mirror.DEDUPLICATED))
+        col4.metric("Failed", result.count(media_mirror.FAILED))
+        col5.metric("Throughput", f"{result.throughput / 1024 / 1024:,.1f} MB/s",
+                    help=f"{result.bytes / 1024 / 1024:,.1f} MB in {result.seconds:.1f}s")
+        failures = [{"URL": r.url, "Error": r.error} for r in result.files if r.status == media_mirror.FAILED]
+        if failures:
+            st.dataframe(pd.DataFrame(failures), use_container_width=True, hide_index=True)
+
+def sync_cpt_data_from_cache(cpt: str) -> None:
+    """Pick up posts pushed by the webhook receiver since the last rerun"""
+    content_cache = session_content_cache()
+    version = content_cache.version(cpt)
+    if version and st.session_state.cpt_cache_versions.get(cpt) != version:
+        posts = content_cache.get_posts(cpt)
+        st.session_state.cpt_data[cpt] = posts
+        st.session_state.cpt_cache_versions[cpt] = version
+        if cpt in st.session_state.cpt_stats:
+            st.session_state.cpt_stats[cpt]["analysis"] = analyze_cpt_data(posts)
+
+@st.fragment
+@profiled
+@traced()
 def render_cpt_explorer():
     """Render the custom post type explorer"""
+    if st.session_state.rerun_app:
+        st.session_state.rerun_app = False
+        st.rerun(scope="app")
+    
     # CPT selection
     if st.session_state.custom_post_types:
+        st.button(
+            "Load All Post Types",
+            key="cpt_load_all",
+            help="Fetch every page of every post type concurrently",
+            on_click=load_all_cpt_data
+        )
+        
         # Create a grid of buttons for CPT selection
         cols = st.columns(3)
         for i, cpt in enumerate(st.session_state.custom_post_types):
@@ -2104,23 +2967,15 @@ def render_cpt_explorer():
                 cpt_name = st.session_state.cpt_stats.get(cpt, {}).get("name", cpt.capitalize())
                 cpt_count = st.session_state.cpt_stats.get(cpt, {}).get("count", "?")
                 
-                # Create a card-like button
-                if st.button(
+                # Create a card-like button; selecting only reruns this fragment
+                st.button(
                     f"{cpt_name} ({cpt_count})",
                     key=f"cpt_select_{cpt}",
                     use_container_width=True,
-                    help=f"View and analyze {cpt_name} data"
-                ):
-                    st.session_state.selected_cpt = cpt
-                    # Fetch data if not already loaded
-                    if cpt not in st.session_state.cpt_data or not st.session_state.cpt_data[cpt]:
-                        posts = get_cpt_posts(cpt)
-                        if posts:
-                            st.session_state.cpt_data[cpt] = posts
-                            # Generate analysis
-                            analysis = analyze_cpt_data(posts)
-                            st.session_state.cpt_stats[cpt]["analysis"] = analysis
-                    st.experimental_rerun()
+                    help=f"View and analyze {cpt_name} data",
+                    on_click=select_cpt,
+                    args=(cpt,)
+                )
     else:
         st.info("No custom post types found. Click 'Refresh Data' in the sidebar to fetch content types.")
     
@@ -2128,18 +2983,34 @@ def render_cpt_explorer():
     if st.session_state.selected_cpt:
         cpt = st.session_state.selected_cpt
         cpt_name = st.session_state.cpt_stats.get(cpt, {}).get("name", cpt.capitalize())
+        sync_cpt_data_from_cache(cpt)
         
         st.markdown(f'<div class="subsection-header">{cpt_name} Explorer</div>', unsafe_allow_html=True)
         
-        # Check if we have data
-        if cpt in st.session_state.cpt_data and st.session_state.cpt_data[cpt]:
+        # Fetch data on first view, then render it in this same run
+        if not st.session_state.cpt_data.get(cpt):
+            with st.spinner(f"Loading {cpt_name} data..."):
+                load_cpt_data(cpt)
+        
+        if st.session_state.cpt_data.get(cpt):
             posts = st.session_state.cpt_data[cpt]
             
             # Create tabs for different views
-            data_tab1, data_tab2, data_tab3, data_tab4 = st.tabs(["Data Explorer", "Analysis", "Schema", "Integration"])
+            data_tab1, data_tab2, data_tab3, data_tab4, data_tab5 = st.tabs(
+                ["Data Explorer", "Analysis", "Schema", "Integration", "Bulk Edit"]
+            )
             
             with data_tab1:
-                render_cpt_data_explorer(cpt, posts)
+                total = max(st.session_state.cpt_stats.get(cpt, {}).get("count", 0), len(posts))
+                if st.toggle(
+                    "Virtualised grid",
+                    value=total > VIRTUAL_GRID_THRESHOLD,
+                    key=f"virtual_grid_{cpt}",
+                    help="Send only the visible window of rows and columns to the browser"
+                ):
+                    render_virtual_grid(cpt, posts)
+                else:
+                    render_cpt_data_explorer(cpt, posts)
             
             with data_tab2:
                 render_cpt_analysis(cpt)
@@ -2149,19 +3020,197 @@ def render_cpt_explorer():
             
             with data_tab4:
                 render_cpt_integration_options(cpt, posts)
+            
+            with data_tab5:
+                render_cpt_bulk_edit(cpt, posts)
         else:
-            # Fetch data
-            st.info(f"Loading {cpt_name} data...")
-            posts = get_cpt_posts(cpt)
-            if posts:
-                st.session_state.cpt_data[cpt] = posts
-                # Generate analysis
-                analysis = analyze_cpt_data(posts)
-                st.session_state.cpt_stats[cpt]["analysis"] = analysis
-                st.experimental_rerun()
-            else:
-                st.error(f"No data found for {cpt_name} or error fetching data.")
+            st.error(f"No data found for {cpt_name} or error fetching data.")
+
+def run_bulk_write(cpt: str, operations: List[bulk_writer.Operation], force: bool, concurrency: int,
+                   progress) -> bulk_writer.BulkResult:
+    """Apply operations through the batch endpoint and reflect the successful ones in the content cache"""
+    url = st.session_state.wordpress_url
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    
+    rest_base = st.session_state.cpt_stats.get(cpt, {}).get("rest_base", cpt)
+    writer = bulk_writer.BulkWriter(url, rest_base, auth_headers(url), force=force, concurrency=concurrency)
+    
+    def on_progress(done: int, total: int) -> None:
+        progress.progress(done / total if total else 1.0, text=f"{done:,} of {total:,} operations")
+    
+    with tracing.span("bulk_write", post_type=cpt, operations=len(operations)):
+        result = writer.apply(operations, on_progress=on_progress)
+    
+    bulk_writer.apply_to_cache(session_content_cache(), cpt, result.results)
+    if "count" in st.session_state.cpt_stats.get(cpt, {}):
+        created = sum(r.ok and r.operation.action == "create" for r in result.results)
+        deleted = sum(r.ok and r.operation.action == "delete" for r in result.results)
+        st.session_state.cpt_stats[cpt]["count"] += created - deleted
+        bump_state_version("cpt_stats")
+    for method, endpoint, status_code, seconds in writer.log:
+        log_api_request(endpoint, method, status_code, seconds)
+    return result
+
+@st.fragment
+@profiled
+@traced()
+def render_cpt_bulk_edit(cpt: str, posts: List[Dict]):
+    """Render the bulk create/update/delete form with a dry-run diff against the cached posts"""
+    st.markdown(
+        "Upload a CSV or JSON list of operations. `id` selects the post, `action` is "
+        "`create`, `update` or `delete` (default: update with an id, create without) "
+        "and every other column is sent as a field, e.g. `id,status,title`."
+    )
+    uploaded = st.file_uploader("Operations file", type=["csv", "json"], key=f"bulk_file_{cpt}")
+    if uploaded is None:
+        return
+    
+    try:
+        operations = bulk_writer.parse_operations(uploaded.getvalue(), uploaded.name.rsplit(".", 1)[-1].lower())
+    except bulk_writer.BulkError as e:
+        st.error(str(e))
+        return
+    
+    # Dry run: compare against the shared cache, which webhooks keep current
+    cached = session_content_cache().get_posts(cpt) or posts
+    preview = bulk_writer.diff(operations, cached)
+    counts = {}
+    for row in preview:
+        counts[row["status"]] = counts.get(row["status"], 0) + 1
+    
+    st.markdown('<div class="subsection-header">Dry Run</div>', unsafe_allow_html=True)
+    cols = st.columns(5)
+    for col, status in zip(cols, ["new", "change", "skip", "delete", "missing"]):
+        col.metric(status.capitalize(), counts.get(status, 0))
+    st.dataframe(pd.DataFrame(preview), use_container_width=True, hide_index=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        skip_unchanged = st.checkbox("Skip unchanged updates", value=True, key=f"bulk_skip_{cpt}")
+    with col2:
+        force = st.checkbox("Delete permanently", value=False, key=f"bulk_force_{cpt}",
+                            help="Otherwise deleted posts are moved to the trash")
+    with col3:
+        concurrency = st.slider("Requests in flight", 1, 8, bulk_writer.DEFAULT_CONCURRENCY, key=f"bulk_concurrency_{cpt}")
+    
+    if skip_unchanged:
+        operations = [op for op, row in zip(operations, preview) if row["status"] != "skip"]
+    
+    if st.button(f"Apply {len(operations):,} Operations", key=f"bulk_apply_{cpt}", type="primary",
+                 disabled=not operations):
+        progress = st.progress(0.0, text="Sending operations...")
+        st.session_state.bulk_results[cpt] = run_bulk_write(cpt, operations, force, concurrency, progress)
+        progress.empty()
+    
+    result = st.session_state.bulk_results.get(cpt)
+    if result is not None:
+        st.markdown('<div class="subsection-header">Last Run</div>', unsafe_allow_html=True)
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Succeeded", result.succeeded)
+        col2.metric("Failed", result.failed)
+        col3.metric("Operations/s", f"{result.operations_per_second:,.1f}")
+        col4.metric("Requests", result.requests, help=f"Mode: {result.mode}")
+        failures = [
+            {"action": r.operation.action, "id": r.operation.id, "status": r.status, "error": r.error}
+            for r in result.results if not r.ok
+        ]
+        if failures:
+            st.dataframe(pd.DataFrame(failures), use_container_width=True, hide_index=True)
+
+def fetch_cpt_page(post_type: str, page: int, per_page: int, params: Dict) -> Tuple[List[Dict], int]:
+    """Fetch one page of a post type and the collection total (X-WP-Total) for the virtual grid"""
+    url = st.session_state.wordpress_url
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    
+    rest_base = st.session_state.cpt_stats.get(post_type, {}).get("rest_base", post_type)
+    query = urllib.parse.urlencode(dict(params, per_page=per_page, page=page))
+    
+    headers = auth_headers(url)
+    
+    response = wordpress_get(f"{url}/wp-json/wp/v2/{rest_base}?{query}", headers, timeout=15)
+    if response.status_code != 200:
+        raise requests.HTTPError(f"{response.status_code} - {response.text[:200]}", response=response)
+    return response.data or [], int(response.headers.get("X-WP-Total", 0))
+
+def get_virtual_grid(cpt: str, posts: List[Dict]) -> VirtualGrid:
+    """The session's grid for a post type: local rows when all are loaded, REST pages otherwise"""
+    grids = st.session_state.setdefault("virtual_grids", {})
+    remote_total = st.session_state.cpt_stats.get(cpt, {}).get("count", 0)
+    use_rest = remote_total > len(posts)
+    
+    grid = grids.get(cpt)
+    stale = (
+        grid is None
+        or isinstance(grid.source, RestSource) != use_rest
+        or (not use_rest and grid.source.items is not posts)
+    )
+    if stale:
+        if use_rest:
+            source = RestSource(lambda page, per_page, params: fetch_cpt_page(cpt, page, per_page, params))
+        else:
+            source = ListSource(posts)
+        grid = grids[cpt] = VirtualGrid(source)
+    return grid
+
+@st.fragment
+@profiled
+@traced()
+def render_virtual_grid(cpt: str, posts: List[Dict]):
+    """Render a post type as a windowed grid that only ships the visible rows and columns"""
+    grid = get_virtual_grid(cpt, posts)
+    remote = isinstance(grid.source, RestSource)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if remote:
+            statuses = WP_POST_STATUSES
+        else:
+            statuses = sorted(set(post.get('status', 'unknown') for post in posts))
+        status = st.selectbox("Filter by Status", ["All"] + statuses, key=f"grid_status_{cpt}")
+    with col2:
+        sort = st.selectbox("Sort by", list(SORT_KEYS), key=f"grid_sort_{cpt}")
+    with col3:
+        grid.window = st.selectbox("Rows per window", GRID_WINDOW_SIZES, index=1, key=f"grid_window_{cpt}")
+    
+    try:
+        grid.source.configure(status=None if status == "All" else status, sort=sort)
+        available = grid.available_columns()
+        grid.columns = st.multiselect(
+            "Columns",
+            available,
+            default=grid.default_columns(),
+            key=f"grid_columns_{cpt}"
+        ) or grid.default_columns()
+        
+        # A filter can shrink the grid below the window the user was on
+        offset_key = f"grid_offset_{cpt}"
+        if st.session_state.get(offset_key, 1) > grid.window_count:
+            st.session_state[offset_key] = grid.window_count
+        window_index = st.number_input(
+            f"Window (of {grid.window_count:,})",
+            min_value=1,
+            max_value=grid.window_count,
+            step=1,
+            key=offset_key
+        )
+        grid.seek(int(window_index) - 1)
+        rows = grid.visible_rows()
+    except requests.RequestException as e:
+        st.error(f"Error loading rows: {str(e)}")
+        return
+    
+    first = grid.offset + 1 if rows else 0
+    st.caption(
+        f"Rows {first:,}–{grid.offset + len(rows):,} of {grid.total:,} "
+        f"({'REST API, ' + str(grid.source.cached_pages) + ' pages cached' if remote else 'local store'})"
+    )
+    st.dataframe(pd.DataFrame(rows, columns=grid.columns), use_container_width=True, hide_index=True)
 
+@st.fragment
+@profiled
+@traced()
 def render_cpt_data_explorer(cpt: str, posts: List[Dict]):
     """Render the data explorer for a custom post type"""
     # Data filtering options
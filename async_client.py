@@ -0,0 +1,295 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Deque, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+import requests
+
+import rate_limit
+import wp_http
+
+try:
+    import httpx
+except ImportError:  # Optional; falls back to wp_http on a bounded set of threads
+    httpx = None
+
+try:
+    import h2  # noqa: F401  (needed by httpx for HTTP/2)
+    HTTP2_AVAILABLE = httpx is not None
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Constants
+DEFAULT_CONCURRENCY = 16
+PER_PAGE = 100  # WordPress caps per_page at 100
+MAX_RETRIES = 2
+MAX_LOG_RECORDS = 1000
+EXCLUDED_POST_TYPES = ['revision', 'nav_menu_item', 'wp_block', 'wp_template', 'wp_template_part', 'wp_global_styles']
+
+
+class FetchResult:
+    """Decoded body, status and headers of one request"""
+
+    __slots__ = ("url", "status_code", "data", "headers", "seconds")
+
+    def __init__(self, url: str, status_code: int, data: Any, headers: Dict[str, str], seconds: float):
+        self.url = url
+        self.status_code = status_code
+        self.data = data
+        self.headers = headers
+        self.seconds = seconds
+
+    @property
+    def total(self) -> int:
+        return int(self.headers.get("X-WP-Total") or self.headers.get("x-wp-total") or 0)
+
+    @property
+    def total_pages(self) -> int:
+        return int(self.headers.get("X-WP-TotalPages") or self.headers.get("x-wp-totalpages") or 1)
+
+
+class AsyncWordPressClient:
+    """asyncio client for fanning out WordPress REST reads
+
+    With httpx installed, requests are multiplexed over one connection pool
+    (HTTP/2 when h2 is installed too) on the event loop; without it they run
+    through wp_http on worker threads, so circuit breakers also apply. Either
+    way requests pass through the site's rate_limit.SiteLimiter, shared with
+    wp_http, and at most ``concurrency`` are in flight.
+    Each finished request is appended to ``log`` as (url, status, seconds).
+    """
+
+    def __init__(self, site_url: str, headers: Optional[Dict[str, str]] = None,
+                 concurrency: int = DEFAULT_CONCURRENCY, timeout: float = 15):
+        if not site_url.startswith(('http://', 'https://')):
+            site_url = 'https://' + site_url
+        self.site_url = site_url.rstrip("/")
+        self.headers = headers or {}
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.log: Deque[Tuple[str, int, float]] = deque(maxlen=MAX_LOG_RECORDS)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._client = None
+
+    @property
+    def backend(self) -> str:
+        if httpx is None:
+            return "threads"
+        return "httpx (HTTP/2)" if HTTP2_AVAILABLE else "httpx"
+
+    def set_concurrency(self, concurrency: int) -> None:
+        """Change the in-flight bound; requests already waiting keep the old one"""
+        self.concurrency = concurrency
+        self._semaphore = None
+
+    def _bound(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "AsyncWordPressClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def get(self, path: str, params: Optional[Dict] = None,
+                  headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """GET ``path`` (relative to /wp-json) and decode it, retrying 429/503 after Retry-After"""
+        url = f"{self.site_url}/wp-json{path}"
+        if params:
+            url = f"{url}?{urlencode(params)}"
+        headers = headers if headers is not None else self.headers
+        async with self._bound():
+            for attempt in range(MAX_RETRIES + 1):
+                result = await self._send(url, headers)
+                self.log.append((url, result.status_code, result.seconds))
+                if result.status_code not in wp_http.RETRY_STATUSES or attempt == MAX_RETRIES:
+                    return result
+                delay = rate_limit.parse_retry_after(result.headers.get("Retry-After"))
+                await asyncio.sleep(min(delay if delay is not None else wp_http.RETRY_BACKOFF * 2 ** attempt,
+                                        rate_limit.MAX_RETRY_AFTER))
+        return result
+
+    async def _send(self, url: str, headers: Dict[str, str]) -> FetchResult:
+        if httpx is None:
+            # wp_http already retries 429s and hedges; one attempt here
+            response = await asyncio.to_thread(wp_http.get, url, headers=headers, timeout=self.timeout)
+            return FetchResult(url, response.status_code, response.data, dict(response.headers),
+                               response.timings["total_ms"] / 1000)
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE, timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency))
+        # The limiter blocks while the site is throttled, so wait for it off the event loop
+        limiter = rate_limit.get_limiter(url)
+        await asyncio.to_thread(limiter.acquire)
+        start = time.perf_counter()
+        try:
+            response = await self._client.get(url, headers=headers)
+        except BaseException:
+            limiter.release(None, None)
+            raise
+        seconds = time.perf_counter() - start
+        limiter.release(seconds, response.status_code,
+                        rate_limit.parse_retry_after(response.headers.get("Retry-After")))
+        try:
+            data = response.json() if response.content else None
+        except ValueError:
+            data = None
+        return FetchResult(url, response.status_code, data, dict(response.headers), seconds)
+
+    async def get_collection(self, rest_base: str, params: Optional[Dict] = None, max_pages: Optional[int] = None,
+                             headers: Optional[Dict[str, str]] = None) -> Tuple[List[Dict], int]:
+        """Every item of a paginated /wp/v2 collection and its X-WP-Total
+
+        Page 1 gives the page count; the remaining pages are fetched
+        concurrently. Raises requests.HTTPError if any page fails, rather than
+        return a partial collection that callers would cache as complete.
+        """
+        params = dict(params or {}, per_page=(params or {}).get("per_page", PER_PAGE))
+        first = await self.get(f"/wp/v2/{rest_base}", dict(params, page=1), headers)
+        if first.status_code != 200:
+            raise requests.HTTPError(f"{first.status_code} fetching {rest_base}")
+        pages = first.total_pages if max_pages is None else min(first.total_pages, max_pages)
+        rest = await asyncio.gather(*(self.get(f"/wp/v2/{rest_base}", dict(params, page=page), headers)
+                                      for page in range(2, pages + 1)))
+        failed = [(page, result.status_code) for page, result in enumerate(rest, start=2)
+                  if result.status_code != 200]
+        if failed:
+            raise requests.HTTPError(
+                f"{len(failed)} of {pages} pages of {rest_base} failed: "
+                + ", ".join(f"page {page} ({status_code})" for page, status_code in failed[:5])
+            )
+        items = list(first.data or [])
+        for result in rest:
+            items.extend(result.data or [])
+        return items, first.total or len(items)
+
+    async def get_cpt_posts(self, rest_base: str, params: Optional[Dict] = None,
+                            headers: Optional[Dict[str, str]] = None) -> Tuple[List[Dict], int]:
+        return await self.get_collection(rest_base, params, headers=headers)
+
+    async def get_taxonomy_terms(self, rest_base: str, params: Optional[Dict] = None,
+                                 headers: Optional[Dict[str, str]] = None) -> Tuple[List[Dict], int]:
+        return await self.get_collection(rest_base, params, headers=headers)
+
+    async def get_media_items(self, params: Optional[Dict] = None,
+                              headers: Optional[Dict[str, str]] = None) -> Tuple[List[Dict], int]:
+        return await self.get_collection("media", params, headers=headers)
+
+    async def get_collections(self, rest_bases: Sequence[str], params: Optional[Dict] = None,
+                              headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Several collections at once; a collection that fails maps to its exception"""
+        results = await asyncio.gather(*(self.get_collection(rest_base, params, headers=headers)
+                                         for rest_base in rest_bases), return_exceptions=True)
+        return dict(zip(rest_bases, results))
+
+    async def discover(self, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Site info, post types, taxonomies and media total, requested concurrently"""
+        site, types, taxonomies, media = await asyncio.gather(
+            self.get("", headers=headers),
+            self.get("/wp/v2/types", headers=headers),
+            self.get("/wp/v2/taxonomies", headers=headers),
+            self.get("/wp/v2/media", {"per_page": 1}, headers),
+        )
+        types_data = types.data if types.status_code == 200 and isinstance(types.data, dict) else {}
+        return {
+            "site": site.data if site.status_code == 200 else None,
+            "types": {name: data for name, data in types_data.items() if name not in EXCLUDED_POST_TYPES},
+            "taxonomies": taxonomies.data if taxonomies.status_code == 200 else {},
+            "media_total": media.total if media.status_code == 200 else 0,
+            "latency": {
+                "site": site.seconds, "types": types.seconds,
+                "taxonomies": taxonomies.seconds, "media": media.seconds,
+            },
+        }
+
+
+class _LoopThread:
+    """One event loop on a daemon thread, shared by every sync facade"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="wp-async-loop", daemon=True)
+        self.thread.start()
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+
+_loop: Optional[_LoopThread] = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> _LoopThread:
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                _loop = _LoopThread()
+    return _loop
+
+
+def run(coro: Awaitable, timeout: Optional[float] = None) -> Any:
+    """Run a coroutine on the shared background loop and wait for its result"""
+    return _get_loop().run(coro, timeout)
+
+
+class SyncWordPressClient:
+    """Blocking facade over AsyncWordPressClient for Streamlit code
+
+    Calls run on a shared background event loop, so the connection pool
+    survives between reruns and the script thread just waits for results.
+    """
+
+    def __init__(self, site_url: str, concurrency: int = DEFAULT_CONCURRENCY, timeout: float = 15):
+        self.client = AsyncWordPressClient(site_url, concurrency=concurrency, timeout=timeout)
+        self._loop = _get_loop()
+
+    @property
+    def site_url(self) -> str:
+        return self.client.site_url
+
+    @property
+    def backend(self) -> str:
+        return self.client.backend
+
+    def drain_log(self) -> List[Tuple[str, int, float]]:
+        """Requests finished since the last call, oldest first"""
+        records = []
+        while self.client.log:
+            records.append(self.client.log.popleft())
+        return records
+
+    def _run(self, coro: Awaitable) -> Any:
+        return self._loop.run(coro)
+
+    def discover(self, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        return self._run(self.client.discover(headers))
+
+    def get_cpt_posts(self, rest_base: str, params: Optional[Dict] = None,
+                      headers: Optional[Dict[str, str]] = None) -> Tuple[List[Dict], int]:
+        return self._run(self.client.get_cpt_posts(rest_base, params, headers))
+
+    def get_taxonomy_terms(self, rest_base: str, params: Optional[Dict] = None,
+                           headers: Optional[Dict[str, str]] = None) -> Tuple[List[Dict], int]:
+        return self._run(self.client.get_taxonomy_terms(rest_base, params, headers))
+
+    def get_media_items(self, params: Optional[Dict] = None,
+                        headers: Optional[Dict[str, str]] = None) -> Tuple[List[Dict], int]:
+        return self._run(self.client.get_media_items(params, headers))
+
+    def get_collections(self, rest_bases: Sequence[str], params: Optional[Dict] = None,
+                        headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        return self._run(self.client.get_collections(rest_bases, params, headers))
+
+    def close(self) -> None:
+        self._run(self.client.aclose())
@@ -0,0 +1,230 @@
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+import requests
+
+import wp_http
+from metrics import AUTH_TOKEN_REQUESTS
+
+# Constants
+JWT_TOKEN_PATH = "/wp-json/jwt-auth/v1/token"  # JWT Authentication for WP REST API
+OAUTH_TOKEN_PATH = "/oauth/token"  # WP OAuth Server; refresh_token grant
+REFRESH_MARGIN = 60  # seconds before expiry at which the next caller renews the token
+MAX_PROVIDERS = 64
+
+
+class AuthError(Exception):
+    """The auth endpoint refused to issue a token"""
+
+
+class Token(NamedTuple):
+    value: str
+    expires_at: Optional[float] = None  # epoch seconds; None if unknown
+    refresh_token: Optional[str] = None
+
+
+def decode_jwt_expiry(token: str) -> Optional[float]:
+    """The ``exp`` claim of a JWT (epoch seconds), or None if ``token`` is not a JWT or has no expiry
+
+    The signature is not verified; this is only used to schedule renewal.
+    """
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    payload = parts[1] + "=" * (-len(parts[1]) % 4)
+    try:
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+    except (ValueError, AttributeError):
+        return None
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+def basic_auth_header(username: str, password: str) -> str:
+    return "Basic " + base64.b64encode(f"{username}:{password}".encode()).decode()
+
+
+class CredentialProvider:
+    """Authorization headers for one WordPress site, computed once and reused
+
+    Three modes, picked from what is supplied:
+
+    - ``token``: a bearer token (OAuth2 access token or JWT). If it is a JWT,
+      its expiry is decoded and, given a ``refresh_token``, it is renewed.
+    - ``use_jwt``: username/password are exchanged for a JWT at the JWT
+      Authentication plugin's endpoint, cached until it expires.
+    - otherwise: HTTP Basic (application passwords).
+
+    Tokens are renewed lazily by the first call within ``refresh_margin``
+    seconds of expiry, so idle providers cost nothing and fetchers rarely
+    wait on an expired token. Renewal is single-flight: while one thread
+    renews, others keep using the still-valid token, or wait for the new one
+    if it has already expired. A 401 from wp_http for this provider's header
+    invalidates the token (see ``invalidate``).
+    """
+
+    def __init__(self, site_url: str, username: str = "", password: str = "", token: str = "",
+                 refresh_token: str = "", use_jwt: bool = False, refresh_margin: float = REFRESH_MARGIN,
+                 session: Optional[requests.Session] = None):
+        self.site_url = site_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.use_jwt = use_jwt
+        self.refresh_margin = refresh_margin
+        self.session = session
+        self.token_requests = 0
+        self._lock = threading.Lock()
+        self._token: Optional[Token] = None
+        self._headers: Dict[str, str] = {}
+        if token:
+            self._install(Token(token, decode_jwt_expiry(token), refresh_token or None))
+        elif username and password and not use_jwt:
+            self._headers = {"Authorization": basic_auth_header(username, password)}
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        token = self._token
+        return token.expires_at if token else None
+
+    def _can_renew(self, token: Optional[Token]) -> bool:
+        return bool((token and token.refresh_token) or (self.use_jwt and self.username and self.password))
+
+    @staticmethod
+    def _valid(token: Optional[Token]) -> bool:
+        return token is not None and (token.expires_at is None or token.expires_at > time.time())
+
+    def _expiring(self, token: Optional[Token]) -> bool:
+        return (token is not None and token.expires_at is not None
+                and token.expires_at - self.refresh_margin <= time.time())
+
+    def _current(self) -> Optional[Token]:
+        """The token to use now, renewing it if it has expired or is about to"""
+        token = self._token
+        if not self._can_renew(token):
+            return token
+        if not self._valid(token):
+            return self._renew(token)
+        if self._expiring(token):
+            self._renew_early(token)
+            return self._token
+        return token
+
+    def headers(self) -> Dict[str, str]:
+        """The Authorization header for the next request; do not mutate the returned dict"""
+        self._current()
+        return self._headers
+
+    def token(self) -> Optional[str]:
+        """A currently valid bearer token, requesting one if needed"""
+        token = self._current()
+        return token.value if token else None
+
+    def invalidate(self) -> None:
+        """Drop a token the server rejected (401); the next call requests a new one"""
+        with self._lock:
+            if self._token is not None and self._can_renew(self._token):
+                self._token = self._token._replace(expires_at=0)
+
+    def _renew(self, seen: Optional[Token]) -> Optional[Token]:
+        with self._lock:
+            return self._renew_locked(seen)
+
+    def _renew_early(self, seen: Token) -> None:
+        """Renew a token that is still valid, unless another thread already is"""
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._renew_locked(seen)
+        except (AuthError, requests.RequestException):
+            pass  # Keep the current token; the first call after it expires retries and raises
+        finally:
+            self._lock.release()
+
+    def _renew_locked(self, seen: Optional[Token]) -> Optional[Token]:
+        if self._token is not seen:
+            return self._token  # Renewed by another thread while this one waited
+        token = None
+        if seen is not None and seen.refresh_token:
+            try:
+                token = self._request_refresh(seen.refresh_token)
+            except (AuthError, requests.RequestException):
+                if not (self.use_jwt and self.username and self.password):
+                    raise
+        if token is None:
+            token = self._request_jwt()
+        self._install(token)
+        return token
+
+    def _install(self, token: Token) -> None:
+        self._token = token
+        self._headers = {"Authorization": f"Bearer {token.value}"}
+
+    def _post_token(self, path: str, grant: str, data: Dict[str, str]) -> Dict:
+        self.token_requests += 1
+        try:
+            response = wp_http.request("POST", f"{self.site_url}{path}", data=data, timeout=15,
+                                       session=self.session)
+        except requests.RequestException:
+            AUTH_TOKEN_REQUESTS.inc(grant=grant, result="error")
+            raise
+        body = response.data if isinstance(response.data, dict) else {}
+        if response.status_code != 200:
+            AUTH_TOKEN_REQUESTS.inc(grant=grant, result="rejected")
+            message = body.get("message") or body.get("error_description") or response.text[:200]
+            raise AuthError(f"{response.status_code} - {message}")
+        AUTH_TOKEN_REQUESTS.inc(grant=grant, result="issued")
+        return body
+
+    def _request_jwt(self) -> Token:
+        body = self._post_token(JWT_TOKEN_PATH, "password",
+                                {"username": self.username, "password": self.password})
+        value = body.get("token") or body.get("data", {}).get("token")
+        if not value:
+            raise AuthError("No token in the JWT endpoint's response")
+        return Token(value, decode_jwt_expiry(value), body.get("refresh_token"))
+
+    def _request_refresh(self, refresh_token: str) -> Token:
+        body = self._post_token(OAUTH_TOKEN_PATH, "refresh_token",
+                                {"grant_type": "refresh_token", "refresh_token": refresh_token})
+        value = body.get("access_token")
+        if not value:
+            raise AuthError("No access_token in the refresh response")
+        expires_at = decode_jwt_expiry(value)
+        if expires_at is None and body.get("expires_in"):
+            expires_at = time.time() + float(body["expires_in"])
+        return Token(value, expires_at, body.get("refresh_token") or refresh_token)
+
+
+_providers: "OrderedDict[tuple, CredentialProvider]" = OrderedDict()
+_providers_lock = threading.Lock()
+
+
+def get_provider(site_url: str, username: str = "", password: str = "", token: str = "",
+                 refresh_token: str = "", use_jwt: bool = False) -> CredentialProvider:
+    """The process-wide provider for these credentials, shared by every session and thread"""
+    key = (site_url.rstrip("/"), username, password, token, refresh_token, use_jwt)
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            provider = _providers[key] = CredentialProvider(*key)
+            while len(_providers) > MAX_PROVIDERS:
+                _providers.popitem(last=False)
+        else:
+            _providers.move_to_end(key)
+        return provider
+
+
+def invalidate_rejected(url: str, headers: Dict[str, str]) -> None:
+    """wp_http's 401 hook: invalidate the provider that issued the rejected Authorization header"""
+    authorization = headers.get("Authorization")
+    with _providers_lock:
+        providers = [provider for provider in _providers.values()
+                     if provider._headers.get("Authorization") == authorization]
+    for provider in providers:
+        provider.invalidate()
+
+
+wp_http.add_unauthorized_hook(invalidate_rejected)
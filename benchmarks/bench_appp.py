@@ -0,0 +1,177 @@
+"""Benchmark appp.py's fetchers, analyzers and generators against a mock WordPress
+
+    python benchmarks/bench_appp.py --sizes 1000 10000 100000 --output results.json
+
+The functions are loaded from appp.py's source without running the page
+(page config, CSS, widgets), and session state lives in Streamlit's bare
+mode. Results are printed (or written) as JSON for comparing runs.
+"""
+import argparse
+import ast
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import rate_limit
+from mock_wp_server import MAX_PER_PAGE, MockWordPressServer
+
+PAGE_SOURCE = os.path.join(ROOT, "appp.py")
+POST_TYPE = "post"
+TAXONOMY = "category"
+
+
+def load_page_functions(path: str = PAGE_SOURCE) -> Dict:
+    """Execute appp.py's imports, constants, session defaults and function
+    definitions (everything before the render_* views) into a namespace
+
+    Module-level calls such as st.set_page_config(), the CSS include and the
+    shared-resource start-up are skipped, and the webhook receiver is stubbed out.
+    """
+    with open(path) as f:
+        source = f.read()
+    # The views are not needed and the tail of the file may not parse on its own
+    lines = source[:source.index("def render_header")].splitlines()
+    while lines and lines[-1].startswith("@"):
+        lines.pop()  # Decorators of render_header
+    source = "\n".join(lines)
+    tree = ast.parse(source, path)
+    tree.body = [node for node in tree.body if isinstance(node, (
+        ast.Import, ast.ImportFrom, ast.Assign, ast.AnnAssign, ast.If, ast.FunctionDef))]
+    namespace = {"__name__": "appp_bench"}
+    exec(compile(tree, path, "exec"), namespace)
+    # generate_webhook_config would otherwise start the receiver on its port and store secrets
+    namespace["get_webhook_receiver"] = lambda: None
+    return namespace
+
+
+def timed(func: Callable, repeat: int) -> Dict:
+    """Run ``func`` ``repeat`` times and summarise wall times in ms"""
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return {
+        "min_ms": round(min(durations), 3),
+        "median_ms": round(statistics.median(durations), 3),
+        "max_ms": round(max(durations), 3),
+        "runs": repeat,
+        "_result": result,
+    }
+
+
+def fetch_all(fetch_page: Callable[[Dict], List[Dict]], total: int) -> List[Dict]:
+    """Walk every page of a collection through one of the page fetchers"""
+    items = []
+    for page in range(1, -(-total // MAX_PER_PAGE) + 1):
+        items.extend(fetch_page({"per_page": MAX_PER_PAGE, "page": page}))
+    return items
+
+
+def bench_size(page: Dict, size: int, args) -> Dict:
+    st = page["st"]
+    terms = max(size // 10, 1)
+    media = max(size // 5, 1)
+    with MockWordPressServer(posts=size, terms=terms, media=media, paragraphs=tuple(args.paragraphs),
+                             latency_ms=args.latency_ms, seed=args.seed) as server:
+        st.session_state.wordpress_url = server.url
+        rate_limit.configure(server.url, rate=args.rate_limit)
+        st.session_state.username = "benchmark"
+        st.session_state.password = "benchmark"
+        st.session_state.auth_token = ""
+        st.session_state.error_message = None
+
+        # Pre-render the pages so content generation is not counted as server time
+        for rest_base in ("posts", "categories", "media"):
+            server.pages.warm(rest_base)
+
+        results = {}
+
+        def record(name: str, func: Callable, repeat: int = args.repeat):
+            measurement = timed(func, repeat)
+            value = measurement.pop("_result")
+            results[name] = measurement
+            if st.session_state.error_message:
+                raise RuntimeError(f"{name}: {st.session_state.error_message}")
+            return value
+
+        record("fetch_site_info", page["fetch_site_info"])
+        record("fetch_wordpress_data", page["fetch_wordpress_data"])
+        posts = record("get_cpt_posts (all pages)", lambda: fetch_all(
+            lambda params: page["get_cpt_posts"](POST_TYPE, params), size), repeat=1)
+        term_list = record("get_taxonomy_terms (all pages)", lambda: fetch_all(
+            lambda params: page["get_taxonomy_terms"](TAXONOMY, params), terms), repeat=1)
+        record("get_media_items (all pages)", lambda: fetch_all(page["get_media_items"], media), repeat=1)
+
+        record("analyze_cpt_data", lambda: page["analyze_cpt_data"](posts))
+        record("analyze_taxonomy_data", lambda: page["analyze_taxonomy_data"](term_list))
+        node = record("convert_to_n8n_node", lambda: page["convert_to_n8n_node"](POST_TYPE, posts))
+        record("generate_n8n_workflow", lambda: page["generate_n8n_workflow"](POST_TYPE, node))
+        record("generate_zapier_integration", lambda: page["generate_zapier_integration"](POST_TYPE, posts))
+        record("generate_make_scenario", lambda: page["generate_make_scenario"](POST_TYPE, posts))
+        record("generate_webhook_config", lambda: page["generate_webhook_config"](POST_TYPE))
+
+        for name in ("get_cpt_posts (all pages)", "get_taxonomy_terms (all pages)", "get_media_items (all pages)"):
+            count = {"get_cpt_posts": size, "get_taxonomy_terms": terms, "get_media_items": media}[name.split()[0]]
+            results[name]["items"] = count
+            results[name]["items_per_s"] = round(count / (results[name]["median_ms"] / 1000), 1)
+
+    return {"posts": size, "terms": terms, "media": media, "results": results}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5, help="runs per in-memory step (fetch-all runs once)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="mock server delay per response")
+    parser.add_argument("--paragraphs", type=int, nargs=2, default=[3, 8], metavar=("MIN", "MAX"),
+                        help="HTML blocks per mock post body (payload size)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="client-side requests/s against the mock server (0: unlimited)")
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    page = load_page_functions()
+    report = {
+        "benchmark": "appp",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "latency_ms": args.latency_ms,
+        "paragraphs": args.paragraphs,
+        "seed": args.seed,
+        "rate_limit": args.rate_limit,
+        "sizes": [bench_size(page, size, args) for size in args.sizes],
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Cold-start import cost of appp.py and its heavy dependencies
+
+    python benchmarks/bench_startup.py --repeat 5 --output startup.json
+
+Each measurement runs in a fresh interpreter. "appp (definitions)" loads
+appp.py's imports, constants and functions the way bench_appp.py does, which
+is what every view pays before its first paint; the heavy modules it pulls
+in are listed so eager imports creeping back in show up in the results.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+HEAVY_MODULES = ["pandas", "numpy", "plotly.express", "plotly.graph_objects", "altair", "PIL.Image", "pyarrow"]
+
+TARGETS = {
+    "streamlit": "import streamlit",
+    "appp (definitions)": "from bench_appp import load_page_functions; load_page_functions()",
+}
+TARGETS.update({module: f"import {module}" for module in HEAVY_MODULES})
+
+PROBE = """
+import sys, time, json
+sys.path[:0] = [{root!r}, {bench!r}]
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(code: str) -> dict:
+    script = PROBE.format(root=ROOT, bench=BENCH_DIR, code=code, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, cwd=ROOT)
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(code: str, limit: int) -> list:
+    """Top modules by cumulative import time from ``python -X importtime``"""
+    script = PROBE.format(root=ROOT, bench=BENCH_DIR, code=code, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", script], capture_output=True,
+                            text=True, cwd=ROOT)
+    rows = []
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package", nested imports indented
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split(":", 1)[1].split("|")
+        if name.startswith("  "):
+            continue  # Imported by another module; counted in its parent's cumulative time
+        rows.append({"module": name.strip(), "cumulative_ms": round(int(cumulative_us) / 1000, 1)})
+    return sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest top-level imports to list for appp")
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    results = {}
+    for name, code in TARGETS.items():
+        runs = [measure(code) for _ in range(args.repeat)]
+        errors = [run["error"] for run in runs if "error" in run]
+        if errors:
+            results[name] = {"error": errors[0]}
+            continue
+        seconds = [run["seconds"] * 1000 for run in runs]
+        results[name] = {
+            "min_ms": round(min(seconds), 1),
+            "median_ms": round(statistics.median(seconds), 1),
+            "max_ms": round(max(seconds), 1),
+            "heavy_modules_loaded": runs[-1]["loaded"],
+        }
+
+    report = {
+        "benchmark": "startup",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+        "appp_slowest_imports": slowest_imports(TARGETS["appp (definitions)"], args.top),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
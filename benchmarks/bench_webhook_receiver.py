@@ -0,0 +1,116 @@
+"""Load benchmark for webhook_receiver using a local stand-in WordPress sender
+
+    python benchmarks/bench_webhook_receiver.py --events 20000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_cache import ContentCache
+from signing import SIGNATURE_HEADER, calculate_hash
+from webhook_receiver import WEBHOOK_PATH, WebhookReceiver
+
+SECRET = "benchmark-secret"
+
+
+def make_event(post_id: int) -> bytes:
+    """Build a payload shaped like the PHP snippet's save_post event"""
+    event = random.choice(["create", "update", "update", "update", "delete"])
+    payload = {"event": event, "post_type": "post", "post_id": post_id, "timestamp": "2024-01-01T00:00:00+00:00"}
+    if event != "delete":
+        payload["data"] = {
+            "ID": post_id,
+            "post_title": f"Post {post_id}",
+            "post_content": "<p>" + "lorem ipsum " * 50 + "</p>",
+            "post_status": "publish",
+            "post_name": f"post-{post_id}",
+            "post_type": "post",
+            "post_author": "1",
+            "post_date": "2024-01-01 00:00:00",
+            "post_modified": "2024-01-02 00:00:00",
+        }
+    return json.dumps(payload).encode("utf-8")
+
+
+async def sender(port: int, events: asyncio.Queue, latencies: list) -> None:
+    """One keep-alive connection sending signed events until the queue is empty"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while True:
+            try:
+                body = events.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            signature = calculate_hash(body.decode("utf-8"), SECRET)
+            request = (
+                f"POST {WEBHOOK_PATH} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                f"{SIGNATURE_HEADER}: {signature}\r\nContent-Length: {len(body)}\r\n\r\n"
+            ).encode("latin-1") + body
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def run(port: int, total: int, concurrency: int) -> list:
+    events = asyncio.Queue()
+    for i in range(total):
+        events.put_nowait(make_event(random.randint(1, max(total // 4, 1))))
+    latencies = []
+    await asyncio.gather(*(sender(port, events, latencies) for _ in range(concurrency)))
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    cache = ContentCache()
+    receiver = WebhookReceiver(cache, port=0, default_secret=SECRET).start()
+    try:
+        start = time.perf_counter()
+        latencies = asyncio.run(run(receiver.port, args.events, args.concurrency))
+        elapsed = time.perf_counter() - start
+    finally:
+        receiver.stop()
+
+    latencies.sort()
+    result = {
+        "benchmark": "webhook_receiver",
+        "events": len(latencies),
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "events_per_s": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(statistics.median(latencies) * 1000, 3),
+            "p95": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 3),
+            "p99": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+        },
+        "receiver": receiver.stats,
+        "cached_posts": len(cache.get_posts("post")),
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
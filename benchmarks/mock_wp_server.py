@@ -0,0 +1,190 @@
+"""Local stand-in for the WordPress REST API used by the benchmarks
+
+    python benchmarks/mock_wp_server.py --posts 10000 --latency-ms 20 --port 8089
+
+Serves /wp-json, /wp/v2/types, /wp/v2/taxonomies, /wp/v2/settings,
+/wp/v2/users/me and paginated post type, term, media and user collections
+with X-WP-Total / X-WP-TotalPages headers, like a real site would. Content
+comes from synthetic_data.SyntheticSite.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_data import DEFAULT_SEED, SyntheticSite
+
+MAX_PER_PAGE = 100  # WordPress caps per_page at 100
+DEFAULT_PER_PAGE = 10
+
+
+class PageCache:
+    """Encoded response bodies per (collection, page, per_page), so the
+    server spends its time on I/O rather than generating content"""
+
+    def __init__(self, site: SyntheticSite):
+        self.site = site
+        self._lock = threading.Lock()
+        self._pages: Dict[Tuple[str, int, int], Tuple[bytes, int]] = {}
+
+    def get(self, rest_base: str, page: int, per_page: int) -> Tuple[bytes, int]:
+        key = (rest_base, page, per_page)
+        cached = self._pages.get(key)
+        if cached is None:
+            items, total = self.site.page(rest_base, page, per_page)
+            cached = (json.dumps(items).encode("utf-8"), total)
+            with self._lock:
+                self._pages[key] = cached
+        return cached
+
+    def warm(self, rest_base: str, per_page: int = MAX_PER_PAGE) -> None:
+        total = self.site.collection_size(rest_base) or 0
+        for page in range(1, max(math.ceil(total / per_page), 1) + 1):
+            self.get(rest_base, page, per_page)
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like a real site behind nginx
+    disable_nagle_algorithm = True  # Headers and body are separate writes; avoid delayed-ACK stalls
+    pages: PageCache = None
+    latency: float = 0.0
+    base_url: str = ""
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        parts = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(parts.query))
+        path = parts.path.rstrip("/")
+
+        site = self.pages.site
+        if path == "/wp-json":
+            self._send_json({"name": "Mock WordPress", "description": "Benchmark stand-in", "url": self.base_url,
+                             "home": self.base_url, "gmt_offset": 0, "timezone_string": "UTC",
+                             "namespaces": ["wp/v2"]})
+        elif path == "/wp-json/wp/v2/types":
+            self._send_json(site.post_types())
+        elif path == "/wp-json/wp/v2/taxonomies":
+            self._send_json(site.taxonomies())
+        elif path == "/wp-json/wp/v2/settings":
+            self._send_json({"title": "Mock WordPress", "site_logo": 0})
+        elif path == "/wp-json/wp/v2/users/me":
+            self._send_json(site.author(1))
+        elif path.startswith("/wp-json/wp/v2/") and site.collection_size(path[len("/wp-json/wp/v2/"):]) is not None:
+            self._send_page(path[len("/wp-json/wp/v2/"):], query)
+        else:
+            self._send_json({"code": "rest_no_route", "message": "No route was found", "data": {"status": 404}}, 404)
+
+    def _send_page(self, rest_base: str, query: Dict[str, str]) -> None:
+        try:
+            per_page = int(query.get("per_page", DEFAULT_PER_PAGE))
+            page = int(query.get("page", 1))
+        except ValueError:
+            per_page, page = 0, 0
+        if not 1 <= per_page <= MAX_PER_PAGE or page < 1:
+            self._send_json({"code": "rest_invalid_param", "message": "Invalid parameter(s)", "data": {"status": 400}}, 400)
+            return
+        total = self.pages.site.collection_size(rest_base)
+        total_pages = max(math.ceil(total / per_page), 1)
+        if page > total_pages:
+            self._send_json({"code": "rest_post_invalid_page_number",
+                             "message": "The page number requested is larger than the number of pages available.",
+                             "data": {"status": 400}}, 400)
+            return
+        body, total = self.pages.get(rest_base, page, per_page)
+        self._send_body(body, headers={
+            "X-WP-Total": str(total),
+            "X-WP-TotalPages": str(total_pages),
+        })
+
+    def _send_json(self, data, status: int = 200, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send_body(json.dumps(data).encode("utf-8"), status, headers)
+
+    def _send_body(self, body: bytes, status: int = 200, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockWordPressServer:
+    """Threaded mock WordPress REST API on a local port
+
+        with MockWordPressServer(posts=10000, latency_ms=20) as server:
+            requests.get(f"{server.url}/wp-json/wp/v2/posts?per_page=100")
+    """
+
+    def __init__(self, posts: int = 1000, terms: int = 200, media: int = 500, paragraphs: Tuple[int, int] = (3, 8),
+                 latency_ms: float = 0.0, host: str = "127.0.0.1", port: int = 0, seed: int = DEFAULT_SEED):
+        self.site = SyntheticSite(seed, posts=posts, terms=terms, media=media, paragraphs=paragraphs)
+        self.pages = PageCache(self.site)
+        self.latency = latency_ms / 1000
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "MockWordPressServer":
+        handler = type("MockHandler", (_MockHandler,), {"pages": self.pages, "latency": self.latency})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        handler.base_url = self.url
+        threading.Thread(target=self._server.serve_forever, name="mock-wordpress", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "MockWordPressServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=1000, help="items per post type")
+    parser.add_argument("--terms", type=int, default=200, help="terms per taxonomy")
+    parser.add_argument("--media", type=int, default=500)
+    parser.add_argument("--paragraphs", type=int, nargs=2, default=[3, 8], metavar=("MIN", "MAX"),
+                        help="HTML blocks per post body (payload size)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every response")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    args = parser.parse_args()
+
+    server = MockWordPressServer(args.posts, args.terms, args.media, tuple(args.paragraphs), args.latency_ms,
+                                 args.host, args.port, args.seed).start()
+    print(f"Mock WordPress REST API on {server.url}/wp-json (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+import csv
+import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import requests
+
+import rate_limit
+import wp_http
+from feed_loader import flatten_record
+from metrics import BULK_OPERATIONS
+
+# Constants
+BATCH_SIZE = 25  # WordPress's default rest_get_max_batch_size
+BATCH_PATH = "/wp-json/batch/v1"
+DEFAULT_CONCURRENCY = 4  # batches (or single requests in fallback mode) in flight
+ACTIONS = ("create", "update", "delete")
+BATCH_UNSUPPORTED = (404, 405, 501)  # batch route missing (WordPress < 5.6 or disabled)
+# Writes are not idempotent, so only 429 (refused before any work) is resent. A 503 or gateway
+# timeout may arrive after WordPress committed the writes, and resending could duplicate creates.
+RETRY_STATUSES = (429,)
+MAX_RETRIES = 2
+
+
+class BulkError(Exception):
+    """The operations file could not be parsed"""
+
+
+class Operation(NamedTuple):
+    action: str
+    id: Optional[int]
+    fields: Dict[str, Any]
+
+    @property
+    def method(self) -> str:
+        return {"create": "POST", "update": "POST", "delete": "DELETE"}[self.action]
+
+    def path(self, rest_base: str) -> str:
+        return f"/wp/v2/{rest_base}" if self.action == "create" else f"/wp/v2/{rest_base}/{self.id}"
+
+
+class OperationResult(NamedTuple):
+    operation: Operation
+    status: int
+    body: Any
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    @property
+    def error(self) -> Optional[str]:
+        if self.ok:
+            return None
+        if isinstance(self.body, dict):
+            return self.body.get("message") or self.body.get("code") or str(self.body)
+        return str(self.body)
+
+
+class BulkResult(NamedTuple):
+    results: List[OperationResult]
+    mode: str  # "batch" or "individual"
+    requests: int
+    seconds: float
+
+    @property
+    def succeeded(self) -> int:
+        return sum(result.ok for result in self.results)
+
+    @property
+    def failed(self) -> int:
+        return len(self.results) - self.succeeded
+
+    @property
+    def operations_per_second(self) -> float:
+        return len(self.results) / self.seconds if self.seconds else 0.0
+
+
+# Input
+def _operation(row: Dict[str, Any]) -> Operation:
+    row = dict(row)
+    raw_id = row.pop("id", None)
+    post_id = int(raw_id) if raw_id not in (None, "") else None
+    action = (row.pop("action", None) or ("update" if post_id is not None else "create")).lower()
+    if action not in ACTIONS:
+        raise BulkError(f"Unknown action {action!r}; use one of {', '.join(ACTIONS)}")
+    if action != "create" and post_id is None:
+        raise BulkError(f"{action} needs an id")
+    return Operation(action, post_id, row)
+
+
+def _csv_value(value: str) -> Any:
+    """CSV cells holding JSON objects or arrays (meta, categories) are decoded; everything else stays text"""
+    if value[:1] in ("{", "["):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return value
+
+
+def parse_operations(data: bytes, fmt: str) -> List[Operation]:
+    """Read operations from CSV or JSON
+
+    Each row or object is one operation: ``id`` selects the post, ``action``
+    is create, update or delete (default: update when there is an id,
+    create otherwise) and every other field is sent as the request body.
+    Empty CSV cells are omitted rather than sent as empty strings.
+    """
+    text = data.decode("utf-8-sig")
+    try:
+        if fmt == "json":
+            rows = json.loads(text)
+            if isinstance(rows, dict):
+                rows = rows.get("operations", [rows])
+        elif fmt == "csv":
+            rows = [{key: _csv_value(value) for key, value in row.items() if key and value != ""}
+                    for row in csv.DictReader(io.StringIO(text))]
+        else:
+            raise BulkError(f"Unsupported format {fmt!r}; use csv or json")
+        return [_operation(row) for row in rows]
+    except (ValueError, TypeError, AttributeError) as e:
+        raise BulkError(f"Could not read operations: {e}") from e
+
+
+# Dry run
+def diff(operations: Iterable[Operation], cached: Sequence[Dict]) -> List[Dict[str, Any]]:
+    """What each operation would change, compared with the cached posts
+
+    Updates that change nothing are marked ``skip``; updates and deletes of
+    posts missing from the cache are marked ``missing`` (they may still
+    exist on the site if the cache is partial).
+    """
+    by_id = {post.get("id"): post for post in cached}
+    rows = []
+    for op in operations:
+        current = by_id.get(op.id)
+        if op.action == "create":
+            rows.append({"action": "create", "id": None, "status": "new",
+                         "changes": ", ".join(sorted(op.fields))})
+        elif current is None:
+            rows.append({"action": op.action, "id": op.id, "status": "missing", "changes": ""})
+        elif op.action == "delete":
+            rows.append({"action": "delete", "id": op.id, "status": "delete",
+                         "changes": str(flatten_record(current).get("title", ""))})
+        else:
+            flat = flatten_record(current)
+            changes = [
+                f"{key}: {flat.get(key)!r} → {value!r}"
+                for key, value in sorted(op.fields.items())
+                if flatten_record({key: value}).get(key) != flat.get(key)
+            ]
+            rows.append({"action": "update", "id": op.id, "status": "change" if changes else "skip",
+                         "changes": "; ".join(changes)})
+    return rows
+
+
+def _chunks(items: Sequence, size: int) -> List[Sequence]:
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+class BulkWriter:
+    """Apply create/update/delete operations to one post type
+
+    Operations are sent BATCH_SIZE at a time to /wp-json/batch/v1 with
+    ``concurrency`` batches in flight. If the site has no batch route, or a
+    route refuses batching (rest_batch_not_allowed), the affected operations
+    are sent as individual requests instead, also ``concurrency`` at a time.
+    Deletes move posts to the trash unless ``force`` is set.
+    """
+
+    def __init__(self, site_url: str, rest_base: str, headers: Dict[str, str], batch_size: int = BATCH_SIZE,
+                 concurrency: int = DEFAULT_CONCURRENCY, force: bool = False, timeout: float = 60):
+        if not site_url.startswith(('http://', 'https://')):
+            site_url = 'https://' + site_url
+        self.site_url = site_url.rstrip("/")
+        self.rest_base = rest_base
+        self.headers = headers
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.force = force
+        self.timeout = timeout
+        self.batch_supported: Optional[bool] = None
+        self.log: List[Tuple[str, str, int, float]] = []  # (method, url, status, seconds) of every request sent
+        self._done = 0
+        self._lock = threading.Lock()
+
+    def _request(self, method: str, url: str, body: Any) -> requests.Response:
+        """Send one write, resending only when the site refused it with 429"""
+        for attempt in range(MAX_RETRIES + 1):
+            response = wp_http.request(method, url, headers=self.headers, timeout=self.timeout, json=body)
+            with self._lock:
+                self.log.append((method, url, response.status_code, response.timings["total_ms"] / 1000))
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                return response
+            # wp_http's limiter has already paused the site for the Retry-After delay
+            delay = rate_limit.parse_retry_after(response.headers.get("Retry-After"))
+            if delay is None:
+                time.sleep(wp_http.RETRY_BACKOFF * 2 ** attempt)
+        return response
+
+    def _body(self, op: Operation) -> Dict[str, Any]:
+        return dict(op.fields, force=True) if op.action == "delete" and self.force else op.fields
+
+    def _send_one(self, op: Operation) -> OperationResult:
+        try:
+            response = self._request(op.method, f"{self.site_url}/wp-json{op.path(self.rest_base)}", self._body(op))
+            result = OperationResult(op, response.status_code, response.data)
+        except requests.RequestException as e:
+            result = OperationResult(op, 0, str(e))
+        return result
+
+    def _send_batch(self, chunk: Sequence[Operation]) -> Optional[List[OperationResult]]:
+        """Results for one chunk, or None when the site has no batch route"""
+        payload = {
+            "validation": "normal",
+            "requests": [{"method": op.method, "path": op.path(self.rest_base), "body": self._body(op)} for op in chunk],
+        }
+        try:
+            response = self._request("POST", f"{self.site_url}{BATCH_PATH}", payload)
+        except requests.RequestException as e:
+            return [OperationResult(op, 0, str(e)) for op in chunk]
+        if response.status_code in BATCH_UNSUPPORTED:
+            return None
+        responses = response.data.get("responses") if isinstance(response.data, dict) else None
+        if response.status_code != 207 and not responses:
+            return [OperationResult(op, response.status_code, response.data) for op in chunk]
+        # One response per request, in order; anything else cannot be matched up, so the whole chunk fails
+        if (not isinstance(responses, list) or len(responses) != len(chunk)
+                or not all(isinstance(item, dict) for item in responses)):
+            return [OperationResult(op, 0, f"Malformed batch response (HTTP {response.status_code})")
+                    for op in chunk]
+        results = []
+        for op, item in zip(chunk, responses):
+            body = item.get("body")
+            if isinstance(body, dict) and body.get("code") == "rest_batch_not_allowed":
+                results.append(self._send_one(op))  # this route opted out of batching
+            else:
+                results.append(OperationResult(op, item.get("status", 0), body))
+        return results
+
+    def apply(self, operations: Sequence[Operation],
+              on_progress: Optional[Callable[[int, int], None]] = None) -> BulkResult:
+        """Send every operation; results come back in input order"""
+        start = time.perf_counter()
+        self.log = []
+        self._done = 0
+        total = len(operations)
+
+        def progress(results: List[OperationResult]) -> List[OperationResult]:
+            with self._lock:
+                self._done += len(results)
+                done = self._done
+            if on_progress:
+                on_progress(done, total)
+            return results
+
+        def batch(chunk: Sequence[Operation]) -> List[OperationResult]:
+            results = self._send_batch(chunk) if self.batch_supported is not False else None
+            if results is None:
+                self.batch_supported = False
+                results = [self._send_one(op) for op in chunk]
+            else:
+                self.batch_supported = True
+            return progress(results)
+
+        chunks = _chunks(list(operations), self.batch_size)
+        results: List[OperationResult] = []
+        if chunks and self.batch_supported is None:
+            results.extend(batch(chunks.pop(0)))  # the first chunk tells us whether batching works
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="bulk-write") as pool:
+            if self.batch_supported:
+                for chunk_results in pool.map(batch, chunks):
+                    results.extend(chunk_results)
+            else:
+                for result in pool.map(self._send_one, [op for chunk in chunks for op in chunk]):
+                    results.append(progress([result])[0])
+        for result in results:
+            BULK_OPERATIONS.inc(action=result.operation.action, result="ok" if result.ok else "error")
+        return BulkResult(results, "batch" if self.batch_supported else "individual", len(self.log), time.perf_counter() - start)
+
+
+def apply_to_cache(content_cache, post_type: str, results: Iterable[OperationResult]) -> int:
+    """Reflect successful writes in a ContentCache; returns how many were applied
+
+    Created and updated posts are merged from the response bodies; deleted
+    posts are dropped whether they were trashed or deleted for good, as
+    neither is listed by the REST collection any more.
+    """
+    written = []
+    applied = 0
+    for result in results:
+        if not result.ok:
+            continue
+        if result.operation.action == "delete":
+            content_cache.delete(post_type, result.operation.id)
+            applied += 1
+        elif isinstance(result.body, dict) and "id" in result.body:
+            written.append(result.body)
+    if written:
+        content_cache.merge(post_type, written)
+    return applied + len(written)
@@ -0,0 +1,185 @@
+import hashlib
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+# Constants
+PUBLIC_STATUSES = ("publish",)  # statuses every credential scope may see
+
+
+class ContentCache:
+    """Process-wide, thread-safe store of posts keyed by post type and id
+
+    Every mutation bumps a per-post-type version counter so readers (the
+    Streamlit sessions) can tell cheaply whether their copy is stale.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._posts: Dict[str, Dict[int, Dict]] = {}
+        self._versions: Dict[str, int] = {}
+
+    def _bump(self, post_type: str) -> None:
+        self._versions[post_type] = self._versions.get(post_type, 0) + 1
+
+    def replace(self, post_type: str, posts: List[Dict]) -> None:
+        """Replace all cached posts of a type (e.g. after a full REST fetch)"""
+        with self._lock:
+            self._posts[post_type] = {post["id"]: post for post in posts if "id" in post}
+            self._bump(post_type)
+
+    def merge(self, post_type: str, posts: List[Dict]) -> None:
+        """Upsert a page of posts without dropping the ones already cached"""
+        with self._lock:
+            cached = self._posts.setdefault(post_type, {})
+            for post in posts:
+                if "id" in post:
+                    cached[post["id"]] = post
+            self._bump(post_type)
+
+    def upsert(self, post_type: str, post: Dict) -> None:
+        """Insert or update a single post"""
+        with self._lock:
+            self._posts.setdefault(post_type, {})[post["id"]] = post
+            self._bump(post_type)
+
+    def delete(self, post_type: str, post_id: int) -> bool:
+        """Remove a single post; returns False if it was not cached"""
+        with self._lock:
+            removed = self._posts.get(post_type, {}).pop(post_id, None) is not None
+            if removed:
+                self._bump(post_type)
+            return removed
+
+    def get_posts(self, post_type: str) -> List[Dict]:
+        """Return the cached posts of a type, newest first"""
+        with self._lock:
+            posts = list(self._posts.get(post_type, {}).values())
+        return sorted(posts, key=lambda post: post.get("date") or "", reverse=True)
+
+    def get_post(self, post_type: str, post_id: int) -> Optional[Dict]:
+        with self._lock:
+            return self._posts.get(post_type, {}).get(post_id)
+
+    def has(self, post_type: str) -> bool:
+        with self._lock:
+            return post_type in self._posts
+
+    def version(self, post_type: str) -> int:
+        with self._lock:
+            return self._versions.get(post_type, 0)
+
+    def versions(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._versions)
+
+    def apply_event(self, event: Dict) -> bool:
+        """Apply a create/update/delete webhook event sent by generate_webhook_config's PHP snippet
+
+        Events carry every post regardless of who may read it, so a post in a
+        non-public status is only updated in a cache that already holds it in
+        that status; otherwise it is removed.
+        """
+        post_type = event.get("post_type")
+        post_id = event.get("post_id")
+        if not post_type or post_id is None:
+            return False
+
+        if event.get("event") == "delete":
+            # Deleting a post we never cached is still a successful delivery
+            self.delete(post_type, int(post_id))
+            return True
+
+        data = event.get("data") or {}
+        post = wp_post_to_rest(int(post_id), data)
+        status = post.get("status", "publish")
+        cached = self.get_post(post_type, post["id"])
+        if status in PUBLIC_STATUSES or (cached is not None and cached.get("status") == status):
+            self.upsert(post_type, post)
+        else:
+            # A draft or private post is only kept where these credentials were already shown it in that status
+            self.delete(post_type, post["id"])
+        return True
+
+
+def wp_post_to_rest(post_id: int, data: Dict[str, Any]) -> Dict:
+    """Convert a get_post(ARRAY_A) row into the shape returned by /wp/v2/<rest_base>"""
+    if "post_title" not in data:
+        # Already REST-shaped (or empty)
+        return {**data, "id": post_id}
+
+    def gmt(value: Optional[str]) -> Optional[str]:
+        return value.replace(" ", "T") if value else value
+
+    return {
+        "id": post_id,
+        "date": gmt(data.get("post_date")),
+        "date_gmt": gmt(data.get("post_date_gmt")),
+        "modified": gmt(data.get("post_modified")),
+        "modified_gmt": gmt(data.get("post_modified_gmt")),
+        "slug": data.get("post_name", ""),
+        "status": data.get("post_status", "publish"),
+        "type": data.get("post_type", ""),
+        "link": data.get("guid", ""),
+        "title": {"rendered": data.get("post_title", "")},
+        "content": {"rendered": data.get("post_content", "")},
+        "excerpt": {"rendered": data.get("post_excerpt", "")},
+        "author": int(data.get("post_author") or 0),
+        "parent": int(data.get("post_parent") or 0),
+    }
+
+
+def site_key(site: str) -> str:
+    """Normalise a site URL so "example.com", "https://example.com/" and home_url() agree"""
+    site = site.strip().rstrip("/")
+    if "://" in site:
+        site = site.split("://", 1)[1]
+    return site.lower()
+
+
+_default_cache = ContentCache()
+_site_caches: Dict[Tuple[str, str], ContentCache] = {}
+_site_caches_lock = threading.Lock()
+
+
+def credential_scope(*credentials: str) -> str:
+    """Digest identifying the credentials content was fetched with; "" when anonymous
+
+    Sessions share a site's cache only when they logged in with the same
+    credentials, so nobody sees drafts or private posts fetched by another.
+    """
+    if not any(credentials):
+        return ""
+    return hashlib.sha256("\0".join(credentials).encode()).hexdigest()[:16]
+
+
+def get_content_cache(site: Optional[str] = None, scope: str = "") -> ContentCache:
+    """Return the process-wide content cache, or the one kept for ``site`` (a site URL) and credential ``scope``"""
+    if not site:
+        return _default_cache
+    key = (site_key(site), scope)
+    with _site_caches_lock:
+        cache = _site_caches.get(key)
+        if cache is None:
+            cache = _site_caches[key] = ContentCache()
+        return cache
+
+
+def site_caches(site: str) -> List[ContentCache]:
+    """Every credential scope's cache for ``site``"""
+    site = site_key(site)
+    with _site_caches_lock:
+        return [cache for (key, _), cache in _site_caches.items() if key == site]
+
+
+def all_site_caches() -> List[Tuple[str, str, ContentCache]]:
+    """(site, credential scope, cache) for every per-site cache in the process"""
+    with _site_caches_lock:
+        return [(site, scope, cache) for (site, scope), cache in _site_caches.items()]
+
+
+def drop_site_cache(site: str, scope: Optional[str] = None) -> None:
+    """Drop ``site``'s cache for one credential scope, or for all of them"""
+    site = site_key(site)
+    with _site_caches_lock:
+        for key in [key for key in _site_caches if key[0] == site and (scope is None or key[1] == scope)]:
+            del _site_caches[key]
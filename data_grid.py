@@ -0,0 +1,187 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Callable, Sequence, Tuple
+
+# Constants
+DEFAULT_WINDOW = 50  # rows sent to the browser at a time
+REST_PAGE_SIZE = 100  # WordPress caps per_page at 100
+MAX_CACHED_PAGES = 50
+DEFAULT_COLUMNS = ["id", "title", "status", "date", "modified", "author", "slug"]
+SORT_KEYS = {
+    "Date (Newest)": ("date", True),
+    "Date (Oldest)": ("date", False),
+    "Title (A-Z)": ("title", False),
+    "Title (Z-A)": ("title", True),
+    "ID (Ascending)": ("id", False),
+    "ID (Descending)": ("id", True),
+}
+
+
+def cell(value: Any) -> Any:
+    """Display value of one field: rendered text for WordPress {"rendered": ...} objects, JSON for other containers"""
+    if isinstance(value, dict) and "rendered" in value:
+        return value["rendered"]
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+def project(item: Dict, columns: Sequence[str]) -> Dict:
+    """Flatten only the requested columns of an item"""
+    return {column: cell(item.get(column)) for column in columns}
+
+
+def _sort_value(item: Dict, field: str) -> Any:
+    value = cell(item.get(field))
+    return (value is None, value if value is not None else "")
+
+
+class ListSource:
+    """Rows held locally (session state or the content cache), filtered and sorted by index
+
+    The filtered, sorted order is an array of indexes computed once per
+    (status, sort); windows are slices of it, so no row is copied until it is
+    projected for display.
+    """
+
+    def __init__(self, items: List[Dict]):
+        self.items = items
+        self._order: Optional[List[int]] = None
+        self._order_key: Optional[Tuple] = None
+
+    def configure(self, status: Optional[str] = None, sort: Optional[str] = None) -> None:
+        key = (status, sort, len(self.items))
+        if key == self._order_key:
+            return
+        indexes = range(len(self.items))
+        if status:
+            indexes = [i for i in indexes if self.items[i].get("status") == status]
+        indexes = list(indexes)
+        if sort in SORT_KEYS:
+            field, reverse = SORT_KEYS[sort]
+            indexes.sort(key=lambda i: _sort_value(self.items[i], field), reverse=reverse)
+        self._order = indexes
+        self._order_key = key
+
+    def total(self) -> int:
+        if self._order is None:
+            self.configure()
+        return len(self._order)
+
+    def rows(self, offset: int, limit: int) -> List[Dict]:
+        if self._order is None:
+            self.configure()
+        return [self.items[i] for i in self._order[offset:offset + limit]]
+
+    def sample(self) -> Optional[Dict]:
+        return self.items[0] if self.items else None
+
+
+class RestSource:
+    """Rows fetched from a paginated REST collection on demand, one page at a time
+
+    ``fetch_page(page, per_page, params)`` must return ``(items, total)``.
+    Pages are kept in a small LRU so scrolling back and forth is local.
+    Filtering and sorting are delegated to the API (status, orderby, order).
+    """
+
+    def __init__(self, fetch_page: Callable[[int, int, Dict], Tuple[List[Dict], int]],
+                 page_size: int = REST_PAGE_SIZE, max_pages: int = MAX_CACHED_PAGES):
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.params: Dict[str, Any] = {}
+        self._total: Optional[int] = None
+        self._pages: "OrderedDict[int, List[Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, status: Optional[str] = None, sort: Optional[str] = None) -> None:
+        params = {}
+        if status:
+            params["status"] = status
+        if sort in SORT_KEYS:
+            field, reverse = SORT_KEYS[sort]
+            params["orderby"] = field
+            params["order"] = "desc" if reverse else "asc"
+        if params != self.params:
+            self.params = params
+            with self._lock:
+                self._pages.clear()
+            self._total = None
+
+    def _page(self, page: int) -> List[Dict]:
+        with self._lock:
+            if page in self._pages:
+                self._pages.move_to_end(page)
+                return self._pages[page]
+        items, total = self.fetch_page(page, self.page_size, self.params)
+        with self._lock:
+            self._total = total
+            self._pages[page] = items
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        return items
+
+    def total(self) -> int:
+        if self._total is None:
+            self._page(1)
+        return self._total or 0
+
+    def rows(self, offset: int, limit: int) -> List[Dict]:
+        rows = []
+        first = offset // self.page_size + 1
+        last = (offset + limit - 1) // self.page_size + 1
+        for page in range(first, last + 1):
+            items = self._page(page)
+            rows.extend(items)
+            # Pages past X-WP-TotalPages are a 400 (rest_post_invalid_page_number), so stop at the end
+            if len(items) < self.page_size or page * self.page_size >= self.total():
+                break
+        start = offset - (first - 1) * self.page_size
+        return rows[start:start + limit]
+
+    def sample(self) -> Optional[Dict]:
+        rows = self.rows(0, 1)
+        return rows[0] if rows else None
+
+    @property
+    def cached_pages(self) -> int:
+        return len(self._pages)
+
+
+class VirtualGrid:
+    """A window over a (possibly huge) row source with column projection
+
+    Only ``window`` projected rows exist outside the source at any time,
+    which is all that is handed to the table widget.
+    """
+
+    def __init__(self, source, window: int = DEFAULT_WINDOW, columns: Optional[List[str]] = None):
+        self.source = source
+        self.window = window
+        self.columns = columns
+        self.offset = 0
+
+    def available_columns(self) -> List[str]:
+        sample = self.source.sample()
+        return list(sample.keys()) if sample else []
+
+    def default_columns(self) -> List[str]:
+        available = self.available_columns()
+        return [column for column in DEFAULT_COLUMNS if column in available] or available[:8]
+
+    @property
+    def total(self) -> int:
+        return self.source.total()
+
+    @property
+    def window_count(self) -> int:
+        return max((self.total + self.window - 1) // self.window, 1)
+
+    def seek(self, window_index: int) -> None:
+        self.offset = min(max(window_index, 0), self.window_count - 1) * self.window
+
+    def visible_rows(self) -> List[Dict]:
+        columns = self.columns or self.default_columns()
+        return [project(item, columns) for item in self.source.rows(self.offset, self.window)]
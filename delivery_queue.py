@@ -0,0 +1,378 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, List, Any, Optional
+
+import requests
+
+from rate_limit import parse_retry_after
+from signing import SIGNATURE_HEADER, calculate_hash
+
+# Constants
+DEFAULT_DB_PATH = os.environ.get("WP_HUB_OUTBOX_DB", "outbound_queue.db")
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_INTERVAL = 60  # seconds
+MAX_RETRY_INTERVAL = 3600  # seconds
+THROUGHPUT_WINDOW = 60  # seconds
+DELIVERED_RETENTION = 86400  # seconds a delivered row is kept for inspection
+PURGE_INTERVAL = 3600  # seconds between purges of old delivered rows
+DEFAULT_LEASE_TIMEOUT = 300  # seconds an in_flight claim is honoured before another worker may take it over
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id TEXT PRIMARY KEY,
+    idempotency_key TEXT UNIQUE NOT NULL,
+    target_url TEXT NOT NULL,
+    body TEXT NOT NULL,
+    headers TEXT NOT NULL,
+    auth TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    delivered_at REAL,
+    last_status_code INTEGER,
+    last_error TEXT,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+# Pending rows, and in_flight rows whose lease (claimed_at) ran out; the parameter is the expiry cutoff
+_CLAIMABLE = "(status = 'pending' OR (status = 'in_flight' AND (claimed_at IS NULL OR claimed_at < ?)))"
+
+
+class DeliveryQueue:
+    """Persistent outbound queue delivering signed JSON payloads with retries
+
+    Items move pending -> in_flight -> delivered, or to dead after
+    ``max_attempts`` failures (or a non-retryable response).
+
+    Several processes may share one database. Claiming an item leases it
+    for ``lease_timeout`` seconds; an item still in_flight after that (its
+    worker died) is claimed again by whichever worker gets to it first.
+
+    Credentials are never written to the database: a delivery names an auth
+    source registered with ``register_auth`` and its headers are built when
+    the request is sent, so a renewed token is picked up by later attempts.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        workers: int = 4,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_interval: float = DEFAULT_RETRY_INTERVAL,
+        timeout: float = 15,
+        lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+    ):
+        self.db_path = db_path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+        self.lease_timeout = lease_timeout  # must outlast a delivery, or live ones are sent twice
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._delivered_at = deque()
+        self._local = threading.local()
+        self._auth_sources: Dict[str, Any] = {}
+        self._last_purge = 0.0
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = [column[1] for column in self._conn.execute("PRAGMA table_info(outbox)")]
+        if "auth" not in columns:
+            self._conn.execute("ALTER TABLE outbox ADD COLUMN auth TEXT")  # outboxes created before auth sources
+        if "claimed_at" not in columns:
+            self._conn.execute("ALTER TABLE outbox ADD COLUMN claimed_at REAL")  # outboxes created before leases
+
+    # Producer side
+    def register_auth(self, name: str, source: Any) -> None:
+        """Make ``source`` (an auth_provider.CredentialProvider or anything with ``headers()``) usable as ``auth=name``"""
+        with self._lock:
+            self._auth_sources[name] = source
+
+    def enqueue(
+        self,
+        target_url: str,
+        payload: Any,
+        secret: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        idempotency_key: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        auth: Optional[str] = None,
+    ) -> str:
+        """Persist a payload for delivery and return its delivery id
+
+        Every call is a new delivery unless the caller passes an
+        ``idempotency_key``: enqueuing the same key twice returns the existing
+        id, whatever state that delivery is in (requeue dead ones with
+        retry_dead). ``headers`` are stored as given, so pass credentials as
+        ``auth``, the name of a source registered with register_auth.
+        """
+        body = json.dumps(payload, separators=(",", ":"), sort_keys=True)
+        delivery_id = str(uuid.uuid4())
+        idempotency_key = idempotency_key or delivery_id
+        request_headers = {"Content-Type": "application/json", "Idempotency-Key": idempotency_key}
+        request_headers.update(headers or {})
+        if secret:
+            request_headers[SIGNATURE_HEADER] = calculate_hash(body, secret)
+
+        now = time.time()
+        with self._wakeup:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO outbox "
+                "(id, idempotency_key, target_url, body, headers, auth, max_attempts, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (delivery_id, idempotency_key, target_url, body, json.dumps(request_headers), auth,
+                 max_attempts or self.max_attempts, now, now),
+            )
+            if cursor.rowcount == 0:
+                row = self._conn.execute(
+                    "SELECT id FROM outbox WHERE idempotency_key = ?", (idempotency_key,)
+                ).fetchone()
+                return row[0]
+            self._wakeup.notify()
+        return delivery_id
+
+    # Worker side
+    def start(self) -> "DeliveryQueue":
+        """Start the worker threads (idempotent)"""
+        if self._threads:
+            return self
+        self._stopping.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"delivery-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: float = 5) -> None:
+        """Stop the worker threads, leaving undelivered items in the queue"""
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _claim(self) -> Optional[Dict]:
+        """Atomically lease the next due (or abandoned) item, waiting until one is due"""
+        with self._wakeup:
+            while not self._stopping.is_set():
+                now = time.time()
+                expired = now - self.lease_timeout
+                row = self._conn.execute(
+                    "SELECT id, target_url, body, headers, auth, attempts, max_attempts FROM outbox "
+                    f"WHERE {_CLAIMABLE} AND (status = 'in_flight' OR next_attempt_at <= ?) "
+                    "ORDER BY next_attempt_at LIMIT 1",
+                    (expired, now),
+                ).fetchone()
+                if row:
+                    # Another process sharing the database may have claimed it since the SELECT
+                    claimed = self._conn.execute(
+                        f"UPDATE outbox SET status = 'in_flight', claimed_at = ? WHERE id = ? AND {_CLAIMABLE}",
+                        (now, row[0], expired),
+                    ).rowcount
+                    if not claimed:
+                        continue
+                    return {
+                        "id": row[0],
+                        "target_url": row[1],
+                        "body": row[2],
+                        "headers": json.loads(row[3]),
+                        "auth": row[4],
+                        "attempts": row[5],
+                        "max_attempts": row[6],
+                    }
+                next_due = self._conn.execute(
+                    "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'"
+                ).fetchone()[0]
+                wait = 1.0 if next_due is None else min(max(next_due - now, 0.01), 1.0)
+                self._wakeup.wait(wait)
+        return None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            if time.time() - self._last_purge > PURGE_INTERVAL:
+                self._last_purge = time.time()
+                try:
+                    self.purge_delivered()
+                except sqlite3.Error:
+                    pass  # Tried again next interval
+            item = self._claim()
+            if item is None:
+                return
+            try:
+                self._deliver(item)
+            except Exception as e:  # e.g. the database; put the item back rather than leave it in_flight
+                self._fail(item, item["attempts"] + 1, None, f"{type(e).__name__}: {e}", True, None)
+
+    def _request_headers(self, item: Dict) -> Dict[str, str]:
+        headers = dict(item["headers"])
+        if item["auth"]:
+            with self._lock:
+                source = self._auth_sources.get(item["auth"])
+            if source is None:
+                raise LookupError(f"auth source {item['auth']!r} is not registered in this process")
+            headers.update(source.headers())
+        return headers
+
+    def _deliver(self, item: Dict) -> None:
+        attempts = item["attempts"] + 1
+        status_code = None
+        retry_after = None
+        try:
+            response = self._session().post(
+                item["target_url"], data=item["body"].encode("utf-8"),
+                headers=self._request_headers(item), timeout=self.timeout
+            )
+            status_code = response.status_code
+            if response.ok:
+                self._mark_delivered(item["id"], attempts, status_code)
+                return
+            error = f"HTTP {status_code}: {response.text[:200]}"
+            retryable = status_code in RETRYABLE_STATUS_CODES
+            if status_code == 401 and item["auth"]:
+                retryable = self._invalidate_auth(item["auth"])
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        except Exception as e:  # network errors, but also an auth source failing or missing after a restart
+            error = str(e) if isinstance(e, requests.RequestException) else f"{type(e).__name__}: {e}"
+            retryable = True
+        self._fail(item, attempts, status_code, error, retryable, retry_after)
+
+    def _invalidate_auth(self, name: str) -> bool:
+        """Drop a rejected token so the next attempt gets a new one; False if the source cannot renew"""
+        with self._lock:
+            source = self._auth_sources.get(name)
+        invalidate = getattr(source, "invalidate", None)
+        if invalidate is None:
+            return False
+        invalidate()
+        return True
+
+    def _fail(self, item: Dict, attempts: int, status_code: Optional[int], error: str, retryable: bool,
+              retry_after: Optional[float]) -> None:
+        """Schedule the next attempt, or dead-letter the item when it cannot be retried"""
+        if retryable and attempts < item["max_attempts"]:
+            delay = min(retry_after, MAX_RETRY_INTERVAL) if retry_after is not None else self._backoff(attempts)
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE outbox SET status = 'pending', attempts = ?, next_attempt_at = ?, claimed_at = NULL, "
+                    "last_status_code = ?, last_error = ? WHERE id = ?",
+                    (attempts, time.time() + delay, status_code, error, item["id"]),
+                )
+        else:
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE outbox SET status = 'dead', attempts = ?, last_status_code = ?, last_error = ? "
+                    "WHERE id = ?",
+                    (attempts, status_code, error, item["id"]),
+                )
+
+    def _backoff(self, attempts: int) -> float:
+        """Exponential backoff with +/-20% jitter"""
+        delay = min(self.retry_interval * (2 ** (attempts - 1)), MAX_RETRY_INTERVAL)
+        return delay * random.uniform(0.8, 1.2)
+
+    def _mark_delivered(self, delivery_id: str, attempts: int, status_code: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'delivered', attempts = ?, delivered_at = ?, "
+                "last_status_code = ?, last_error = NULL WHERE id = ?",
+                (attempts, now, status_code, delivery_id),
+            )
+            self._delivered_at.append(now)
+
+    # Inspection and dead-letter handling
+    def get(self, delivery_id: str) -> Optional[Dict]:
+        """Return the stored state of a delivery"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT id, idempotency_key, target_url, status, attempts, max_attempts, created_at, "
+                "delivered_at, last_status_code, last_error FROM outbox WHERE id = ?",
+                (delivery_id,),
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([c[0] for c in cursor.description], row))
+
+    def dead_letters(self, limit: int = 50) -> List[Dict]:
+        """List the most recent dead-lettered deliveries"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT id, target_url, attempts, created_at, last_status_code, last_error FROM outbox "
+                "WHERE status = 'dead' ORDER BY created_at DESC LIMIT ?",
+                (limit,),
+            )
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def retry_dead(self, delivery_id: Optional[str] = None) -> int:
+        """Requeue one (or every) dead-lettered delivery; returns the number requeued"""
+        with self._wakeup:
+            if delivery_id:
+                cursor = self._conn.execute(
+                    "UPDATE outbox SET status = 'pending', attempts = 0, next_attempt_at = ? "
+                    "WHERE id = ? AND status = 'dead'",
+                    (time.time(), delivery_id),
+                )
+            else:
+                cursor = self._conn.execute(
+                    "UPDATE outbox SET status = 'pending', attempts = 0, next_attempt_at = ? WHERE status = 'dead'",
+                    (time.time(),),
+                )
+            self._wakeup.notify_all()
+            return cursor.rowcount
+
+    def purge_delivered(self, older_than: float = DELIVERED_RETENTION) -> int:
+        """Delete delivered rows older than ``older_than`` seconds"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM outbox WHERE status = 'delivered' AND delivered_at < ?",
+                (time.time() - older_than,),
+            )
+            return cursor.rowcount
+
+    def stats(self) -> Dict:
+        """Queue depth per status, delivery throughput and lag of the oldest pending item"""
+        now = time.time()
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+            oldest = self._conn.execute(
+                "SELECT MIN(created_at) FROM outbox WHERE status IN ('pending', 'in_flight')"
+            ).fetchone()[0]
+            while self._delivered_at and self._delivered_at[0] < now - THROUGHPUT_WINDOW:
+                self._delivered_at.popleft()
+            recent = len(self._delivered_at)
+
+        return {
+            "pending": counts.get("pending", 0),
+            "in_flight": counts.get("in_flight", 0),
+            "delivered": counts.get("delivered", 0),
+            "dead": counts.get("dead", 0),
+            "throughput_per_sec": round(recent / THROUGHPUT_WINDOW, 3),
+            "lag_seconds": round(now - oldest, 3) if oldest else 0.0,
+            "workers": len(self._threads),
+        }
+
@@ -0,0 +1,251 @@
+import csv
+import gzip
+import importlib.util
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, IO, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+import requests
+
+import wp_http
+from feed_loader import flatten_record
+
+# Constants
+EXPORT_DIR = os.environ.get("WP_HUB_EXPORT_DIR", "exports")
+PAGE_SIZE = 100  # WordPress caps per_page at 100
+EXPORT_MAX_AGE = 24 * 60 * 60  # seconds an export file is kept in EXPORT_DIR before it is pruned
+FETCH_WINDOW = 4  # REST pages requested ahead of the writer; bounds memory to this many pages
+FORMATS = {"csv": ".csv", "ndjson": ".ndjson", "parquet": ".parquet"}
+TEXT_COMPRESSIONS = [None, "gzip"]
+PARQUET_COMPRESSIONS = ["snappy", "zstd", "gzip", None]
+
+Page = Tuple[List[Dict], int]  # (items, collection total)
+
+
+class ExportError(Exception):
+    """The export could not be written (unsupported format, missing pyarrow, type clash)"""
+
+
+class ExportResult(NamedTuple):
+    path: str
+    rows: int
+    bytes: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def parquet_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+# Sources
+def iter_rest_pages(fetch_page: Callable[[int, int, Dict], Page], per_page: int = PAGE_SIZE,
+                    params: Optional[Dict] = None, window: int = FETCH_WINDOW) -> Iterator[Page]:
+    """Yield a REST collection page by page, in order, keeping up to ``window`` requests in flight
+
+    ``fetch_page(page, per_page, params)`` returns ``(items, total)`` as for
+    data_grid.RestSource. Page 1 is fetched first to learn the total.
+    """
+    params = params or {}
+    items, total = fetch_page(1, per_page, params)
+    yield items, total
+    pages = (total + per_page - 1) // per_page
+    if pages <= 1:
+        return
+    with ThreadPoolExecutor(max_workers=window, thread_name_prefix="export-fetch") as pool:
+        pending = deque()
+        next_page = 2
+        while pending or next_page <= pages:
+            while next_page <= pages and len(pending) < window:
+                pending.append(pool.submit(fetch_page, next_page, per_page, params))
+                next_page += 1
+            yield pending.popleft().result()[0], total
+
+
+def rest_page_fetcher(site_url: str, rest_base: str, headers: Dict[str, str], timeout: float = 15,
+                      log: Optional[Deque[Tuple[str, int, float]]] = None) -> Callable[[int, int, Dict], Page]:
+    """A ``fetch_page`` for iter_rest_pages that is safe to call from worker threads
+
+    Requests go through wp_http (rate limits, breakers, coalescing); each is
+    appended to ``log`` as (url, status, seconds) when given.
+    """
+    def fetch_page(page: int, per_page: int, params: Dict) -> Page:
+        url = f"{site_url}/wp-json/wp/v2/{rest_base}?{urlencode(dict(params, per_page=per_page, page=page))}"
+        response = wp_http.get(url, headers=headers, timeout=timeout)
+        if log is not None:
+            log.append((url, response.status_code, response.timings["total_ms"] / 1000))
+        if response.status_code != 200:
+            raise requests.HTTPError(f"{response.status_code} - {response.text[:200]}", response=response)
+        return response.data or [], int(response.headers.get("X-WP-Total", 0))
+    return fetch_page
+
+
+def iter_list_pages(items: Sequence[Dict], page_size: int = PAGE_SIZE) -> Iterator[Page]:
+    """Yield items already in memory (the content cache) in pages"""
+    total = len(items)
+    for start in range(0, total, page_size):
+        yield list(items[start:start + page_size]), total
+
+
+# Writers
+def _open_text(path: str, compression: Optional[str]) -> IO[str]:
+    if compression == "gzip":
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+class _CsvWriter:
+    """Header from ``columns`` or the first page; keys that appear later are dropped"""
+
+    def __init__(self, path: str, compression: Optional[str], columns: Optional[List[str]]):
+        self.file = _open_text(path, compression)
+        self.columns = columns
+        self.writer: Optional[csv.DictWriter] = None
+
+    def write(self, rows: List[Dict]) -> None:
+        if self.writer is None:
+            if self.columns is None:
+                self.columns = list(dict.fromkeys(key for row in rows for key in row))
+            self.writer = csv.DictWriter(self.file, fieldnames=self.columns, extrasaction="ignore")
+            self.writer.writeheader()
+        self.writer.writerows(rows)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class _NdjsonWriter:
+    def __init__(self, path: str, compression: Optional[str], columns: Optional[List[str]]):
+        self.file = _open_text(path, compression)
+        self.columns = columns
+
+    def write(self, rows: List[Dict]) -> None:
+        if self.columns is not None:
+            rows = [{column: row.get(column) for column in self.columns} for row in rows]
+        self.file.write("".join(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n" for row in rows))
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class _ParquetWriter:
+    """One row group per page; the schema is inferred from the first page
+
+    Columns that are all null in the first page become strings, and values
+    that do not match a string column are stored as their JSON text. Later
+    pages are cast to that schema with Arrow's safe casts, so a value that
+    would change (1.5 in an integer column) raises ExportError instead of
+    being truncated.
+    """
+
+    def __init__(self, path: str, compression: Optional[str], columns: Optional[List[str]]):
+        if not parquet_available():
+            raise ExportError("Parquet export needs pyarrow (pip install pyarrow)")
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        self.compression = compression or "none"
+        self.columns = columns
+        self.schema = None
+        self.writer = None
+
+    def _stringify(self, rows: List[Dict]) -> List[Dict]:
+        string_columns = [field.name for field in self.schema if self.pa.types.is_string(field.type)]
+        for row in rows:
+            for column in string_columns:
+                value = row.get(column)
+                if value is not None and not isinstance(value, str):
+                    row[column] = json.dumps(value)
+        return rows
+
+    def write(self, rows: List[Dict]) -> None:
+        pa = self.pa
+        if self.columns is not None:
+            rows = [{column: row.get(column) for column in self.columns} for row in rows]
+        if self.schema is None:
+            inferred = pa.Table.from_pylist(rows).schema
+            self.schema = pa.schema([
+                pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field for field in inferred
+            ])
+            self.writer = self.pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+        try:
+            page = pa.Table.from_pylist(self._stringify(rows))
+            table = pa.Table.from_arrays([
+                page.column(field.name).cast(field.type, safe=True) if field.name in page.column_names
+                else pa.nulls(page.num_rows, field.type)
+                for field in self.schema
+            ], schema=self.schema)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+            raise ExportError(f"Page does not match the columns inferred from the first page: {e}") from e
+        self.writer.write_table(table)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+WRITERS = {"csv": _CsvWriter, "ndjson": _NdjsonWriter, "parquet": _ParquetWriter}
+
+
+def export_path(name: str, fmt: str, compression: Optional[str] = None, directory: str = EXPORT_DIR) -> str:
+    suffix = FORMATS[fmt] + (".gz" if compression == "gzip" and fmt != "parquet" else "")
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(directory, f"{name}-{stamp}{suffix}")
+
+
+def prune_exports(directory: str = EXPORT_DIR, max_age: float = EXPORT_MAX_AGE) -> int:
+    """Delete exports (and .part files of abandoned ones) older than ``max_age``; returns how many"""
+    if not os.path.isdir(directory):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for entry in os.scandir(directory):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:  # removed concurrently by another session
+            continue
+    return removed
+
+
+def export(pages: Iterator[Page], path: str, fmt: str, compression: Optional[str] = None,
+           columns: Optional[List[str]] = None,
+           on_progress: Optional[Callable[[int, int], None]] = None) -> ExportResult:
+    """Write pages of WordPress items to ``path`` as they arrive
+
+    Items are flattened (``{"rendered": ...}`` fields become their rendered
+    value, other nested values compact JSON). Only the page being written and
+    whatever the source prefetches are held in memory. The file is written
+    under a temporary name and renamed when complete.
+    """
+    if fmt not in WRITERS:
+        raise ExportError(f"Unsupported format {fmt!r}; choose one of {', '.join(WRITERS)}")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.part"
+    start = time.perf_counter()
+    rows = 0
+    writer = WRITERS[fmt](tmp, compression, columns)
+    try:
+        for items, total in pages:
+            if items:
+                writer.write([flatten_record(item) for item in items])
+            rows += len(items)
+            if on_progress:
+                on_progress(rows, total)
+    except BaseException:
+        writer.close()
+        os.remove(tmp)
+        raise
+    writer.close()
+    os.replace(tmp, path)
+    return ExportResult(path, rows, os.path.getsize(path), time.perf_counter() - start)
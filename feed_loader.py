@@ -0,0 +1,205 @@
+import codecs
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Any, Optional, Callable, Iterable, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Constants
+DEFAULT_MAX_WORKERS = 32
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_STRING_END = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r"[ \t\n\r,\]]")
+_local = threading.local()
+
+
+class _ValueEnd:
+    """Finds where one JSON value ends, across chunks, without decoding it
+
+    Only brackets, quotes and escapes are inspected, so each character is
+    scanned once however many chunks the value spans.
+    """
+
+    def __init__(self, first: str):
+        self.scalar = first not in '[{"'
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+
+    def find(self, text: str, position: int) -> Optional[int]:
+        """Index just past the value in ``text``, or None if it continues in the next chunk"""
+        if self.scalar:
+            match = _SCALAR_END.search(text, position)
+            return match.start() if match else None
+        while position < len(text):
+            if self.escape:
+                self.escape = False
+                position += 1
+            elif self.in_string:
+                match = _STRING_END.search(text, position)
+                if not match:
+                    return None
+                position = match.end()
+                if match.group() == "\\":
+                    self.escape = True
+                else:
+                    self.in_string = False
+                    if self.depth == 0:
+                        return position
+            else:
+                match = _STRUCTURE.search(text, position)
+                if not match:
+                    return None
+                position = match.end()
+                char = match.group()
+                if char == '"':
+                    self.in_string = True
+                elif char in "[{":
+                    self.depth += 1
+                else:
+                    self.depth -= 1
+                    if self.depth == 0:
+                        return position
+        return None
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array as they arrive
+
+    Only one element (plus one network chunk) is held in memory at a time.
+    An element split across chunks is collected piecewise and decoded once
+    it closes. A top-level value that is not an array is yielded whole.
+    """
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    pending: List[str] = []  # earlier pieces of the element (or non-array document) being read
+    value_end: Optional[_ValueEnd] = None
+    started = False
+    whole_document = False
+    chunks = iter(chunks)
+    exhausted = False
+
+    while not exhausted:
+        try:
+            text = text_decoder.decode(next(chunks))
+        except StopIteration:
+            text = text_decoder.decode(b"", final=True)
+            exhausted = True
+        if whole_document:
+            pending.append(text)
+            continue
+
+        position = 0
+        while position < len(text):
+            if value_end is None:
+                while position < len(text) and text[position] in WHITESPACE:
+                    position += 1
+                if position >= len(text):
+                    break
+                char = text[position]
+                if not started:
+                    if char != "[":
+                        whole_document = True  # Not an array: wait for the whole document
+                        pending.append(text[position:])
+                        break
+                    started = True
+                    position += 1
+                    continue
+                if char == "]":
+                    return
+                if char == ",":
+                    position += 1
+                    continue
+                value_end = _ValueEnd(char)
+
+            end = value_end.find(text, position)
+            if end is None:
+                pending.append(text[position:])  # Element is split across chunks
+                break
+            pending.append(text[position:end])
+            element = "".join(pending)
+            pending = []
+            value_end = None
+            position = end
+            yield json.loads(element)
+
+    if whole_document:
+        yield json.loads("".join(pending))
+    elif started:
+        raise json.JSONDecodeError("Unterminated JSON array", "".join(pending), 0)
+
+
+def _session(max_workers: int) -> requests.Session:
+    """One keep-alive session per worker thread"""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.mount("http://", HTTPAdapter(pool_maxsize=max_workers))
+        session.mount("https://", HTTPAdapter(pool_maxsize=max_workers))
+        _local.session = session
+    return session
+
+
+def stream_json(url: str, timeout: float = 30, max_workers: int = DEFAULT_MAX_WORKERS,
+                headers: Optional[Dict] = None) -> Iterator[Any]:
+    """Stream a remote JSON document, yielding array elements one by one"""
+    with _session(max_workers).get(url, stream=True, timeout=timeout, headers=headers) as response:
+        response.raise_for_status()
+        yield from iter_json_array(response.iter_content(CHUNK_SIZE))
+
+
+def fetch_json_urls(
+    urls: List[str],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout: float = 30,
+    headers: Optional[Dict] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """Fetch many .json URLs through a bounded pool and aggregate their records
+
+    Returns {"rows": [...], "errors": [{"url", "error"}], "files": n}. Each
+    row is flattened with flatten_record and tagged with its source URL.
+    """
+    def load(url: str) -> List[Dict]:
+        return [dict(flatten_record(item), _source=url) for item in stream_json(url, timeout, max_workers, headers)]
+
+    rows: List[Dict] = []
+    errors: List[Dict] = []
+    done = 0
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="json-feed") as executor:
+        futures = {executor.submit(load, url): url for url in urls}
+        for future in as_completed(futures):
+            done += 1
+            try:
+                rows.extend(future.result())
+            except Exception as e:
+                errors.append({"url": futures[future], "error": str(e)})
+            if on_progress:
+                on_progress(done, len(urls))
+
+    return {"rows": rows, "errors": errors, "files": len(urls)}
+
+
+def flatten_record(item: Any) -> Dict:
+    """Turn a JSON value into a flat table row
+
+    WordPress ``{"rendered": ...}`` fields collapse to their rendered value;
+    other nested values are kept as compact JSON strings.
+    """
+    if not isinstance(item, dict):
+        return {"value": item if isinstance(item, (str, int, float, bool)) or item is None else json.dumps(item)}
+
+    row = {}
+    for key, value in item.items():
+        if isinstance(value, dict) and "rendered" in value:
+            row[key] = value["rendered"]
+        elif isinstance(value, (dict, list)):
+            row[key] = json.dumps(value, separators=(",", ":"))
+        else:
+            row[key] = value
+    return row
@@ -0,0 +1,61 @@
+import importlib
+import sys
+import threading
+from typing import Any, Callable
+
+_lock = threading.Lock()
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access
+
+        pd = LazyModule("pandas")   # nothing imported yet
+        pd.DataFrame(rows)          # pandas is imported here, once
+    """
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_name"])
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    """Return ``name`` itself if it is already imported, else a LazyModule"""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def lazy_callable(module: str, name: str) -> Callable:
+    """A function standing in for ``from module import name`` until first call"""
+    lazy = LazyModule(module)
+
+    def call(*args, **kwargs):
+        return getattr(lazy, name)(*args, **kwargs)
+    call.__name__ = name
+    call.__qualname__ = name
+    return call
+
+
+def is_loaded(name: str) -> bool:
+    return name in sys.modules
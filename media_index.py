@@ -0,0 +1,244 @@
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+import exporter
+import wp_http
+from content_cache import site_key
+from single_flight import SingleFlight
+
+# Constants
+MEDIA_DIR = os.environ.get("WP_HUB_MEDIA_DIR", "media_cache")
+CRAWL_WINDOW = 8  # media pages in flight while indexing
+MEDIA_FIELDS = "id,date,title,mime_type,media_type,post,source_url,media_details"
+THUMBNAIL_SIZE = (160, 160)
+THUMBNAIL_WORKERS = 8
+THUMBNAIL_QUALITY = 80
+THUMBNAIL_TIMEOUT = 30
+SIZE_CLASSES = [  # (label, upper bound in bytes)
+    ("< 100 KB", 100 * 1024),
+    ("100 KB – 1 MB", 1024 * 1024),
+    ("1 – 10 MB", 10 * 1024 * 1024),
+    ("> 10 MB", float("inf")),
+]
+
+
+def pil_available() -> bool:
+    return importlib.util.find_spec("PIL") is not None
+
+
+def site_directory(site_url: str, root: str = MEDIA_DIR, scope: str = "") -> str:
+    """A site's media directory; ``scope`` (content_cache.credential_scope) keeps logged-in indexes apart"""
+    name = site_key(site_url).replace("/", "_").replace(":", "_")
+    return os.path.join(root, f"{name}-{scope}" if scope else name)
+
+
+def media_record(item: Dict) -> Dict:
+    """The indexed fields of one /wp/v2/media item
+
+    ``filesize`` comes from media_details (WordPress 6.0+) and is 0 when the
+    site does not report it. ``thumbnail_url`` prefers WordPress's own medium
+    or thumbnail rendition so previews never download the original.
+    """
+    details = item.get("media_details") or {}
+    sizes = details.get("sizes") or {}
+    rendition = sizes.get("medium") or sizes.get("thumbnail") or {}
+    title = item.get("title")
+    return {
+        "id": item.get("id"),
+        "title": title.get("rendered", "") if isinstance(title, dict) else title or "",
+        "date": item.get("date"),
+        "mime_type": item.get("mime_type") or "unknown",
+        "media_type": item.get("media_type") or "file",
+        "filesize": int(details.get("filesize") or 0),
+        "width": details.get("width"),
+        "height": details.get("height"),
+        "post": item.get("post") or None,
+        "source_url": item.get("source_url"),
+        "thumbnail_url": rendition.get("source_url") or (item.get("source_url")
+                                                         if item.get("media_type") == "image" else None),
+    }
+
+
+class ThumbnailCache:
+    """Small JPEG previews of media items kept on disk
+
+    Thumbnails are generated on a bounded pool the first time they are
+    asked for and reused afterwards, across reruns and restarts. Concurrent
+    requests for the same image (several sessions browsing one page) share
+    one download. Without PIL, WordPress's own rendition is stored as is.
+    Uploads are static files rather than REST calls, so they are fetched on
+    wp_http's pooled session directly: no REST rate limiter, and no per-URL
+    breakers, latency trackers or metric series. The pool size bounds the
+    load instead.
+    """
+
+    def __init__(self, directory: str, size: Tuple[int, int] = THUMBNAIL_SIZE, workers: int = THUMBNAIL_WORKERS):
+        self.directory = directory
+        self.size = size
+        self.workers = workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._flights = SingleFlight()
+
+    def path_for(self, url: str) -> str:
+        suffix = ".jpg" if pil_available() else (os.path.splitext(urlsplit(url).path)[1] or ".img")
+        return os.path.join(self.directory, hashlib.sha1(url.encode()).hexdigest() + suffix)
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="thumbnail")
+        return self._pool
+
+    def _generate(self, url: str, headers: Dict[str, str]) -> Optional[str]:
+        path = self.path_for(url)
+        if os.path.exists(path):
+            return path
+        response = wp_http.get_session().get(url, headers=headers, timeout=THUMBNAIL_TIMEOUT)
+        if response.status_code != 200:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.part"
+        if pil_available():
+            from PIL import Image
+            try:
+                with Image.open(io.BytesIO(response.content)) as image:
+                    image.thumbnail(self.size)
+                    image.convert("RGB").save(tmp, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+            except (OSError, ValueError):  # not an image PIL can read
+                return None
+        else:
+            with open(tmp, "wb") as f:
+                f.write(response.content)
+        os.replace(tmp, path)
+        return path
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """Path of the thumbnail for ``url``, generating it if needed; None if it cannot be made"""
+        try:
+            return self._flights.do(url, lambda: self._generate(url, headers or {}))[0]
+        except requests.RequestException:
+            return None
+
+    def ensure(self, records: Sequence[Dict], headers: Optional[Dict[str, str]] = None) -> Dict[int, Optional[str]]:
+        """Thumbnails for a set of media records (e.g. one page of the browser), generated concurrently"""
+        paths: Dict[int, Optional[str]] = {}
+        missing = []
+        for record in records:
+            url = record.get("thumbnail_url")
+            if not url:
+                paths[record["id"]] = None
+            elif os.path.exists(self.path_for(url)):
+                paths[record["id"]] = self.path_for(url)
+            else:
+                missing.append(record)
+        futures = {record["id"]: self._get_pool().submit(self.get, record["thumbnail_url"], headers)
+                   for record in missing}
+        for media_id, future in futures.items():
+            paths[media_id] = future.result()
+        return paths
+
+
+class MediaIndex:
+    """Local index of a site's media library: type, size, dimensions and attached post
+
+    The index is built by crawling every /wp/v2/media page, CRAWL_WINDOW
+    pages at a time, and saved to ``<directory>/index.json`` so it survives
+    restarts.
+    """
+
+    def __init__(self, site_url: str, directory: Optional[str] = None):
+        if not site_url.startswith(('http://', 'https://')):
+            site_url = 'https://' + site_url
+        self.site_url = site_url.rstrip("/")
+        self.directory = directory or site_directory(self.site_url)
+        self.records: List[Dict] = []
+        self.built_at: Optional[float] = None
+        self.crawl_seconds = 0.0
+        self.thumbnails = ThumbnailCache(os.path.join(self.directory, "thumbnails"))
+        self._lock = threading.Lock()
+        self.load()
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, "index.json")
+
+    def load(self) -> bool:
+        if not os.path.exists(self.index_path):
+            return False
+        with open(self.index_path, encoding="utf-8") as f:
+            saved = json.load(f)
+        self.records = saved.get("records", [])
+        self.built_at = saved.get("built_at")
+        self.crawl_seconds = saved.get("crawl_seconds", 0.0)
+        return True
+
+    def save(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{self.index_path}.part"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"built_at": self.built_at, "crawl_seconds": self.crawl_seconds, "records": self.records}, f)
+        os.replace(tmp, self.index_path)
+
+    def crawl(self, headers: Dict[str, str], on_progress: Optional[Callable[[int, int], None]] = None,
+              window: int = CRAWL_WINDOW, log: Optional[Deque[Tuple[str, int, float]]] = None) -> int:
+        """Rebuild the index from the REST API; returns the number of items indexed"""
+        start = time.perf_counter()
+        fetch = exporter.rest_page_fetcher(self.site_url, "media", headers, log=log)
+        records = []
+        for items, total in exporter.iter_rest_pages(fetch, params={"_fields": MEDIA_FIELDS}, window=window):
+            records.extend(media_record(item) for item in items)
+            if on_progress:
+                on_progress(len(records), total)
+        with self._lock:
+            self.records = records
+            self.built_at = time.time()
+            self.crawl_seconds = time.perf_counter() - start
+            self.save()
+        return len(records)
+
+    def filter(self, mime_type: Optional[str] = None, media_type: Optional[str] = None,
+               attached: Optional[bool] = None) -> List[Dict]:
+        return [
+            record for record in self.records
+            if (mime_type is None or record["mime_type"] == mime_type)
+            and (media_type is None or record["media_type"] == media_type)
+            and (attached is None or bool(record["post"]) == attached)
+        ]
+
+    def breakdown(self, key: str = "mime_type") -> List[Dict]:
+        """Files and bytes per value of ``key`` (mime_type, media_type, ...), largest first"""
+        groups: Dict[str, Dict] = {}
+        for record in self.records:
+            group = groups.setdefault(str(record.get(key)), {key: str(record.get(key)), "files": 0, "bytes": 0})
+            group["files"] += 1
+            group["bytes"] += record["filesize"]
+        return sorted(groups.values(), key=lambda group: (group["bytes"], group["files"]), reverse=True)
+
+    def size_classes(self) -> List[Dict]:
+        counts = {label: {"size": label, "files": 0, "bytes": 0} for label, _ in SIZE_CLASSES}
+        for record in self.records:
+            label = next(label for label, bound in SIZE_CLASSES if record["filesize"] < bound)
+            counts[label]["files"] += 1
+            counts[label]["bytes"] += record["filesize"]
+        return list(counts.values())
+
+    def summary(self) -> Dict:
+        images = [record for record in self.records if record["media_type"] == "image"]
+        return {
+            "files": len(self.records),
+            "bytes": sum(record["filesize"] for record in self.records),
+            "images": len(images),
+            "unattached": sum(1 for record in self.records if not record["post"]),
+        }
@@ -0,0 +1,248 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+from urllib.parse import unquote, urlsplit
+
+import requests
+
+import wp_http
+from metrics import MIRROR_FILES
+
+# Constants
+MIRROR_WORKERS = 8
+CHUNK_SIZE = 1024 * 1024  # bytes read from the socket and hashed at a time
+UPLOADS_PREFIX = "/wp-content/uploads/"
+MANIFEST_SAVE_EVERY = 50  # completed files between manifest checkpoints
+TIMEOUT = 60
+
+# Per-file outcomes
+DOWNLOADED, RESUMED, UNCHANGED, DEDUPLICATED, FAILED = "downloaded", "resumed", "unchanged", "deduplicated", "failed"
+
+
+class FileResult(NamedTuple):
+    url: str
+    path: Optional[str]
+    status: str
+    bytes: int  # received over the network for this file
+    error: Optional[str] = None
+
+
+class MirrorResult(NamedTuple):
+    files: List[FileResult]
+    seconds: float
+
+    @property
+    def bytes(self) -> int:
+        return sum(result.bytes for result in self.files)
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second across all workers"""
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def count(self, status: str) -> int:
+        return sum(1 for result in self.files if result.status == status)
+
+
+def relative_path(url: str) -> Optional[str]:
+    """Where a media URL lives under the mirror: its path below wp-content/uploads, or None if unsafe"""
+    path = unquote(urlsplit(url).path)
+    if UPLOADS_PREFIX in path:
+        path = path.split(UPLOADS_PREFIX, 1)[1]
+    path = os.path.normpath(path.lstrip("/"))
+    if path.startswith("..") or os.path.isabs(path) or path in ("", "."):
+        return None
+    return path
+
+
+def expected_size(item: Dict) -> int:
+    """Size reported by the index (``filesize``) or the raw REST item (media_details.filesize); 0 if unknown"""
+    return int(item.get("filesize") or (item.get("media_details") or {}).get("filesize") or 0)
+
+
+def _hash_file(path: str, digest=None):
+    digest = digest or hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest
+
+
+def _read_text(path: str) -> str:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def _write_text(path: str, text: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+class MediaMirror:
+    """Copy a site's uploads to a local directory, keeping the uploads layout
+
+    Files stream to disk in CHUNK_SIZE pieces on ``workers`` threads, so
+    memory stays flat however large the files are. For each file:
+
+    - a complete local copy whose ETag still matches (conditional GET, 304)
+      or, without an ETag, whose size matches the index, is skipped;
+    - a ``.part`` left by an interrupted run is resumed with a Range
+      request (If-Range guards against the file having changed); its ETag
+      is written next to it as ``.part.etag`` before the first byte, so
+      resuming works even after a crash;
+    - a file whose SHA-256 matches one already mirrored is hard-linked to
+      it instead of being stored twice.
+
+    ETags, sizes and hashes are kept in ``manifest.json`` in the mirror.
+    """
+
+    def __init__(self, directory: str, headers: Optional[Dict[str, str]] = None, workers: int = MIRROR_WORKERS,
+                 chunk_size: int = CHUNK_SIZE, session: Optional[requests.Session] = None):
+        self.directory = directory
+        self.headers = headers or {}
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.session = session or wp_http.get_session()
+        self.manifest: Dict[str, Dict] = {}
+        self._hashes: Dict[str, str] = {}  # sha256 -> first path mirrored with it
+        self._lock = threading.Lock()
+        self._load_manifest()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, "manifest.json")
+
+    def _load_manifest(self) -> None:
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        self._hashes = {entry["sha256"]: path for path, entry in self.manifest.items() if entry.get("sha256")}
+
+    def save_manifest(self) -> None:
+        with self._lock:
+            data = json.dumps(self.manifest)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{self.manifest_path}.part"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, self.manifest_path)
+
+    def _record(self, relpath: str, url: str, etag: Optional[str], size: int, sha256: Optional[str]) -> None:
+        with self._lock:
+            self.manifest[relpath] = {"url": url, "etag": etag, "size": size, "sha256": sha256}
+            if sha256:
+                self._hashes.setdefault(sha256, relpath)
+
+    def _deduplicate(self, relpath: str, sha256: str) -> bool:
+        """Replace ``relpath`` with a hard link to an identical file already mirrored"""
+        with self._lock:
+            original = self._hashes.get(sha256)
+        if original is None or original == relpath:
+            return False
+        source = os.path.join(self.directory, original)
+        target = os.path.join(self.directory, relpath)
+        if not os.path.exists(source):
+            return False
+        try:
+            tmp = f"{target}.link"
+            os.link(source, tmp)
+            os.replace(tmp, target)
+        except OSError:  # e.g. a filesystem without hard links; keep the copy
+            return False
+        return True
+
+    def mirror_one(self, item: Dict) -> FileResult:
+        url = item.get("source_url") or ""
+        relpath = relative_path(url)
+        if relpath is None:
+            return FileResult(url, None, FAILED, 0, "URL does not map to a path in the mirror")
+        path = os.path.join(self.directory, relpath)
+        part = f"{path}.part"
+        part_etag = f"{part}.etag"
+        with self._lock:
+            known = dict(self.manifest.get(relpath) or {})
+
+        # Identity encoding keeps Range offsets and the hash in terms of the bytes on disk
+        headers = dict(self.headers, **{"Accept-Encoding": "identity"})
+        if os.path.exists(path):
+            if known.get("etag"):
+                headers["If-None-Match"] = known["etag"]
+            elif expected_size(item) and os.path.getsize(path) == expected_size(item):
+                return FileResult(url, path, UNCHANGED, 0)
+        # Resume only under a strong ETag, so If-Range restarts the download if the file changed
+        partial_etag = _read_text(part_etag)
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        if offset and partial_etag and not partial_etag.startswith("W/"):
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = partial_etag
+
+        received = 0
+        try:
+            with self.session.get(url, headers=headers, timeout=TIMEOUT, stream=True) as response:
+                if response.status_code == 304:
+                    return FileResult(url, path, UNCHANGED, 0)
+                if response.status_code == 416:  # the .part is already as long as the file; start over
+                    os.remove(part)
+                    return self.mirror_one(item)
+                if response.status_code not in (200, 206):
+                    return FileResult(url, path, FAILED, 0, f"HTTP {response.status_code}")
+                etag = response.headers.get("ETag")
+                resumed = response.status_code == 206 and "Range" in headers
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if resumed:
+                    digest = _hash_file(part)  # the hash covers the whole file, not just this request
+                else:
+                    digest = hashlib.sha256()
+                    _write_text(part_etag, etag or "")
+                with open(part, "ab" if resumed else "wb") as f:
+                    for chunk in response.iter_content(self.chunk_size):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        received += len(chunk)
+        except (requests.RequestException, OSError) as e:
+            return FileResult(url, path, FAILED, received, str(e))
+
+        os.replace(part, path)
+        if os.path.exists(part_etag):
+            os.remove(part_etag)
+        sha256 = digest.hexdigest()
+        status = RESUMED if resumed else DOWNLOADED
+        if self._deduplicate(relpath, sha256):
+            status = DEDUPLICATED
+        self._record(relpath, url, etag, os.path.getsize(path), sha256)
+        return FileResult(url, path, status, received)
+
+    def run(self, items: Iterable[Dict],
+            on_progress: Optional[Callable[[int, int, int], None]] = None) -> MirrorResult:
+        """Mirror every item with a source_url; ``on_progress(files done, files total, bytes received)``"""
+        items = [item for item in items if item.get("source_url")]
+        start = time.perf_counter()
+        results: List[FileResult] = []
+        received = 0
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="media-mirror")
+        try:
+            for result in pool.map(self._mirror_counted, items):
+                results.append(result)
+                received += result.bytes
+                if len(results) % MANIFEST_SAVE_EVERY == 0:
+                    self.save_manifest()
+                if on_progress:
+                    on_progress(len(results), len(items), received)
+        finally:
+            # If the caller is interrupted (a Streamlit rerun or stop), drop the queued files instead of
+            # downloading them all first; the ones in progress finish or stay as resumable .part files
+            pool.shutdown(wait=True, cancel_futures=True)
+            self.save_manifest()
+        return MirrorResult(results, time.perf_counter() - start)
+
+    def _mirror_counted(self, item: Dict) -> FileResult:
+        result = self.mirror_one(item)
+        MIRROR_FILES.inc(result=result.status)
+        return result
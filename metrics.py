@@ -0,0 +1,303 @@
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Callable, Tuple
+
+from tracing import get_tracer
+
+# Constants
+DEFAULT_HOST = os.environ.get("WP_HUB_METRICS_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.environ.get("WP_HUB_METRICS_PORT", "9464"))
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (), ttl: Optional[float] = None):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.ttl = ttl  # Drop label sets not updated for this many seconds
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, object] = {}
+        self._touched: Dict[LabelValues, float] = {}
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _touch(self, key: LabelValues) -> None:
+        if self.ttl:
+            self._touched[key] = time.monotonic()
+
+    def _expire(self) -> None:
+        if not self.ttl:
+            return
+        cutoff = time.monotonic() - self.ttl
+        for key in [key for key, touched in self._touched.items() if touched < cutoff]:
+            self._values.pop(key, None)
+            self._touched.pop(key, None)
+
+    def remove(self, **labels: str) -> None:
+        with self._lock:
+            key = self._key(labels)
+            self._values.pop(key, None)
+            self._touched.pop(key, None)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        with self._lock:
+            self._expire()
+            lines = self.samples()
+        header = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(header + lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        with self._lock:
+            key = self._key(labels)
+            self._values[key] = self._values.get(key, 0) + amount
+            self._touch(key)
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+                for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, optionally computed at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, *args, callback: Optional[Callable[[], Dict[LabelValues, float]]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.callback = callback
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            key = self._key(labels)
+            self._values[key] = value
+            self._touch(key)
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        with self._lock:
+            key = self._key(labels)
+            self._values[key] = self._values.get(key, 0) + amount
+            self._touch(key)
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> List[str]:
+        values = dict(self._values)
+        if self.callback:
+            try:
+                values.update(self.callback())
+            except Exception:
+                pass  # Never fail a scrape because one source is broken
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+                for key, value in values.items()]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram of observations"""
+
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels: str) -> None:
+        with self._lock:
+            key = self._key(labels)
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+            self._touch(key)
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, state in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["counts"]):
+                cumulative += count
+                le = ("le", _format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {state['count']}")
+        return lines
+
+
+class Registry:
+    """Named collection of metrics rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, cls, name: str, documentation: str, labels: Tuple[str, ...] = (), **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, tuple(labels), **kwargs)
+            return metric
+
+    def counter(self, name: str, documentation: str, labels: Tuple[str, ...] = (), **kwargs) -> Counter:
+        return self._register(Counter, name, documentation, labels, **kwargs)
+
+    def gauge(self, name: str, documentation: str, labels: Tuple[str, ...] = (), **kwargs) -> Gauge:
+        return self._register(Gauge, name, documentation, labels, **kwargs)
+
+    def histogram(self, name: str, documentation: str, labels: Tuple[str, ...] = (), **kwargs) -> Histogram:
+        return self._register(Histogram, name, documentation, labels, **kwargs)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+_registry = Registry()
+
+def get_registry() -> Registry:
+    """Return the process-wide metrics registry"""
+    return _registry
+
+
+# Metrics shared across modules
+HTTP_REQUESTS = _registry.counter(
+    "wp_hub_http_requests_total", "WordPress REST requests by method, endpoint and status",
+    ("method", "endpoint", "status"))
+HTTP_DURATION = _registry.histogram(
+    "wp_hub_http_request_duration_seconds", "WordPress REST request latency", ("method", "endpoint"))
+HTTP_RESPONSE_BYTES = _registry.counter(
+    "wp_hub_http_response_bytes_total", "Bytes received from WordPress", ("endpoint",))
+HTTP_THROTTLED = _registry.counter(
+    "wp_hub_http_throttled_total", "Requests delayed client-side or answered with an overload status, by reason",
+    ("site", "reason"))
+HTTP_HEDGED = _registry.counter(
+    "wp_hub_http_hedged_total", "GETs that fired a second, hedged attempt after the endpoint's p95", ("endpoint",))
+HTTP_COALESCED = _registry.counter(
+    "wp_hub_http_coalesced_total", "GETs answered by an identical request already in flight", ("endpoint",))
+BULK_OPERATIONS = _registry.counter(
+    "wp_hub_bulk_operations_total", "Bulk create/update/delete operations by action and result", ("action", "result"))
+MIRROR_FILES = _registry.counter(
+    "wp_hub_mirror_files_total", "Media files handled by mirroring by result", ("result",))
+CACHE_LOOKUPS = _registry.counter(
+    "wp_hub_cache_lookups_total", "Cache lookups by cache and result (hit/miss)", ("cache", "result"))
+AUTH_TOKEN_REQUESTS = _registry.counter(
+    "wp_hub_auth_token_requests_total", "Token requests sent to the auth endpoint by grant and result",
+    ("grant", "result"))
+SPAN_DURATION = _registry.histogram(
+    "wp_hub_span_duration_seconds", "Duration of traced fetch/analyze/generate/render operations", ("span",))
+SYNC_LAG = _registry.gauge(
+    "wp_hub_sync_lag_seconds", "Seconds since a site's data was last refreshed", ("site",), ttl=3600)
+SESSION_MEMORY = _registry.gauge(
+    "wp_hub_session_state_bytes", "Approximate size of a Streamlit session's state", ("session",), ttl=600)
+
+
+def _process_memory() -> Dict[LabelValues, float]:
+    try:
+        with open("/proc/self/statm") as f:
+            return {(): int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")}
+    except (OSError, ValueError, IndexError):
+        import resource
+        return {(): resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}
+
+_registry.gauge("process_resident_memory_bytes", "Resident memory size in bytes", callback=_process_memory)
+
+# Every finished tracing span feeds the operation-duration histogram
+get_tracer().add_listener(lambda span: SPAN_DURATION.observe(span.duration_ns / 1e9, span=span.name))
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def estimate_size(obj, limit: int = 2_000_000) -> int:
+    """Approximate deep size of a container in bytes, visiting at most ``limit`` objects"""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack and len(seen) < limit:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item, 0)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            stack.extend(item)
+    return total
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: Registry = _registry
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the Streamlit log
+
+
+def start_metrics_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                         registry: Optional[Registry] = None) -> ThreadingHTTPServer:
+    """Serve ``/metrics`` from a daemon thread and return the server"""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry or _registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
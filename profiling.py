@@ -0,0 +1,245 @@
+import contextvars
+import cProfile
+import functools
+import json
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable
+
+# Constants
+PROFILE_FROM_ENV = os.environ.get("WP_HUB_PROFILE", "0") == "1"
+MAX_PROFILES = 50
+TOP_FUNCTIONS = 25
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+
+_current_rerun: contextvars.ContextVar = contextvars.ContextVar("current_rerun", default=None)
+# cProfile (one active profiler per process on 3.12+) and tracemalloc's peak are process-wide,
+# so only one section across all sessions is measured at a time; the others are only timed
+_measure_lock = threading.Lock()
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer for flame graphs"""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: List[List[Any]] = []  # [stack (root first), weight seconds]
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples.append([stack, now - last])
+            last = now
+
+
+class RerunProfile:
+    """cProfile, tracemalloc and stack samples for one Streamlit rerun"""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.started_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.profile = cProfile.Profile()
+        self.sections: Dict[str, float] = {}  # seconds per profiled function
+        self.wall_time = 0.0
+        self.alloc_bytes = 0
+        self.peak_bytes = 0
+        self.samples: List[List[Any]] = []
+        self.contended = 0  # top-level sections timed but not profiled because another session was being profiled
+        self.finished = False
+        self._depth = 0
+        self._stats: Optional[Dict] = None
+
+    def enter(self) -> Optional[Dict]:
+        """Start measuring a top-level section; nested sections are only timed
+
+        Every top-level section counts towards wall_time. cProfile and
+        tracemalloc are process-wide, so while another session holds them
+        the section is timed but not profiled.
+        """
+        self._depth += 1
+        if self._depth > 1:
+            return None
+        if not _measure_lock.acquire(blocking=False):
+            self.contended += 1
+            return {"start": time.perf_counter()}
+        try:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            sampler = StackSampler(threading.get_ident())
+            state = {
+                "start": time.perf_counter(),
+                "memory": tracemalloc.get_traced_memory()[0],
+                "sampler": sampler,
+                "started_tracing": started_tracing,
+            }
+            sampler.start()
+            self.profile.enable()
+        except BaseException:
+            _measure_lock.release()
+            raise
+        return state
+
+    def exit(self, state: Optional[Dict]) -> None:
+        self._depth -= 1
+        if state is None:
+            return
+        if "sampler" not in state:  # contended: timed only
+            self.wall_time += time.perf_counter() - state["start"]
+            return
+        try:
+            self.profile.disable()
+            state["sampler"].stop()
+            current, peak = tracemalloc.get_traced_memory()
+            if state["started_tracing"]:  # leave tracing alone if something else turned it on
+                tracemalloc.stop()
+            self.wall_time += time.perf_counter() - state["start"]
+            self.alloc_bytes += max(current - state["memory"], 0)
+            self.peak_bytes = max(self.peak_bytes, peak - state["memory"])
+            self.samples.extend(state["sampler"].samples)
+        finally:
+            _measure_lock.release()
+
+    def finish(self) -> None:
+        self.finished = True
+        self.profile.create_stats()
+        self._stats = self.profile.stats
+
+    def top_functions(self, limit: int = TOP_FUNCTIONS) -> List[Dict]:
+        """The most expensive functions by cumulative time"""
+        if not self._stats:
+            return []
+        rows = []
+        for (filename, line, name), (calls, _, total, cumulative, _) in self._stats.items():
+            rows.append({
+                "Function": f"{name} ({os.path.basename(filename)}:{line})",
+                "Calls": calls,
+                "Own (ms)": round(total * 1000, 2),
+                "Cumulative (ms)": round(cumulative * 1000, 2),
+            })
+        return sorted(rows, key=lambda row: row["Cumulative (ms)"], reverse=True)[:limit]
+
+    def summary(self) -> Dict:
+        row = {
+            "Rerun": self.label,
+            "Started": self.started_at,
+            "Wall (ms)": round(self.wall_time * 1000, 1),
+            "Allocated (KB)": round(self.alloc_bytes / 1024, 1),
+            "Peak (KB)": round(self.peak_bytes / 1024, 1),
+            "Contended": self.contended,
+        }
+        row.update({f"{name} (ms)": round(seconds * 1000, 1) for name, seconds in self.sections.items()})
+        return row
+
+    def pstats_bytes(self) -> bytes:
+        """The profile in the binary format read by pstats.Stats / snakeviz"""
+        return marshal.dumps(self._stats or {})
+
+    def speedscope_json(self) -> str:
+        """Stack samples as a speedscope 'sampled' profile"""
+        frames: List[Dict] = []
+        frame_index: Dict[Any, int] = {}
+        samples = []
+        weights = []
+        for stack, weight in self.samples:
+            indexed = []
+            for name, filename, line in stack:
+                key = (name, filename, line)
+                if key not in frame_index:
+                    frame_index[key] = len(frames)
+                    frames.append({"name": name, "file": filename, "line": line})
+                indexed.append(frame_index[key])
+            samples.append(indexed)
+            weights.append(weight)
+        return json.dumps({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.label,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+            "name": self.label,
+            "exporter": "profiling.py",
+        })
+
+
+def begin_rerun(history: deque, label: str, enabled: bool) -> Optional[RerunProfile]:
+    """Finish the previous rerun's profile (if any) and start collecting this one's
+
+    Streamlit gives scripts no end-of-run hook, so a rerun's profile is
+    finalised when the next rerun of the same session begins.
+    """
+    if history and not history[-1].finished:
+        history[-1].finish()
+    if not enabled:
+        _current_rerun.set(None)
+        return None
+    rerun = RerunProfile(label)
+    history.append(rerun)
+    _current_rerun.set(rerun)
+    return rerun
+
+
+def profiled(func: Callable) -> Callable:
+    """Profile calls of ``func`` into the current rerun's profile when profiling is on"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        rerun = _current_rerun.get()
+        if rerun is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        state = rerun.enter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            rerun.exit(state)
+            rerun.sections[func.__name__] = rerun.sections.get(func.__name__, 0.0) + time.perf_counter() - start
+    return wrapper
+
+
+def new_history() -> deque:
+    return deque(maxlen=MAX_PROFILES)
+
+
+def load_pstats(data: bytes) -> pstats.Stats:
+    """Rebuild a pstats.Stats from pstats_bytes() output"""
+    stats = pstats.Stats()
+    stats.stats = marshal.loads(data)
+    stats.get_top_level_stats()
+    return stats
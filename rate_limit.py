@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from metrics import HTTP_THROTTLED, get_registry
+
+# Constants
+DEFAULT_RATE = float(os.environ.get("WP_HUB_RATE_LIMIT", "20"))  # requests/s per site; 0 disables
+DEFAULT_BURST = 40
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("WP_HUB_MAX_CONCURRENCY", "8"))
+INITIAL_CONCURRENCY = 2
+MIN_CONCURRENCY = 1
+LATENCY_TOLERANCE = 2.0  # latency above this multiple of the baseline counts as congestion
+LATENCY_SMOOTHING = 0.2
+LATENCY_BACKOFF = 0.9  # multiplicative decrease on congestion
+ERROR_BACKOFF = 0.5  # multiplicative decrease on 429/503/timeouts
+BASELINE_DRIFT = 0.001  # lets the no-load latency baseline follow a slower origin upwards
+MAX_RETRY_AFTER = 60.0
+OVERLOAD_STATUSES = (429, 503, 504)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), None if absent or invalid"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, at most ``burst`` saved up"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return how long to sleep before using it (0 if one was available)"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on requests in flight, tuned from latency and overload responses
+
+    Each fast success adds 1/limit (about +1 per round trip at full load).
+    Smoothed latency above LATENCY_TOLERANCE x the no-load baseline shrinks the limit
+    by LATENCY_BACKOFF, and 429/503/504 or network errors by ERROR_BACKOFF,
+    at most once per round trip so one burst of slow responses counts once.
+    """
+
+    def __init__(self, max_limit: int = DEFAULT_MAX_CONCURRENCY, initial: int = INITIAL_CONCURRENCY):
+        self.max_limit = max_limit
+        self.limit = float(min(initial, max_limit))
+        self.in_flight = 0
+        self.smoothed: Optional[float] = None  # EWMA of latency, so one slow response is not congestion
+        self.baseline: Optional[float] = None
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self.in_flight >= max(int(self.limit), MIN_CONCURRENCY):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency: Optional[float], overloaded: bool) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if latency is not None and not overloaded:
+                if self.smoothed is None:
+                    self.smoothed = latency
+                else:
+                    self.smoothed += (latency - self.smoothed) * LATENCY_SMOOTHING
+                if self.baseline is None or self.smoothed < self.baseline:
+                    self.baseline = self.smoothed
+                else:
+                    self.baseline += (self.smoothed - self.baseline) * BASELINE_DRIFT
+            congested = (self.smoothed is not None and self.baseline is not None
+                         and self.smoothed > self.baseline * LATENCY_TOLERANCE)
+            if overloaded or congested:
+                if now - self._last_decrease > (self.smoothed or 0):
+                    backoff = ERROR_BACKOFF if overloaded else LATENCY_BACKOFF
+                    self.limit = max(self.limit * backoff, MIN_CONCURRENCY)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.limit + 1 / self.limit, self.max_limit)
+            self._condition.notify_all()
+
+
+class SiteLimiter:
+    """Rate, concurrency and Retry-After backpressure for one WordPress host
+
+        limiter.acquire()
+        ... send the request ...
+        limiter.release(latency, status, retry_after)
+    """
+
+    def __init__(self, site: str, rate: float = DEFAULT_RATE, burst: float = DEFAULT_BURST,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        self.site = site
+        self.bucket = TokenBucket(rate, burst) if rate > 0 else None
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.paused_until = 0.0
+
+    def acquire(self) -> float:
+        """Block until the request may be sent; returns the seconds spent waiting"""
+        start = time.monotonic()
+        pause = self.paused_until - start
+        if pause > 0:
+            HTTP_THROTTLED.inc(site=self.site, reason="retry_after")
+            time.sleep(pause)
+        if self.bucket is not None:
+            delay = self.bucket.reserve()
+            if delay > 0:
+                HTTP_THROTTLED.inc(site=self.site, reason="rate")
+                time.sleep(delay)
+        self.concurrency.acquire()
+        return time.monotonic() - start
+
+    def release(self, latency: Optional[float], status: Optional[int],
+                retry_after: Optional[float] = None) -> None:
+        """Record the outcome; ``status`` None means the request failed without a response"""
+        overloaded = status is None or status in OVERLOAD_STATUSES
+        if status in OVERLOAD_STATUSES:
+            HTTP_THROTTLED.inc(site=self.site, reason=str(status))
+        if retry_after is not None:
+            self.pause(retry_after)
+        self.concurrency.release(latency, overloaded)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request to this site for ``seconds`` (capped at MAX_RETRY_AFTER)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + min(seconds, MAX_RETRY_AFTER))
+
+
+_limiters: Dict[str, SiteLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _site(url: str) -> str:
+    return urlsplit(url).netloc or url
+
+
+def configure(url: str, rate: float = DEFAULT_RATE, burst: float = DEFAULT_BURST,
+              max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> SiteLimiter:
+    """Replace the limits of the site serving ``url`` (rate 0 disables the rate limit)"""
+    site = _site(url)
+    limiter = SiteLimiter(site, rate, burst, max_concurrency)
+    with _limiters_lock:
+        _limiters[site] = limiter
+    return limiter
+
+
+def get_limiter(url: str) -> SiteLimiter:
+    """The process-wide limiter of the site serving ``url``"""
+    site = _site(url)
+    limiter = _limiters.get(site)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(site)
+            if limiter is None:
+                limiter = _limiters[site] = SiteLimiter(site)
+    return limiter
+
+
+get_registry().gauge(
+    "wp_hub_http_concurrency_limit", "Adaptive limit on concurrent requests per site", ("site",),
+    callback=lambda: {(site,): limiter.concurrency.limit for site, limiter in list(_limiters.items())}
+)
@@ -0,0 +1,185 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from typing import Callable, Deque, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from api_metrics import normalize_endpoint
+from metrics import HTTP_HEDGED, get_registry
+
+# Constants
+FAILURE_THRESHOLD = 5  # consecutive failures that open a breaker
+RESET_TIMEOUT = 30.0  # seconds an open breaker fails fast before letting one probe through
+LATENCY_WINDOW = 200  # recent latencies per endpoint for the hedging delay
+MIN_HEDGE_SAMPLES = 20
+HEDGE_QUANTILE = 0.95
+MIN_HEDGE_DELAY = 0.05
+HEDGE_BUDGET = 0.1  # at most one hedge per 10 requests, so hedging cannot double the load
+HEDGE_BUDGET_MAX = 10.0
+POOL_SIZE = 32
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of sending a request to an endpoint whose breaker is open"""
+
+
+class CircuitBreaker:
+    """Fail fast on an endpoint after FAILURE_THRESHOLD consecutive failures
+
+    Once open, calls raise CircuitOpenError for ``reset_timeout`` seconds;
+    then a single probe is let through (half-open) and its outcome closes the
+    breaker or opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before(self) -> None:
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # This caller is the probe; if it never reports back, another goes after reset_timeout
+                self.state = HALF_OPEN
+                self.opened_at = time.monotonic()
+                return
+            retry_in = max(self.reset_timeout - (time.monotonic() - self.opened_at), 0)
+        raise CircuitOpenError(f"Circuit open for {self.name} after {self.failures} failures; "
+                               f"retrying in {retry_in:.0f}s")
+
+    def record(self, success: bool) -> None:
+        with self._lock:
+            if success:
+                self.state = CLOSED
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Recent latencies of one endpoint, for the hedging delay"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        samples = sorted(self._samples)
+        if len(samples) < MIN_HEDGE_SAMPLES:
+            return None
+        return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+
+class HedgeBudget:
+    """Token budget that earns HEDGE_BUDGET per request and spends 1 per hedge"""
+
+    def __init__(self):
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def earn(self) -> None:
+        with self._lock:
+            self._tokens = min(self._tokens + HEDGE_BUDGET, HEDGE_BUDGET_MAX)
+
+    def spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+_breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+_latencies: Dict[Tuple[str, str], LatencyTracker] = {}
+_budget = HedgeBudget()
+_registry_lock = threading.Lock()
+_pool: Optional[ThreadPoolExecutor] = None
+
+
+def endpoint_key(url: str) -> Tuple[str, str]:
+    return urlsplit(url).netloc, normalize_endpoint(url)
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    key = endpoint_key(url)
+    breaker = _breakers.get(key)
+    if breaker is None:
+        with _registry_lock:
+            breaker = _breakers.setdefault(key, CircuitBreaker(f"{key[0]}{key[1]}"))
+    return breaker
+
+
+def get_latency(url: str) -> LatencyTracker:
+    key = endpoint_key(url)
+    tracker = _latencies.get(key)
+    if tracker is None:
+        with _registry_lock:
+            tracker = _latencies.setdefault(key, LatencyTracker())
+    return tracker
+
+
+def get_pool() -> ThreadPoolExecutor:
+    """Shared pool for hedged attempts and deferred optional calls"""
+    global _pool
+    if _pool is None:
+        with _registry_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="wp-hedge")
+    return _pool
+
+
+def hedged(call: Callable[[], requests.Response], url: str) -> requests.Response:
+    """Run an idempotent ``call``; if it has not answered by the endpoint's p95
+    latency, start a second attempt and return whichever answers first
+
+    Without enough latency history, or with the hedge budget spent, this is
+    just ``call()``.
+    """
+    _budget.earn()
+    delay = get_latency(url).quantile(HEDGE_QUANTILE)
+    if delay is None:
+        return call()
+    first = get_pool().submit(call)
+    try:
+        return first.result(timeout=max(delay, MIN_HEDGE_DELAY))
+    except FutureTimeout:
+        pass
+    if not _budget.spend():
+        return first.result()
+    HTTP_HEDGED.inc(endpoint=endpoint_key(url)[1])
+    pending = {first, get_pool().submit(call)}
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+def defer(func: Callable, *args, **kwargs) -> Future:
+    """Run an optional call in the background so it never delays the current rerun"""
+    return get_pool().submit(func, *args, **kwargs)
+
+
+get_registry().gauge(
+    "wp_hub_circuit_open", "1 while an endpoint's circuit breaker is open or half-open", ("site", "endpoint"),
+    callback=lambda: {key: float(breaker.state != CLOSED) for key, breaker in list(_breakers.items())}
+)
@@ -0,0 +1,18 @@
+import hashlib
+import hmac
+
+SIGNATURE_HEADER = "X-WordPress-Signature"
+
+def calculate_hash(data: str, secret: str) -> str:
+    """Calculate HMAC hash for webhook security"""
+    return hmac.new(
+        secret.encode('utf-8'),
+        data.encode('utf-8'),
+        hashlib.sha256
+    ).hexdigest()
+
+def verify_signature(data: str, secret: str, signature: str) -> bool:
+    """Check a webhook signature in constant time"""
+    if not signature:
+        return False
+    return hmac.compare_digest(calculate_hash(data, secret), signature.strip().lower())
@@ -0,0 +1,253 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import auth_provider
+from async_client import DEFAULT_CONCURRENCY, SyncWordPressClient, run
+from content_cache import credential_scope, drop_site_cache, get_content_cache
+from metrics import estimate_size, get_registry as get_metrics_registry
+
+# Constants
+SITES_FILE = os.environ.get("WP_HUB_SITES")  # optional JSON list of {"name", "url", "username", "password", ...}, operator-only
+CONNECTION_BUDGET = int(os.environ.get("WP_HUB_SITES_CONNECTIONS", "64"))  # in-flight requests across all sites
+MEMORY_BUDGET = int(os.environ.get("WP_HUB_SITES_MEMORY_MB", "512")) * 1024 * 1024  # cached content across sites
+SCHEMA_TTL = 3600  # seconds a site's post types and taxonomies are trusted
+DEFAULT_SYNC_INTERVAL = 60  # minutes, as in sync_settings
+
+
+class Site:
+    """One registered WordPress site: its own pooled client, schema cache, content cache and sync schedule
+
+    The registry is shared by every session, so sites added from the UI
+    carry only a name and URL and refresh/sync anonymously. Credentials are
+    accepted only from the operator's WP_HUB_SITES file and are never handed
+    to sessions.
+    """
+
+    def __init__(self, name: str, url: str, username: str = "", password: str = "", token: str = "",
+                 sync_interval: int = DEFAULT_SYNC_INTERVAL, concurrency: int = DEFAULT_CONCURRENCY):
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        self.name = name
+        self.url = url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.token = token
+        self.sync_interval = sync_interval
+        self.client = SyncWordPressClient(self.url, concurrency=concurrency)
+        self.scope = credential_scope(username, password, token)
+        self.content_cache = get_content_cache(self.url, self.scope)  # shared with sessions using the same credentials
+        self.cache_bytes = 0
+        self.schema: Optional[Dict[str, Any]] = None
+        self.schema_fetched_at = 0.0
+        self.counts: Dict[str, int] = {}
+        self.latency_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_sync: Optional[float] = None
+        self.next_sync = 0.0
+        self.last_used = time.monotonic()
+
+    def headers(self) -> Dict[str, str]:
+        return auth_provider.get_provider(self.url, self.username, self.password, token=self.token).headers()
+
+    @property
+    def schema_fresh(self) -> bool:
+        return self.schema is not None and time.time() - self.schema_fetched_at < SCHEMA_TTL
+
+    @property
+    def due(self) -> bool:
+        return self.sync_interval > 0 and time.time() >= self.next_sync
+
+    async def refresh(self, force: bool = False) -> None:
+        """Discover the schema (unless cached) and count every post type, concurrently"""
+        start = time.perf_counter()
+        try:
+            headers = self.headers()
+            if force or not self.schema_fresh:
+                self.schema = await self.client.client.discover(headers)
+                self.schema_fetched_at = time.time()
+            types = self.schema["types"]
+            totals = await asyncio.gather(*(
+                self.client.client.get(f"/wp/v2/{data.get('rest_base', name)}", {"per_page": 1}, headers)
+                for name, data in types.items()
+            ))
+            self.counts = {name: result.total for name, result in zip(types, totals) if result.status_code == 200}
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+        self.latency_ms = (time.perf_counter() - start) * 1000
+
+    async def sync(self) -> None:
+        """Fetch every post type into this site's content cache"""
+        try:
+            if not self.schema_fresh:
+                await self.refresh()
+            types = (self.schema or {}).get("types", {})
+            headers = self.headers()
+            results = await self.client.client.get_collections(
+                [data.get("rest_base", name) for name, data in types.items()], headers=headers)
+            size = 0
+            failed = {}
+            for name, result in zip(types, results.values()):
+                if isinstance(result, Exception):
+                    failed[name] = str(result)
+                    continue
+                posts, total = result
+                self.content_cache.replace(name, posts)
+                self.counts[name] = total
+                size += estimate_size(posts)
+            self.cache_bytes = size
+            if len(failed) < len(types) or not types:
+                self.last_sync = time.time()
+            self.last_error = (
+                f"{len(failed)} of {len(types)} post types failed: "
+                + "; ".join(f"{name} ({error})" for name, error in failed.items())
+            ) if failed else None
+        except Exception as e:
+            self.last_error = str(e)
+        self.next_sync = time.time() + self.sync_interval * 60
+        self.last_used = time.monotonic()
+
+    def drop_content(self) -> None:
+        drop_site_cache(self.url, self.scope)
+        self.content_cache = get_content_cache(self.url, self.scope)
+        self.cache_bytes = 0
+
+    def summary(self) -> Dict[str, Any]:
+        schema = self.schema or {}
+        return {
+            "Site": self.name,
+            "URL": self.url,
+            "Post Types": len(schema.get("types", {})),
+            "Taxonomies": len(schema.get("taxonomies", {}) or {}),
+            "Items": sum(self.counts.values()),
+            "Media": schema.get("media_total", 0),
+            "Latency (ms)": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            "Cached (MB)": round(self.cache_bytes / 1024 / 1024, 1),
+            "Last Sync": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.last_sync)) if self.last_sync else None,
+            "Status": self.last_error or "OK",
+        }
+
+
+class SiteRegistry:
+    """Process-wide set of WordPress sites sharing connection and memory budgets
+
+    The connection budget is split evenly between sites (each site's client
+    may have budget/len(sites) requests in flight). When cached content
+    exceeds the memory budget, the least recently used sites' content
+    caches are dropped until it fits.
+    """
+
+    def __init__(self, connection_budget: int = CONNECTION_BUDGET, memory_budget: int = MEMORY_BUDGET):
+        self.connection_budget = connection_budget
+        self.memory_budget = memory_budget
+        self._sites: Dict[str, Site] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sites)
+
+    def __iter__(self) -> Iterator[Site]:
+        return iter(list(self._sites.values()))
+
+    def names(self) -> List[str]:
+        return list(self._sites)
+
+    def get(self, name: str) -> Optional[Site]:
+        site = self._sites.get(name)
+        if site is not None:
+            site.last_used = time.monotonic()
+        return site
+
+    def add(self, name: str, url: str, **options) -> Site:
+        with self._lock:
+            site = self._sites[name] = Site(name, url, **options)
+            self._rebalance()
+        return site
+
+    def remove(self, name: str) -> bool:
+        with self._lock:
+            site = self._sites.pop(name, None)
+            self._rebalance()
+        if site is not None:
+            site.client.close()
+        return site is not None
+
+    def load(self, path: str) -> int:
+        """Register the sites listed in a JSON file; returns how many were added"""
+        with open(path) as f:
+            entries = json.load(f)
+        for entry in entries:
+            entry = dict(entry)
+            self.add(entry.pop("name", entry["url"]), entry.pop("url"), **entry)
+        return len(entries)
+
+    def _rebalance(self) -> None:
+        per_site = max(self.connection_budget // max(len(self._sites), 1), 1)
+        for site in self._sites.values():
+            site.client.client.set_concurrency(per_site)
+
+    @property
+    def cache_bytes(self) -> int:
+        return sum(site.cache_bytes for site in self)
+
+    def enforce_memory_budget(self) -> List[str]:
+        """Drop least recently used content caches until the total fits; returns the sites dropped"""
+        dropped = []
+        for site in sorted(self, key=lambda site: site.last_used):
+            if self.cache_bytes <= self.memory_budget:
+                break
+            if site.cache_bytes:
+                site.drop_content()
+                dropped.append(site.name)
+        return dropped
+
+    def refresh_all(self, force: bool = False) -> List[Dict[str, Any]]:
+        """Refresh every site's schema and counts concurrently; returns the dashboard rows"""
+        sites = list(self)
+
+        async def refresh():
+            await asyncio.gather(*(site.refresh(force) for site in sites))
+        if sites:
+            run(refresh())
+        return self.dashboard()
+
+    def sync_due(self) -> List[str]:
+        """Sync every site whose schedule is due, concurrently; returns their names"""
+        due = [site for site in self if site.due]
+
+        async def sync():
+            await asyncio.gather(*(site.sync() for site in due))
+        if due:
+            run(sync())
+            self.enforce_memory_budget()
+        return [site.name for site in due]
+
+    def dashboard(self) -> List[Dict[str, Any]]:
+        return [site.summary() for site in self]
+
+
+_registry: Optional[SiteRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> SiteRegistry:
+    """The process-wide site registry, seeded from WP_HUB_SITES if set"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = SiteRegistry()
+                if SITES_FILE and os.path.exists(SITES_FILE):
+                    _registry.load(SITES_FILE)
+    return _registry
+
+
+get_metrics_registry().gauge(
+    "wp_hub_site_sync_age_seconds", "Seconds since each registered site last synced", ("site",),
+    callback=lambda: {(site.url,): time.time() - site.last_sync
+                      for site in (_registry or ()) if site.last_sync is not None}
+)
@@ -0,0 +1,122 @@
+import functools
+import hashlib
+import os
+import re
+from typing import NamedTuple, Optional
+
+# Constants
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # the app's directory, beside appp.py
+STATIC_DIR = os.path.join(BASE_DIR, "static")  # Streamlit serves <app dir>/static at app/static/
+STATIC_URL = "app/static"
+FINGERPRINT_LENGTH = 12
+FRAGMENT_CACHE_SIZE = 1024
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s+")
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")  # not ":" (a :hover) or "+" (calc)
+_HTML_BETWEEN_TAGS = re.compile(r">\s+<")
+_HTML_SPACE = re.compile(r"\s{2,}")
+
+
+class Asset(NamedTuple):
+    path: str
+    content: str
+    fingerprint: str
+
+    @property
+    def name(self) -> str:
+        stem, ext = os.path.splitext(os.path.basename(self.path))
+        return f"{stem}.{self.fingerprint}{ext}"
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and insignificant whitespace from a stylesheet"""
+    css = _CSS_COMMENT.sub("", css)
+    css = _CSS_SPACE.sub(" ", css)
+    css = _CSS_PUNCTUATION.sub(r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def minify_html(html: str) -> str:
+    """Collapse the indentation of an HTML snippet written inline in Python"""
+    html = _HTML_BETWEEN_TAGS.sub("><", html.strip())
+    return _HTML_SPACE.sub(" ", html)
+
+
+def fingerprint(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:FINGERPRINT_LENGTH]
+
+
+@functools.lru_cache(maxsize=32)
+def _load_css(path: str, mtime_ns: int) -> Asset:
+    with open(path, encoding="utf-8") as f:
+        content = minify_css(f.read())
+    return Asset(path, content, fingerprint(content))
+
+
+def resolve(path: str) -> str:
+    """``path`` relative to the app's directory rather than the working directory"""
+    return path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+
+
+def load_css(path: str) -> Optional[Asset]:
+    """Read, minify and fingerprint a stylesheet once per process (and again only if it changes)
+
+    Relative paths are resolved against the app's directory. Returns None if
+    the file does not exist.
+    """
+    path = resolve(path)
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    return _load_css(path, mtime_ns)
+
+
+def publish(asset: Asset, static_dir: str = STATIC_DIR) -> str:
+    """Write ``asset`` under its fingerprinted name to the static directory and return its URL"""
+    target = os.path.join(static_dir, asset.name)
+    if not os.path.exists(target):
+        os.makedirs(static_dir, exist_ok=True)
+        tmp = f"{target}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(asset.content)
+        os.replace(tmp, target)
+    return f"{STATIC_URL}/{asset.name}"
+
+
+@functools.lru_cache(maxsize=32)
+def _stylesheet_tag(asset: Asset, static_serving: bool) -> str:
+    if static_serving:
+        # A few bytes per rerun; the browser caches the fingerprinted file
+        return f'<link rel="stylesheet" href="{publish(asset)}">'
+    return f'<style data-asset="{asset.name}">{asset.content}</style>'
+
+
+def stylesheet_tag(path: str, static_serving: bool = False) -> str:
+    """HTML that applies the stylesheet at ``path``, or "" if it is missing
+
+    With Streamlit's static file serving enabled (the default in
+    .streamlit/config.toml) the minified CSS is published as
+    static/<name>.<fingerprint>.css and linked, so reruns send only the
+    <link> tag. Otherwise the whole stylesheet is inlined on every rerun.
+    """
+    asset = load_css(path)
+    if asset is None:
+        return ""
+    return _stylesheet_tag(asset, static_serving)
+
+
+@functools.lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _render_fragment(template: str, values: tuple) -> str:
+    return minify_html(template.format(**dict(values)))
+
+
+def fragment(template: str, **values) -> str:
+    """Render a str.format HTML template, minified and memoised per distinct values
+
+    Memoising saves formatting and minifying on the script thread only; the
+    HTML is still sent to the browser on every rerun, a little smaller for
+    the minifying.
+    """
+    return _render_fragment(template, tuple(sorted(values.items())))
@@ -0,0 +1,366 @@
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+# Constants
+DEFAULT_SEED = 42
+DEFAULT_BRANCHING = 3  # children per hierarchical term; ~log3(n) levels deep
+SITE_URL = "https://demo-wordpress-site.com"
+DATE_START = datetime(2015, 1, 1)
+DATE_END = datetime(2024, 12, 31)
+
+POST_TYPES = {
+    "post": {"name": "Posts", "rest_base": "posts", "hierarchical": False, "taxonomies": ["category", "post_tag"]},
+    "page": {"name": "Pages", "rest_base": "pages", "hierarchical": True, "taxonomies": []},
+    "product": {"name": "Products", "rest_base": "product", "hierarchical": False, "taxonomies": ["product_cat"]},
+    "event": {"name": "Events", "rest_base": "event", "hierarchical": False, "taxonomies": ["event_type"]},
+    "testimonial": {"name": "Testimonials", "rest_base": "testimonial", "hierarchical": False, "taxonomies": []},
+}
+TAXONOMIES = {
+    "category": {"name": "Categories", "rest_base": "categories", "hierarchical": True, "types": ["post"]},
+    "post_tag": {"name": "Tags", "rest_base": "tags", "hierarchical": False, "types": ["post"]},
+    "product_cat": {"name": "Product categories", "rest_base": "product_cat", "hierarchical": True, "types": ["product"]},
+    "event_type": {"name": "Event types", "rest_base": "event_type", "hierarchical": False, "types": ["event"]},
+}
+
+STATUS_WEIGHTS = [("publish", 80), ("draft", 10), ("pending", 4), ("private", 3), ("future", 3)]
+MIME_TYPES = [("image/jpeg", 60), ("image/png", 20), ("image/webp", 10), ("application/pdf", 6), ("video/mp4", 4)]
+IMAGE_SIZES = [(1920, 1080), (1600, 900), (1200, 800), (1080, 1080), (800, 600), (640, 480)]
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore et "
+    "dolore magna aliqua enim ad minim veniam quis nostrud exercitation ullamco laboris nisi aliquip ex ea "
+    "commodo consequat duis aute irure in reprehenderit voluptate velit esse cillum fugiat nulla pariatur "
+    "excepteur sint occaecat cupidatat non proident sunt culpa qui officia deserunt mollit anim id est laborum"
+).split()
+FIRST_NAMES = ["Ava", "Liam", "Mia", "Noah", "Zoe", "Omar", "Ines", "Kenji", "Sofia", "Arjun", "Lena", "Mateo"]
+LAST_NAMES = ["Smith", "Garcia", "Kim", "Nguyen", "Müller", "Rossi", "Okafor", "Silva", "Cohen", "Patel"]
+VENUES = ["Main Hall", "Conference Center", "Online", "City Park", "Riverside Pavilion", "Auditorium B"]
+
+
+def _weighted(rng: random.Random, choices: List[Tuple[str, int]]) -> str:
+    return rng.choices([value for value, _ in choices], [weight for _, weight in choices])[0]
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choices(WORDS, k=count))
+
+
+def _iso(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+class SyntheticSite:
+    """Seeded, lazily generated WordPress content in REST API shape
+
+    Every item is derived from (seed, collection, index) alone, so any item or
+    page can be produced in O(1) without generating the rest: a site with
+    millions of posts costs no memory until it is iterated.
+
+        site = SyntheticSite(posts=1_000_000)
+        items, total = site.page("posts", page=3, per_page=100)
+    """
+
+    def __init__(
+        self,
+        seed: int = DEFAULT_SEED,
+        posts: int = 1000,
+        terms: int = 200,
+        media: int = 500,
+        authors: int = 25,
+        paragraphs: Tuple[int, int] = (3, 8),
+        branching: int = DEFAULT_BRANCHING,
+        post_types: Optional[Dict[str, Dict]] = None,
+        taxonomies: Optional[Dict[str, Dict]] = None,
+        site_url: str = SITE_URL,
+    ):
+        self.seed = seed
+        self.sizes = {"posts": posts, "terms": terms, "media": media, "authors": authors}
+        self.paragraphs = paragraphs
+        self.branching = max(branching, 1)
+        self.post_type_info = post_types or POST_TYPES
+        self.taxonomy_info = taxonomies or TAXONOMIES
+        self.site_url = site_url.rstrip("/")
+        # Posts of every type and media share one ID sequence, as in wp_posts
+        self._kinds = list(self.post_type_info) + ["attachment"]
+
+    def _rng(self, kind: str, index: int) -> random.Random:
+        return random.Random(f"{self.seed}:{kind}:{index}")
+
+    def _object_id(self, kind: str, index: int) -> int:
+        return (index - 1) * len(self._kinds) + self._kinds.index(kind) + 1
+
+    def _date(self, rng: random.Random, index: int, total: int) -> datetime:
+        # Later items are newer, with jitter, like a real publishing history
+        span = (DATE_END - DATE_START).total_seconds()
+        offset = span * (index - 0.5 + rng.uniform(-0.5, 0.5)) / max(total, 1)
+        return DATE_START + timedelta(seconds=int(min(max(offset, 0), span)))
+
+    # Schema
+
+    def post_types(self) -> Dict[str, Dict]:
+        """Post type definitions as returned by /wp/v2/types"""
+        return {
+            slug: {
+                "slug": slug,
+                "name": info["name"],
+                "rest_base": info["rest_base"],
+                "description": f"Synthetic {info['name'].lower()}",
+                "hierarchical": info["hierarchical"],
+                "taxonomies": info["taxonomies"],
+                "supports": {"title": True, "editor": True, "author": True, "thumbnail": True, "custom-fields": True},
+                "viewable": True,
+            }
+            for slug, info in self.post_type_info.items()
+        }
+
+    def taxonomies(self) -> Dict[str, Dict]:
+        """Taxonomy definitions as returned by /wp/v2/taxonomies"""
+        return {
+            slug: {
+                "slug": slug,
+                "name": info["name"],
+                "rest_base": info["rest_base"],
+                "description": f"Synthetic {info['name'].lower()}",
+                "hierarchical": info["hierarchical"],
+                "types": info["types"],
+            }
+            for slug, info in self.taxonomy_info.items()
+        }
+
+    def rest_bases(self) -> Dict[str, Tuple[str, str]]:
+        """rest_base -> (collection kind, slug) for every collection the site serves"""
+        bases = {info["rest_base"]: ("post", slug) for slug, info in self.post_type_info.items()}
+        bases.update({info["rest_base"]: ("term", slug) for slug, info in self.taxonomy_info.items()})
+        bases["media"] = ("media", "attachment")
+        bases["users"] = ("author", "user")
+        return bases
+
+    def collection_size(self, rest_base: str) -> Optional[int]:
+        kind = self.rest_bases().get(rest_base, (None,))[0]
+        return {"post": self.sizes["posts"], "term": self.sizes["terms"], "media": self.sizes["media"],
+                "author": self.sizes["authors"]}.get(kind)
+
+    # Items
+
+    def author(self, index: int) -> Dict:
+        rng = self._rng("author", index)
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        slug = f"{name.lower().replace(' ', '-')}-{index}"
+        return {
+            "id": index,
+            "name": name,
+            "url": "",
+            "description": _words(rng, rng.randint(8, 20)).capitalize() + ".",
+            "link": f"{self.site_url}/author/{slug}/",
+            "slug": slug,
+            "avatar_urls": {size: f"https://secure.gravatar.com/avatar/{index:032x}?s={size}" for size in ("24", "48", "96")},
+        }
+
+    def _author_id(self, rng: random.Random) -> int:
+        # A few prolific authors write most of the content
+        return min(int(rng.paretovariate(1.2)), self.sizes["authors"])
+
+    def term(self, taxonomy: str, index: int) -> Dict:
+        info = self.taxonomy_info[taxonomy]
+        rng = self._rng(taxonomy, index)
+        name = f"{_words(rng, rng.randint(1, 3)).title()} {index}"
+        parent = 0
+        if info["hierarchical"] and index > 1:
+            # Complete ``branching``-ary tree: term i's parent is (i - 2) // b + 1
+            parent = (index - 2) // self.branching + 1
+        return {
+            "id": index,
+            "count": int(rng.paretovariate(1.1)) - 1,
+            "description": _words(rng, rng.randint(0, 15)),
+            "link": f"{self.site_url}/{taxonomy}/{taxonomy}-{index}/",
+            "name": name,
+            "slug": f"{taxonomy}-{index}",
+            "taxonomy": taxonomy,
+            "parent": parent,
+            "meta": [],
+        }
+
+    def term_depth(self, index: int) -> int:
+        """Depth of term ``index`` in a hierarchical taxonomy (root terms are 0)"""
+        depth = 0
+        while index > 1:
+            index = (index - 2) // self.branching + 1
+            depth += 1
+        return depth
+
+    def media_item(self, index: int) -> Dict:
+        rng = self._rng("attachment", index)
+        media_id = self._object_id("attachment", index)
+        date = self._date(rng, index, self.sizes["media"])
+        mime_type = _weighted(rng, MIME_TYPES)
+        extension = mime_type.split("/")[1].replace("jpeg", "jpg")
+        slug = f"{_words(rng, 2).replace(' ', '-')}-{media_id}"
+        source_url = f"{self.site_url}/wp-content/uploads/{date:%Y/%m}/{slug}.{extension}"
+        details: Dict[str, Any] = {"filesize": int(rng.lognormvariate(12, 1.2))}
+        if mime_type.startswith("image/"):
+            width, height = rng.choice(IMAGE_SIZES)
+            details.update({
+                "width": width,
+                "height": height,
+                "file": f"{date:%Y/%m}/{slug}.{extension}",
+                "sizes": {
+                    "thumbnail": {"width": 150, "height": 150, "mime_type": mime_type,
+                                  "source_url": source_url.replace(f".{extension}", f"-150x150.{extension}")},
+                    "medium": {"width": 300, "height": int(300 * height / width), "mime_type": mime_type,
+                               "source_url": source_url.replace(f".{extension}", f"-300x{int(300 * height / width)}.{extension}")},
+                },
+            })
+        return {
+            "id": media_id,
+            "date": _iso(date),
+            "modified": _iso(date),
+            "slug": slug,
+            "status": "inherit",
+            "type": "attachment",
+            "link": f"{self.site_url}/{slug}/",
+            "title": {"rendered": _words(rng, rng.randint(1, 4)).capitalize()},
+            "author": self._author_id(rng),
+            "caption": {"rendered": f"<p>{_words(rng, rng.randint(0, 12))}</p>" if rng.random() < 0.4 else ""},
+            "alt_text": _words(rng, rng.randint(2, 6)) if rng.random() < 0.6 else "",
+            "media_type": "image" if mime_type.startswith("image/") else "file",
+            "mime_type": mime_type,
+            "media_details": details,
+            "post": self._object_id(rng.choice(list(self.post_type_info)), rng.randint(1, max(self.sizes["posts"], 1))) if rng.random() < 0.5 else None,
+            "source_url": source_url,
+        }
+
+    def _html(self, rng: random.Random) -> str:
+        blocks = []
+        for i in range(rng.randint(*self.paragraphs)):
+            roll = rng.random()
+            if i and roll < 0.15:
+                blocks.append(f"<h2>{_words(rng, rng.randint(2, 6)).capitalize()}</h2>")
+            elif roll < 0.25:
+                items = "".join(f"<li>{_words(rng, rng.randint(2, 8))}</li>" for _ in range(rng.randint(2, 6)))
+                blocks.append(f"<ul>{items}</ul>")
+            elif roll < 0.32 and self.sizes["media"]:
+                media_id = self._object_id("attachment", rng.randint(1, self.sizes["media"]))
+                blocks.append(f'<figure class="wp-block-image"><img src="{self.site_url}/?attachment_id={media_id}" '
+                              f'class="wp-image-{media_id}" alt="" /></figure>')
+            sentences = []
+            for _ in range(rng.randint(2, 6)):
+                sentence = _words(rng, rng.randint(6, 18)).capitalize()
+                if rng.random() < 0.1:
+                    sentence += f' <a href="{self.site_url}/{rng.choice(WORDS)}/">{_words(rng, 2)}</a>'
+                elif rng.random() < 0.1:
+                    sentence += f" <strong>{_words(rng, 2)}</strong>"
+                sentences.append(sentence + ".")
+            blocks.append(f"<p>{' '.join(sentences)}</p>")
+        return "\n".join(blocks)
+
+    def _custom_fields(self, post_type: str, rng: random.Random, date: datetime) -> Dict[str, Any]:
+        """ACF-style fields per post type"""
+        if post_type == "product":
+            price = round(rng.lognormvariate(3.5, 1), 2)
+            return {
+                "sku": f"SKU-{rng.randint(100000, 999999)}",
+                "price": price,
+                "sale_price": round(price * rng.uniform(0.6, 0.95), 2) if rng.random() < 0.3 else None,
+                "stock_quantity": rng.randint(0, 500),
+                "in_stock": rng.random() < 0.85,
+                "weight_kg": round(rng.uniform(0.05, 25), 2),
+            }
+        if post_type == "event":
+            start = date + timedelta(days=rng.randint(7, 120), hours=rng.randint(8, 20))
+            return {
+                "start_date": _iso(start),
+                "end_date": _iso(start + timedelta(hours=rng.randint(1, 48))),
+                "venue": rng.choice(VENUES),
+                "capacity": rng.choice([25, 50, 100, 250, 500, 1000]),
+                "registration_open": rng.random() < 0.7,
+            }
+        if post_type == "testimonial":
+            return {
+                "client_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "company": f"{rng.choice(WORDS).title()} {rng.choice(['Inc', 'Ltd', 'GmbH', 'LLC'])}",
+                "rating": rng.randint(3, 5),
+            }
+        return {
+            "subtitle": _words(rng, rng.randint(3, 8)).capitalize() if rng.random() < 0.5 else "",
+            "reading_time": rng.randint(1, 20),
+            "featured": rng.random() < 0.1,
+        }
+
+    def post(self, post_type: str, index: int) -> Dict:
+        info = self.post_type_info[post_type]
+        rng = self._rng(post_type, index)
+        post_id = self._object_id(post_type, index)
+        date = self._date(rng, index, self.sizes["posts"])
+        modified = date + timedelta(seconds=int(rng.expovariate(1 / 86400 / 30))) if rng.random() < 0.6 else date
+        title = _words(rng, rng.randint(3, 10)).capitalize()
+        slug = f"{title.lower().replace(' ', '-')[:60]}-{post_id}"
+        content = self._html(rng)
+        excerpt = content.split("</p>", 1)[0].split("<p>")[-1][:200]
+
+        post = {
+            "id": post_id,
+            "date": _iso(date),
+            "date_gmt": _iso(date),
+            "modified": _iso(modified),
+            "modified_gmt": _iso(modified),
+            "slug": slug,
+            "status": _weighted(rng, STATUS_WEIGHTS),
+            "type": post_type,
+            "link": f"{self.site_url}/{post_type}/{slug}/",
+            "title": {"rendered": title},
+            "content": {"rendered": content, "protected": False},
+            "excerpt": {"rendered": f"<p>{excerpt}</p>", "protected": False},
+            "author": self._author_id(rng),
+            "featured_media": self._object_id("attachment", rng.randint(1, self.sizes["media"])) if self.sizes["media"] and rng.random() < 0.7 else 0,
+            "comment_status": rng.choice(["open", "closed"]),
+            "menu_order": 0,
+            "meta": {"_views": int(rng.paretovariate(1.1) * 10), "_edit_lock": ""},
+            "acf": self._custom_fields(post_type, rng, date),
+        }
+        if info["hierarchical"]:
+            post["parent"] = self._object_id(post_type, rng.randint(1, index - 1)) if index > 1 and rng.random() < 0.4 else 0
+        for taxonomy in info["taxonomies"]:
+            rest_base = self.taxonomy_info[taxonomy]["rest_base"]
+            count = rng.randint(1, 3) if self.taxonomy_info[taxonomy]["hierarchical"] else rng.randint(0, 6)
+            post[rest_base] = sorted(set(rng.randint(1, self.sizes["terms"]) for _ in range(count))) if self.sizes["terms"] else []
+        return post
+
+    # Collections
+
+    def item(self, rest_base: str, index: int) -> Dict:
+        """The ``index``-th (1-based) item of a REST collection"""
+        kind, slug = self.rest_bases()[rest_base]
+        if kind == "post":
+            return self.post(slug, index)
+        if kind == "term":
+            return self.term(slug, index)
+        if kind == "media":
+            return self.media_item(index)
+        return self.author(index)
+
+    def iter_collection(self, rest_base: str, start: int = 1, stop: Optional[int] = None) -> Iterator[Dict]:
+        """Lazily yield items ``start``..``stop`` (inclusive, 1-based) of a collection"""
+        total = self.collection_size(rest_base) or 0
+        for index in range(start, min(stop or total, total) + 1):
+            yield self.item(rest_base, index)
+
+    def iter_posts(self, post_type: str, limit: Optional[int] = None) -> Iterator[Dict]:
+        return self.iter_collection(self.post_type_info[post_type]["rest_base"], 1, limit)
+
+    def iter_terms(self, taxonomy: str, limit: Optional[int] = None) -> Iterator[Dict]:
+        return self.iter_collection(self.taxonomy_info[taxonomy]["rest_base"], 1, limit)
+
+    def iter_media(self, limit: Optional[int] = None) -> Iterator[Dict]:
+        return self.iter_collection("media", 1, limit)
+
+    def page(self, rest_base: str, page: int = 1, per_page: int = 10) -> Tuple[List[Dict], int]:
+        """One page of a collection and the collection's total, newest posts first like WordPress"""
+        total = self.collection_size(rest_base) or 0
+        kind = self.rest_bases()[rest_base][0]
+        start = (page - 1) * per_page
+        if kind in ("post", "media"):
+            # WordPress orders posts by date desc by default
+            indexes = range(total - start, max(total - start - per_page, 0), -1)
+        else:
+            indexes = range(start + 1, min(start + per_page, total) + 1)
+        return [self.item(rest_base, index) for index in indexes], total
@@ -0,0 +1,50 @@
+import math
+import random
+
+import pytest
+
+from api_metrics import HISTOGRAM_MAX, HISTOGRAM_MIN, LatencyHistogram
+
+
+def test_empty_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) == 0.0
+    assert histogram.mean == 0.0
+
+
+@pytest.mark.parametrize("p", [1, 50, 90, 99, 99.9])
+def test_percentiles_within_precision(p):
+    rng = random.Random(7)
+    values = sorted(rng.lognormvariate(-3, 1) for _ in range(20_000))
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    exact = values[max(1, math.ceil(len(values) * p / 100)) - 1]
+    assert histogram.percentile(p) == pytest.approx(exact, rel=0.02)
+
+
+def test_summary_statistics():
+    histogram = LatencyHistogram()
+    for value in (0.1, 0.2, 0.3):
+        histogram.record(value)
+    assert histogram.total == 3
+    assert histogram.mean == pytest.approx(0.2)
+    assert histogram.min == 0.1 and histogram.max == 0.3
+    assert histogram.percentile(0) == pytest.approx(0.1, rel=0.01)
+    assert histogram.percentile(100) == pytest.approx(0.3, rel=0.01)
+
+
+def test_percentiles_are_clamped_to_observed_range():
+    histogram = LatencyHistogram()
+    histogram.record(0.5)
+    assert histogram.percentile(50) == 0.5
+
+
+def test_out_of_range_values_share_the_edge_buckets():
+    histogram = LatencyHistogram()
+    histogram.record(HISTOGRAM_MIN / 10)
+    histogram.record(HISTOGRAM_MAX * 10)
+    assert histogram.total == 2
+    assert len(histogram.counts) == 2
+    assert histogram.percentile(100) == pytest.approx(HISTOGRAM_MAX, rel=0.01)
+    assert histogram.max == HISTOGRAM_MAX * 10
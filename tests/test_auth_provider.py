@@ -0,0 +1,30 @@
+import base64
+import json
+
+import pytest
+
+from auth_provider import decode_jwt_expiry
+
+
+def jwt(payload) -> str:
+    def segment(data: bytes) -> str:
+        return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    return ".".join([segment(b'{"alg":"HS256","typ":"JWT"}'), segment(body), "signature"])
+
+
+@pytest.mark.parametrize("payload, expected", [
+    ({"exp": 1700000000}, 1700000000.0),
+    ({"exp": 1700000000.5, "sub": "1"}, 1700000000.5),
+    ({"sub": "1"}, None),
+    ({"exp": "tomorrow"}, None),
+    ([1, 2], None),
+    (b"not json", None),
+])
+def test_expiry_claim(payload, expected):
+    assert decode_jwt_expiry(jwt(payload)) == expected
+
+
+@pytest.mark.parametrize("token", ["", "opaque-oauth-token", "a.b", "a.b.c.d", "a.!!!.c"])
+def test_non_jwt_tokens(token):
+    assert decode_jwt_expiry(token) is None
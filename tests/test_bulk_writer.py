@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from bulk_writer import BulkError, Operation, diff, parse_operations
+
+
+def test_csv_defaults_and_json_cells():
+    data = (
+        "﻿id,action,title,meta\n"
+        "5,,New title,\n"
+        ",,Fresh,\"{\"\"k\"\": 1}\"\n"
+        "8,delete,,\n"
+    ).encode()
+    assert parse_operations(data, "csv") == [
+        Operation("update", 5, {"title": "New title"}),
+        Operation("create", None, {"title": "Fresh", "meta": {"k": 1}}),
+        Operation("delete", 8, {}),
+    ]
+
+
+def test_json_list_object_and_wrapper():
+    rows = [{"id": 1, "status": "draft"}, {"action": "CREATE", "title": "x"}]
+    expected = [Operation("update", 1, {"status": "draft"}), Operation("create", None, {"title": "x"})]
+    assert parse_operations(json.dumps(rows).encode(), "json") == expected
+    assert parse_operations(json.dumps({"operations": rows}).encode(), "json") == expected
+    assert parse_operations(json.dumps(rows[0]).encode(), "json") == expected[:1]
+
+
+@pytest.mark.parametrize("data, fmt", [
+    (b'[{"action": "publish", "id": 1}]', "json"),
+    (b'[{"action": "delete"}]', "json"),
+    (b'[{"id": "abc"}]', "json"),
+    (b"not json", "json"),
+    (b"id\n1\n", "xml"),
+])
+def test_invalid_operations(data, fmt):
+    with pytest.raises(BulkError):
+        parse_operations(data, fmt)
+
+
+def test_operation_routes():
+    assert Operation("create", None, {}).path("pages") == "/wp/v2/pages"
+    assert Operation("delete", 3, {}).path("pages") == "/wp/v2/pages/3"
+    assert Operation("delete", 3, {}).method == "DELETE"
+
+
+def test_diff():
+    cached = [
+        {"id": 1, "title": {"rendered": "Same"}, "status": "publish"},
+        {"id": 2, "title": {"rendered": "Old"}, "status": "publish"},
+    ]
+    operations = [
+        Operation("update", 1, {"title": "Same"}),
+        Operation("update", 2, {"title": "New", "status": "publish"}),
+        Operation("update", 3, {"title": "x"}),
+        Operation("delete", 2, {}),
+        Operation("create", None, {"title": "t", "content": "c"}),
+    ]
+    rows = diff(operations, cached)
+    assert [row["status"] for row in rows] == ["skip", "change", "missing", "delete", "new"]
+    assert rows[1]["changes"] == "title: 'Old' → 'New'"
+    assert rows[3]["changes"] == "Old"
+    assert rows[4]["changes"] == "content, title"
@@ -0,0 +1,64 @@
+from content_cache import ContentCache
+
+
+def event(kind, post_id=7, post_type="post", **data):
+    return {"event": kind, "post_type": post_type, "post_id": post_id, "data": data}
+
+
+def test_create_converts_wp_post_rows():
+    cache = ContentCache()
+    assert cache.apply_event(event("create", post_title="Hello", post_status="publish",
+                                   post_date="2024-01-02 03:04:05", post_author="3"))
+    post = cache.get_post("post", 7)
+    assert post["title"] == {"rendered": "Hello"}
+    assert post["date"] == "2024-01-02T03:04:05"
+    assert post["author"] == 3
+
+
+def test_update_replaces_the_cached_post():
+    cache = ContentCache()
+    cache.upsert("post", {"id": 7, "status": "publish", "title": {"rendered": "Old"}})
+    version = cache.version("post")
+    cache.apply_event(event("update", post_title="New", post_status="publish"))
+    assert cache.get_post("post", 7)["title"] == {"rendered": "New"}
+    assert cache.version("post") > version
+
+
+def test_rest_shaped_data_is_kept_as_is():
+    cache = ContentCache()
+    cache.apply_event(event("update", post_id="9", status="publish", title={"rendered": "T"}))
+    assert cache.get_post("post", 9) == {"id": 9, "status": "publish", "title": {"rendered": "T"}}
+
+
+def test_delete_removes_the_post_and_tolerates_unknown_ids():
+    cache = ContentCache()
+    cache.upsert("post", {"id": 7, "status": "publish"})
+    assert cache.apply_event(event("delete"))
+    assert cache.get_post("post", 7) is None
+    assert cache.apply_event(event("delete", post_id=99))
+
+
+def test_private_post_is_not_added_to_a_cache_that_never_saw_it():
+    cache = ContentCache()
+    cache.apply_event(event("create", post_title="Secret", post_status="private"))
+    assert cache.get_post("post", 7) is None
+
+
+def test_private_post_is_updated_where_already_visible():
+    cache = ContentCache()
+    cache.upsert("post", {"id": 7, "status": "draft", "title": {"rendered": "Draft"}})
+    cache.apply_event(event("update", post_title="Draft 2", post_status="draft"))
+    assert cache.get_post("post", 7)["title"] == {"rendered": "Draft 2"}
+
+
+def test_unpublished_post_is_removed():
+    cache = ContentCache()
+    cache.upsert("post", {"id": 7, "status": "publish"})
+    cache.apply_event(event("update", post_title="Gone", post_status="private"))
+    assert cache.get_post("post", 7) is None
+
+
+def test_malformed_events_are_rejected():
+    cache = ContentCache()
+    assert not cache.apply_event({"event": "update", "post_id": 1})
+    assert not cache.apply_event({"event": "update", "post_type": "post"})
@@ -0,0 +1,65 @@
+from data_grid import ListSource, RestSource
+
+
+def rest_site(total: int):
+    """A fetch_page that behaves like WordPress: pages past the last one are a 400"""
+    requested = []
+
+    def fetch_page(page, per_page, params):
+        requested.append(page)
+        pages = -(-total // per_page)
+        if page > max(pages, 1):
+            raise AssertionError(f"page {page} is past X-WP-TotalPages ({pages})")
+        start = (page - 1) * per_page
+        return [{"id": i} for i in range(start, min(start + per_page, total))], total
+
+    return fetch_page, requested
+
+
+def test_last_window_stops_at_the_last_page():
+    fetch_page, requested = rest_site(1050)
+    source = RestSource(fetch_page)
+    rows = source.rows(1000, 250)
+    assert [row["id"] for row in rows] == list(range(1000, 1050))
+    assert requested == [11]
+
+
+def test_window_ending_on_a_page_boundary():
+    fetch_page, requested = rest_site(200)
+    rows = RestSource(fetch_page).rows(150, 100)
+    assert [row["id"] for row in rows] == list(range(150, 200))
+    assert requested == [2]
+
+
+def test_window_spanning_pages():
+    fetch_page, requested = rest_site(1050)
+    rows = RestSource(fetch_page).rows(90, 30)
+    assert [row["id"] for row in rows] == list(range(90, 120))
+    assert requested == [1, 2]
+
+
+def test_pages_are_cached():
+    fetch_page, requested = rest_site(300)
+    source = RestSource(fetch_page)
+    source.rows(0, 50)
+    source.rows(50, 50)
+    assert requested == [1]
+    assert source.total() == 300
+
+
+def test_empty_collection():
+    fetch_page, _ = rest_site(0)
+    source = RestSource(fetch_page)
+    assert source.rows(0, 50) == []
+    assert source.sample() is None
+
+
+def test_list_source_filters_and_sorts():
+    source = ListSource([
+        {"id": 1, "status": "publish", "title": {"rendered": "b"}},
+        {"id": 2, "status": "draft", "title": {"rendered": "a"}},
+        {"id": 3, "status": "publish", "title": {"rendered": "a"}},
+    ])
+    source.configure(status="publish", sort="Title (A-Z)")
+    assert source.total() == 2
+    assert [row["id"] for row in source.rows(0, 10)] == [3, 1]
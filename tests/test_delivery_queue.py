@@ -0,0 +1,48 @@
+import threading
+import time
+
+from delivery_queue import DeliveryQueue
+
+
+def claim_within(queue: DeliveryQueue, seconds: float):
+    """The item queue._claim() returns within ``seconds``, or None"""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(queue._claim()))
+    thread.start()
+    thread.join(seconds)
+    queue._stopping.set()
+    with queue._wakeup:
+        queue._wakeup.notify_all()
+    thread.join(5)
+    return result[0] if result else None
+
+
+def test_live_lease_is_not_taken_over(tmp_path):
+    db = str(tmp_path / "outbox.db")
+    first = DeliveryQueue(db)
+    delivery_id = first.enqueue("http://127.0.0.1:9/hook", {"n": 1})
+    assert first._claim()["id"] == delivery_id
+
+    second = DeliveryQueue(db)  # another process opening the same outbox
+    assert second.get(delivery_id)["status"] == "in_flight"
+    assert claim_within(second, 0.3) is None
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    db = str(tmp_path / "outbox.db")
+    first = DeliveryQueue(db)
+    delivery_id = first.enqueue("http://127.0.0.1:9/hook", {"n": 1})
+    assert first._claim()["id"] == delivery_id
+
+    second = DeliveryQueue(db, lease_timeout=0.05)
+    time.sleep(0.1)
+    assert claim_within(second, 2)["id"] == delivery_id
+
+
+def test_failed_attempt_releases_the_lease(tmp_path):
+    queue = DeliveryQueue(str(tmp_path / "outbox.db"), retry_interval=0)
+    delivery_id = queue.enqueue("http://127.0.0.1:9/hook", {"n": 1})
+    item = queue._claim()
+    queue._fail(item, 1, 503, "HTTP 503", True, None)
+    assert queue.get(delivery_id)["status"] == "pending"
+    assert claim_within(queue, 2)["id"] == delivery_id
@@ -0,0 +1,64 @@
+import json
+import time
+
+import pytest
+
+from feed_loader import iter_json_array
+
+
+def chunked(data: bytes, size: int):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+DOCUMENTS = [
+    [],
+    [1, -2.5, 1e-7, True, False, None],
+    ["plain", "quote \" and ] and }", "back\\slash\\", "é ☃ 𝄞"],
+    [{"a": [1, {"b": "}]"}], "c": {}}, [[], [[]]], ""],
+]
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_every_chunk_size(document):
+    data = json.dumps(document, ensure_ascii=False).encode()
+    for size in range(1, len(data) + 1):
+        assert list(iter_json_array(chunked(data, size))) == document
+
+
+@pytest.mark.parametrize("document", [{"a": 1}, "text", 5, None])
+def test_non_array_is_yielded_whole(document):
+    data = json.dumps(document).encode()
+    assert list(iter_json_array(chunked(data, 2))) == [document]
+
+
+def test_whitespace_and_trailing_data():
+    data = b' \n[ 1 ,\n 2 ]\n'
+    assert list(iter_json_array(chunked(data, 3))) == [1, 2]
+
+
+def test_empty_input():
+    assert list(iter_json_array([])) == []
+
+
+@pytest.mark.parametrize("data", [b"[1, 2", b'[{"a": 1}', b'["open', b"[1, 2,"])
+def test_unterminated_array(data):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(chunked(data, 2)))
+
+
+def test_elements_arrive_before_the_array_ends():
+    def chunks():
+        yield b'[{"id": 1},'
+        yield b' {"id": 2}'
+        raise AssertionError("read past the second element")
+
+    items = iter_json_array(chunks())
+    assert next(items) == {"id": 1}
+
+
+def test_large_element_is_linear():
+    data = json.dumps([{"content": "x" * 20_000_000}, {"id": 2}]).encode()
+    start = time.perf_counter()
+    items = list(iter_json_array(chunked(data, 64 * 1024)))
+    assert time.perf_counter() - start < 2.5
+    assert len(items[0]["content"]) == 20_000_000 and items[1] == {"id": 2}
@@ -0,0 +1,23 @@
+import pytest
+
+from media_mirror import relative_path
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://example.com/wp-content/uploads/2024/01/photo.jpg", "2024/01/photo.jpg"),
+    ("https://example.com/blog/wp-content/uploads/2024/01/a%20b.png", "2024/01/a b.png"),
+    ("https://cdn.example.com/images/logo.svg?ver=2", "images/logo.svg"),
+    ("https://example.com/wp-content/uploads/2024/./01/photo.jpg", "2024/01/photo.jpg"),
+])
+def test_paths_below_uploads(url, expected):
+    assert relative_path(url) == expected
+
+
+@pytest.mark.parametrize("url", [
+    "https://example.com/wp-content/uploads/../../etc/passwd",
+    "https://example.com/wp-content/uploads/%2e%2e/secret",
+    "https://example.com/",
+    "https://example.com/wp-content/uploads/",
+])
+def test_unsafe_or_empty_paths(url):
+    assert relative_path(url) is None
@@ -0,0 +1,77 @@
+import time
+from email.utils import formatdate
+
+import pytest
+
+import rate_limit
+from rate_limit import AdaptiveConcurrency, parse_retry_after
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("120", 120.0),
+    (" 5 ", 5.0),
+    ("0", 0.0),
+    (None, None),
+    ("", None),
+    ("soon", None),
+    ("-3", None),
+])
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    delay = parse_retry_after(formatdate(time.time() + 30, usegmt=True))
+    assert 28 <= delay <= 30
+
+
+def test_parse_retry_after_past_date_is_zero():
+    assert parse_retry_after(formatdate(time.time() - 60, usegmt=True)) == 0.0
+
+
+def test_fast_successes_grow_the_limit_additively():
+    limiter = AdaptiveConcurrency(max_limit=8, initial=2)
+    for _ in range(2):
+        limiter.acquire()
+        limiter.release(0.01, overloaded=False)
+    assert limiter.limit == pytest.approx(2 + 1 / 2 + 1 / 2.5)
+
+
+def test_limit_is_capped_at_max():
+    limiter = AdaptiveConcurrency(max_limit=3, initial=2)
+    for _ in range(50):
+        limiter.acquire()
+        limiter.release(0.01, overloaded=False)
+    assert limiter.limit == 3
+
+
+def test_overload_halves_the_limit_once_per_round_trip():
+    limiter = AdaptiveConcurrency(max_limit=8, initial=8)
+    limiter.smoothed = limiter.baseline = 10.0  # a long round trip
+    for _ in range(3):
+        limiter.acquire()
+        limiter.release(None, overloaded=True)
+    assert limiter.limit == 8 * rate_limit.ERROR_BACKOFF
+
+
+def test_overload_never_drops_below_the_minimum():
+    limiter = AdaptiveConcurrency(max_limit=8, initial=1)
+    limiter.acquire()
+    limiter.release(None, overloaded=True)
+    assert limiter.limit == rate_limit.MIN_CONCURRENCY
+
+
+def test_latency_above_tolerance_backs_off():
+    limiter = AdaptiveConcurrency(max_limit=8, initial=4)
+    limiter.acquire()
+    limiter.release(0.01, overloaded=False)
+    limit = limiter.limit
+    limiter.acquire()
+    limiter.release(1.0, overloaded=False)  # smoothed latency jumps well past 2x the baseline
+    assert limiter.limit == pytest.approx(limit * rate_limit.LATENCY_BACKOFF)
+
+
+def test_site_limiter_pause_is_capped():
+    limiter = rate_limit.SiteLimiter("example.com", rate=0)
+    limiter.pause(3600)
+    assert limiter.paused_until - time.monotonic() <= rate_limit.MAX_RETRY_AFTER
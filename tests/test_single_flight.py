@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    def caller():
+        results.append(flights.do("key", fetch))
+
+    threads = [threading.Thread(target=caller) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while flights.in_flight() == 0:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert all(value == "value" for value, _ in results)
+    assert flights.in_flight() == 0
+
+
+def test_nothing_is_cached_after_the_call():
+    flights = SingleFlight()
+    assert flights.do("key", lambda: 1) == (1, False)
+    assert flights.do("key", lambda: 2) == (2, False)
+
+
+def test_waiters_receive_the_leaders_exception():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    def leader():
+        with pytest.raises(ValueError):
+            flights.do("key", fail)
+
+    def waiter():
+        try:
+            flights.do("key", lambda: "unused")
+        except ValueError as e:
+            errors.append(e)
+
+    leading = threading.Thread(target=leader)
+    leading.start()
+    started.wait(5)
+    waiting = threading.Thread(target=waiter)
+    waiting.start()
+    while True:
+        with flights._lock:
+            if flights._calls["key"].waiters:
+                break
+    release.set()
+    leading.join(5)
+    waiting.join(5)
+
+    assert [str(e) for e in errors] == ["boom"]
+    assert flights.in_flight() == 0
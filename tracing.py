@@ -0,0 +1,246 @@
+import contextvars
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Callable, Iterator
+
+# Constants
+MAX_SPANS = 20000
+SERVICE_NAME = "wordpress-integration-hub"
+TRACE_FILE = os.environ.get("WP_HUB_TRACE_FILE", "")  # e.g. traces.otlp.jsonl
+TRACING_ENABLED = os.environ.get("WP_HUB_TRACING", "1") != "0"
+
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("current_trace", default=None)
+
+
+class Span:
+    """A timed operation with attributes, nested under its parent span"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "_start_perf", "duration_ns", "attributes", "status", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.status = STATUS_UNSET
+        self.error: Optional[str] = None
+        # Wall clock for export, monotonic clock for the duration
+        self.start_ns = time.time_ns()
+        self._start_perf = time.perf_counter_ns()
+        self.end_ns = 0
+        self.duration_ns = 0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def finish(self) -> None:
+        self.duration_ns = time.perf_counter_ns() - self._start_perf
+        self.end_ns = self.start_ns + self.duration_ns
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "duration_ms": self.duration_ns / 1e6,
+            "status": "error" if self.status == STATUS_ERROR else "ok",
+            "error": self.error,
+            "attributes": dict(self.attributes),
+        }
+
+
+class Tracer:
+    """In-process span recorder with a bounded buffer of finished spans"""
+
+    def __init__(self, max_spans: int = MAX_SPANS, trace_file: str = TRACE_FILE):
+        self._lock = threading.Lock()
+        self._spans = deque(maxlen=max_spans)
+        self._listeners: List[Callable[[Span], None]] = []
+        self.trace_file = trace_file
+
+    def add_listener(self, listener: Callable[[Span], None]) -> None:
+        """Call ``listener(span)`` for every finished span"""
+        self._listeners.append(listener)
+
+    def record(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+        for listener in self._listeners:
+            listener(span)
+        if self.trace_file and span.parent_id is None:
+            self._append_trace_file(span)
+
+    def spans(self, trace_id: Optional[str] = None) -> List[Span]:
+        with self._lock:
+            spans = list(self._spans)
+        if trace_id:
+            spans = [span for span in spans if span.trace_id == trace_id]
+        return sorted(spans, key=lambda span: span.start_ns)
+
+    def spans_by_trace(self, trace_ids: List[str]) -> Dict[str, List[Span]]:
+        """Spans of each of ``trace_ids`` in start order, from one pass over the buffer"""
+        grouped: Dict[str, List[Span]] = {trace_id: [] for trace_id in trace_ids}
+        with self._lock:
+            spans = list(self._spans)
+        for span in spans:
+            if span.trace_id in grouped:
+                grouped[span.trace_id].append(span)
+        for trace_spans in grouped.values():
+            trace_spans.sort(key=lambda span: span.start_ns)
+        return grouped
+
+    def waterfall(self, trace_id: str, spans: Optional[List[Span]] = None) -> List[Dict]:
+        """Spans of a trace (or ``spans``, already in start order) with depth and offset from the trace start"""
+        if spans is None:
+            spans = self.spans(trace_id)
+        if not spans:
+            return []
+        origin = spans[0].start_ns
+        depth = {}
+        rows = []
+        for span in spans:
+            depth[span.span_id] = depth.get(span.parent_id, -1) + 1 if span.parent_id else 0
+            row = span.to_dict()
+            row["depth"] = depth[span.span_id]
+            row["offset_ms"] = (span.start_ns - origin) / 1e6
+            rows.append(row)
+        return rows
+
+    def export_otlp(self, trace_ids: Optional[List[str]] = None, spans: Optional[List[Span]] = None) -> Dict:
+        """Encode spans (default: all, or those of ``trace_ids``) as an OTLP/JSON ExportTraceServiceRequest"""
+        if spans is None:
+            spans = self.spans()
+            if trace_ids is not None:
+                wanted = set(trace_ids)
+                spans = [span for span in spans if span.trace_id in wanted]
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{
+                    "scope": {"name": "tracing"},
+                    "spans": [_otlp_span(span) for span in spans],
+                }],
+            }]
+        }
+
+    def export_otlp_file(self, path: str, trace_ids: Optional[List[str]] = None) -> str:
+        """Write spans as OTLP/JSON to ``path`` and return the path"""
+        with open(path, "w") as f:
+            json.dump(self.export_otlp(trace_ids), f)
+        return path
+
+    def _append_trace_file(self, root: Span) -> None:
+        # One OTLP request per finished top-level span and its children,
+        # one per line as accepted by the collector's file receiver
+        spans = [span for span in self.spans(root.trace_id) if span.start_ns >= root.start_ns]
+        try:
+            with open(self.trace_file, "a") as f:
+                f.write(json.dumps(self.export_otlp(spans=spans)) + "\n")
+        except OSError:
+            pass
+
+
+_tracer = Tracer()
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer"""
+    return _tracer
+
+
+def new_trace(name: str = "rerun") -> str:
+    """Start a new trace for this context; top-level spans until the next call belong to it"""
+    trace_id = secrets.token_hex(16)
+    _current_trace.set({"trace_id": trace_id, "name": name})
+    return trace_id
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Time a block as a span nested under the current span"""
+    if not TRACING_ENABLED:
+        yield None
+        return
+
+    parent = _current_span.get()
+    if parent is not None:
+        trace_id = parent.trace_id
+    else:
+        trace = _current_trace.get()
+        trace_id = trace["trace_id"] if trace else secrets.token_hex(16)
+
+    current = Span(name, trace_id, parent.span_id if parent else None, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+        current.status = STATUS_OK
+    except Exception as e:
+        # Control-flow exceptions (e.g. Streamlit's rerun) are not errors
+        current.status = STATUS_ERROR
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.finish()
+        _current_span.reset(token)
+        _tracer.record(current)
+
+
+def traced(name: Optional[str] = None, **attributes: Any) -> Callable:
+    """Decorator form of span(); the span is named after the function by default"""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict:
+    if isinstance(value, bool):
+        encoded = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
+
+
+def _otlp_span(span: Span) -> Dict:
+    encoded = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [_otlp_attribute(key, value) for key, value in span.attributes.items()],
+        "status": {"code": span.status},
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+    if span.error:
+        encoded["status"]["message"] = span.error
+    return encoded
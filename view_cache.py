@@ -0,0 +1,45 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from metrics import record_cache_lookup
+
+
+class ViewCache:
+    """Derived views (DataFrames, figures) memoised on the version of their inputs
+
+    Each named view keeps only its latest build; it is rebuilt when the
+    version passed in differs from the one it was built for.
+
+        fig = cache.get("distribution", versions["cpt_stats"], build_figure)
+    """
+
+    def __init__(self, metric_name: str = "view_cache"):
+        self.metric_name = metric_name
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[Hashable, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str, version: Hashable, build: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(name)
+        hit = entry is not None and entry[0] == version
+        record_cache_lookup(self.metric_name, hit)
+        if hit:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        value = build()
+        with self._lock:
+            self._entries[name] = (version, value)
+        return value
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
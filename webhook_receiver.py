@@ -0,0 +1,271 @@
+import asyncio
+import json
+import os
+import secrets
+import threading
+import urllib.parse
+from typing import Dict, Optional, Tuple
+
+from content_cache import ContentCache, get_content_cache, site_caches, site_key
+from signing import SIGNATURE_HEADER, verify_signature
+
+# Constants
+DEFAULT_HOST = os.environ.get("WP_HUB_WEBHOOK_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.environ.get("WP_HUB_WEBHOOK_PORT", "8765"))
+WEBHOOK_PATH = "/webhook"
+PUBLIC_URL = os.environ.get("WP_HUB_WEBHOOK_PUBLIC_URL", "")  # e.g. https://hub.example.com/webhook behind a proxy
+SECRETS_FILE = os.environ.get("WP_HUB_WEBHOOK_SECRETS", "webhook_secrets.json")  # per (site, post type); "" keeps them in memory
+SECRET_BYTES = 24
+MAX_BODY_SIZE = 10 * 1024 * 1024  # 10 MB
+KEEP_ALIVE_TIMEOUT = 30  # seconds
+
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+def public_url(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> str:
+    """Where WordPress should send events: WP_HUB_WEBHOOK_PUBLIC_URL if set, else the listening address"""
+    return PUBLIC_URL or f"http://{host}:{port}{WEBHOOK_PATH}"
+
+
+class _RequestError(Exception):
+    """A request that cannot be read; answered with ``status`` and the connection closed"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class WebhookReceiver:
+    """Embedded asyncio HTTP server that applies signed WordPress save_post events to a ContentCache
+
+    Runs its own event loop on a daemon thread so it can live beside the
+    Streamlit server. Connections are kept alive, so a busy WordPress site
+    (or a load test) does not pay a TCP handshake per event.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[ContentCache] = None,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        default_secret: Optional[str] = os.environ.get("WP_HUB_WEBHOOK_SECRET"),
+        secrets_file: str = SECRETS_FILE,
+    ):
+        self.cache = cache or get_content_cache()
+        self.host = host
+        self.port = port
+        self.default_secret = default_secret
+        self.secrets_file = secrets_file
+        self.secrets: Dict[Tuple[str, str], str] = {}  # (site key or "", post type) -> secret
+        self._secrets_lock = threading.Lock()
+        self._load_secrets()
+        self.stats = {"received": 0, "applied": 0, "rejected": 0, "errors": 0}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    def register_secret(self, post_type: str, secret: str, site: Optional[str] = None) -> None:
+        """Accept events for a post type of ``site`` (or of events naming no site) signed with this secret"""
+        with self._secrets_lock:
+            self.secrets[(site_key(site) if site else "", post_type)] = secret
+            self._save_secrets()
+
+    def secret_for(self, post_type: str, site: Optional[str] = None, rotate: bool = False) -> str:
+        """The stored secret for a post type of ``site``, created on first use
+
+        Snippets already deployed keep working because the secret is reused
+        (and survives restarts in ``secrets_file``); ``rotate`` replaces it,
+        after which every deployed snippet must be updated.
+        """
+        key = (site_key(site) if site else "", post_type)
+        with self._secrets_lock:
+            if rotate or key not in self.secrets:
+                self.secrets[key] = secrets.token_hex(SECRET_BYTES)
+                self._save_secrets()
+            return self.secrets[key]
+
+    def _load_secrets(self) -> None:
+        if not self.secrets_file or not os.path.exists(self.secrets_file):
+            return
+        with open(self.secrets_file, encoding="utf-8") as f:
+            for entry in json.load(f):
+                self.secrets[(entry["site"], entry["post_type"])] = entry["secret"]
+
+    def _save_secrets(self) -> None:
+        if not self.secrets_file:
+            return
+        data = [{"site": site, "post_type": post_type, "secret": secret}
+                for (site, post_type), secret in self.secrets.items()]
+        tmp = f"{self.secrets_file}.part"
+        # Owner-only, like any other credential file
+        with open(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.secrets_file)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}{WEBHOOK_PATH}"
+
+    @property
+    def public_url(self) -> str:
+        return public_url(self.host, self.port)
+
+    # Lifecycle
+    def start(self) -> "WebhookReceiver":
+        """Start serving on a background thread (idempotent)"""
+        if self._thread:
+            return self
+        self._thread = threading.Thread(target=self._run, name="webhook-receiver", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def stop(self) -> None:
+        """Close the listener and any open keep-alive connections"""
+        if self._loop and self._server:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join(5)
+        self._thread = None
+
+    async def _shutdown(self) -> None:
+        self._server.close()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle_connection, self.host, self.port, backlog=1024)
+        )
+        # Pick up the real port when bound to port 0
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    # HTTP handling
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await asyncio.wait_for(_read_request(reader), KEEP_ALIVE_TIMEOUT)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = self.handle(method, path, headers, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+            pass
+        except _RequestError as e:
+            writer.write(_response(e.status, {"error": str(e)}, False))
+        finally:
+            writer.close()
+
+    def handle(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict]:
+        """Verify and apply a single request; returns (status, JSON response body)
+
+        Events are applied to every credential scope's content cache of the
+        site named by their "site" field (see ContentCache.apply_event for
+        what each scope keeps), else to ``self.cache``. The site is part of the signed
+        body and selects the secret together with the post type; a ``?site=``
+        query parameter is only accepted when it names the same site.
+        """
+        path, _, query = path.partition("?")
+        if path == "/healthz":
+            return 200, {"status": "ok", **self.stats}
+        if path != WEBHOOK_PATH:
+            return 404, {"error": "not found"}
+        if method != "POST":
+            return 405, {"error": "method not allowed"}
+
+        self.stats["received"] += 1
+        try:
+            text = body.decode("utf-8")
+            event = json.loads(text)
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            self.stats["errors"] += 1
+            return 400, {"error": "invalid JSON"}
+        if not isinstance(event, dict):
+            self.stats["errors"] += 1
+            return 400, {"error": "event must be a JSON object"}
+
+        site = event.get("site")
+        post_type = event.get("post_type")
+        if (site is not None and not isinstance(site, str)) or not isinstance(post_type, str):
+            self.stats["errors"] += 1
+            return 400, {"error": "invalid site or post_type"}
+        secret = self.secrets.get((site_key(site) if site else "", post_type), self.default_secret)
+        if not secret or not verify_signature(text, secret, headers.get(SIGNATURE_HEADER.lower(), "")):
+            self.stats["rejected"] += 1
+            return 401, {"error": "invalid signature"}
+
+        query_site = urllib.parse.parse_qs(query).get("site", [None])[0]
+        if query_site and (not site or site_key(query_site) != site_key(site)):
+            self.stats["rejected"] += 1
+            return 400, {"error": "site does not match the signed event"}
+
+        caches = (site_caches(site) or [get_content_cache(site)]) if site else [self.cache]
+        try:
+            applied = all([cache.apply_event(event) for cache in caches])
+        except (ValueError, TypeError, AttributeError):  # e.g. a non-numeric post_id or a non-object data
+            applied = False
+        if not applied:
+            self.stats["errors"] += 1
+            return 400, {"error": "unsupported event"}
+
+        self.stats["applied"] += 1
+        return 202, {"status": "applied"}
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    """Read one HTTP/1.1 request, or None on a cleanly closed connection"""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    parts = request_line.decode("latin-1").split()
+    if len(parts) < 2:
+        return None
+    method, path = parts[0].upper(), parts[1]
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise _RequestError(400, "invalid Content-Length") from None
+    if length < 0:
+        raise _RequestError(400, "invalid Content-Length")
+    if length > MAX_BODY_SIZE:
+        raise _RequestError(413, "request too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+
+def _response(status: int, payload: Dict, keep_alive: bool) -> bytes:
+    body = json.dumps(payload).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
@@ -0,0 +1,286 @@
+import hashlib
+import json
+import socket
+import threading
+import time
+from time import perf_counter_ns
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import rate_limit
+import resilience
+from single_flight import SingleFlight
+from api_metrics import normalize_endpoint
+from metrics import HTTP_COALESCED, HTTP_DURATION, HTTP_REQUESTS, HTTP_RESPONSE_BYTES
+
+# Constants
+POOL_SIZE = 32
+MAX_RETRIES = 2
+RETRY_STATUSES = (429, 503)
+RETRY_BACKOFF = 1.0  # seconds, doubled per attempt, when no Retry-After is given
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+TIMING_FIELDS = ["dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "download_ms", "decode_ms", "total_ms"]
+
+_local = threading.local()
+_flights = SingleFlight()  # process-wide, so identical GETs from different sessions share one request
+_unauthorized_hooks: List[Callable[[str, Dict[str, str]], None]] = []
+
+
+def add_unauthorized_hook(hook: Callable[[str, Dict[str, str]], None]) -> None:
+    """Call ``hook(url, headers)`` whenever a request carrying an Authorization header is answered 401"""
+    _unauthorized_hooks.append(hook)
+
+
+def _phases() -> Dict[str, int]:
+    """Connection-phase durations (ns) recorded on this thread for the current request"""
+    phases = getattr(_local, "phases", None)
+    if phases is None:
+        phases = _local.phases = {}
+    return phases
+
+
+class _TimedConnectionMixin:
+    """Records DNS, TCP connect and TLS handshake durations of new connections"""
+
+    def _new_conn(self):
+        phases = _phases()
+        start = perf_counter_ns()
+        try:
+            addresses = [info[4][0] for info in socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)]
+        except socket.gaierror:
+            addresses = []  # Let urllib3 raise its own resolution error below
+        resolved = perf_counter_ns()
+        phases["dns"] = phases.get("dns", 0) + resolved - start
+
+        # Connect to the address we just resolved instead of resolving twice
+        dns_host = self._dns_host
+        try:
+            for address in addresses[:-1]:
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except OSError:
+                    continue
+            if addresses:
+                self._dns_host = addresses[-1]
+            return super()._new_conn()
+        finally:
+            self._dns_host = dns_host
+            phases["connect"] = phases.get("connect", 0) + perf_counter_ns() - resolved
+
+    def connect(self):
+        start = perf_counter_ns()
+        super().connect()
+        phases = _phases()
+        phases["handshake"] = phases.get("handshake", 0) + perf_counter_ns() - start
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled connections report per-phase timings"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+def create_session(pool_size: int = POOL_SIZE) -> requests.Session:
+    """Create a keep-alive session that records phase timings"""
+    session = requests.Session()
+    adapter = TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_default_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session"""
+    global _default_session
+    if _default_session is None:
+        with _session_lock:
+            if _default_session is None:
+                _default_session = create_session()
+    return _default_session
+
+
+def _send(
+    method: str,
+    url: str,
+    headers: Optional[Dict[str, str]],
+    timeout: float,
+    session: requests.Session,
+    decode_json: bool,
+    **kwargs: Any,
+) -> requests.Response:
+    phases = _local.phases = {}
+
+    endpoint = normalize_endpoint(url)
+    start = perf_counter_ns()
+    try:
+        response = session.request(method, url, headers=headers, timeout=timeout, stream=True, **kwargs)
+    except requests.RequestException:
+        HTTP_REQUESTS.inc(method=method, endpoint=endpoint, status="error")
+        raise
+    headers_received = perf_counter_ns()
+    content = response.content
+    downloaded = perf_counter_ns()
+
+    data = None
+    if decode_json and content:
+        try:
+            data = json.loads(content)
+        except ValueError:
+            data = None
+    decoded = perf_counter_ns()
+
+    dns = phases.get("dns", 0)
+    connect = phases.get("connect", 0)
+    # The handshake covers DNS + connect + TLS (and any proxy tunnel)
+    tls = max(phases.get("handshake", 0) - dns - connect, 0)
+    ttfb = max(headers_received - start - dns - connect - tls, 0)
+
+    response.data = data
+    response.timings = {
+        "dns_ms": dns / 1e6,
+        "connect_ms": connect / 1e6,
+        "tls_ms": tls / 1e6,
+        "ttfb_ms": ttfb / 1e6,
+        "download_ms": (downloaded - headers_received) / 1e6,
+        "decode_ms": (decoded - downloaded) / 1e6,
+        "total_ms": (decoded - start) / 1e6,
+        "response_size": len(content or b""),
+        "reused_connection": "handshake" not in phases,
+    }
+
+    HTTP_REQUESTS.inc(method=method, endpoint=endpoint, status=str(response.status_code))
+    HTTP_DURATION.observe((decoded - start) / 1e9, method=method, endpoint=endpoint)
+    HTTP_RESPONSE_BYTES.inc(len(content or b""), endpoint=endpoint)
+    return response
+
+
+def request(
+    method: str,
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 15,
+    session: Optional[requests.Session] = None,
+    decode_json: bool = True,
+    rate_limited: bool = True,
+    circuit_breaker: bool = True,
+    **kwargs: Any,
+) -> requests.Response:
+    """Send a request and attach monotonic phase timings to the response
+
+    The returned response carries ``timings`` (a dict of TIMING_FIELDS in
+    milliseconds plus ``response_size``, ``reused_connection`` and
+    ``throttled_ms``, the time spent waiting on the site's limiter) and
+    ``data``, the decoded JSON body (None if not JSON or decode_json=False).
+    Only the network exchange is timed, not URL or header construction.
+
+    Unless ``rate_limited`` is False, requests pass through the site's
+    rate_limit.SiteLimiter, and idempotent requests answered 429/503 are
+    retried up to MAX_RETRIES times after their Retry-After delay.
+
+    Unless ``circuit_breaker`` is False, an endpoint that keeps failing
+    (network errors or 5xx) raises resilience.CircuitOpenError without
+    being contacted until its breaker lets a probe through.
+    """
+    session = session or get_session()
+    limiter = rate_limit.get_limiter(url) if rate_limited else None
+    breaker = resilience.get_breaker(url) if circuit_breaker else None
+    if breaker is not None:
+        breaker.before()
+    throttled = 0.0
+    attempt = 0
+    while True:
+        if limiter is not None:
+            throttled += limiter.acquire()
+        try:
+            response = _send(method, url, headers, timeout, session, decode_json, **kwargs)
+        except requests.RequestException:
+            if limiter is not None:
+                limiter.release(None, None)
+            if breaker is not None:
+                breaker.record(False)
+            raise
+        if response.status_code < 500:
+            resilience.get_latency(url).observe(response.timings["total_ms"] / 1000)
+        if response.status_code == 401 and headers and "Authorization" in headers:
+            for hook in _unauthorized_hooks:
+                hook(url, headers)
+        retry_after = rate_limit.parse_retry_after(response.headers.get("Retry-After"))
+        if limiter is not None:
+            limiter.release(response.timings["total_ms"] / 1000, response.status_code, retry_after)
+        retry = (response.status_code in RETRY_STATUSES and method.upper() in IDEMPOTENT_METHODS
+                 and attempt < MAX_RETRIES and (retry_after or 0) <= rate_limit.MAX_RETRY_AFTER)
+        if not retry:
+            if breaker is not None:
+                breaker.record(response.status_code < 500)
+            response.timings["throttled_ms"] = throttled * 1000
+            return response
+        delay = retry_after if retry_after is not None else RETRY_BACKOFF * 2 ** attempt
+        if limiter is not None:
+            limiter.pause(delay)  # Every request to this site waits, not just this retry
+        else:
+            time.sleep(delay)
+        attempt += 1
+
+
+def _flight_key(url: str, headers: Optional[Dict[str, str]], kwargs: Dict[str, Any]) -> Tuple:
+    """(URL with its query, digest of the headers as the auth scope, other request options)"""
+    scope = hashlib.sha256(repr(sorted((headers or {}).items())).encode()).hexdigest()
+    return url, scope, repr(sorted(kwargs.items()))
+
+
+def get(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 15, hedge: bool = True,
+        coalesce: bool = True, **kwargs: Any) -> requests.Response:
+    """GET shorthand for request(), hedged after the endpoint's p95 latency unless ``hedge`` is False
+
+    Unless ``coalesce`` is False, concurrent GETs of the same URL with the same
+    headers (from any session or thread) share one request: callers that
+    arrive while it is in flight get a copy of its response whose ``data`` is
+    the same decoded object, so it must be treated as read-only.
+    ``timings["coalesced"]`` tells them apart.
+    """
+    def call() -> requests.Response:
+        return request("GET", url, headers=headers, timeout=timeout, **kwargs)
+
+    def hedged_call() -> requests.Response:
+        return resilience.hedged(call, url) if hedge else call()
+
+    if not coalesce:
+        return hedged_call()
+    response, shared = _flights.do(_flight_key(url, headers, kwargs), hedged_call)
+    if not shared:
+        response.timings["coalesced"] = False
+        return response
+    HTTP_COALESCED.inc(endpoint=normalize_endpoint(url))
+    follower = requests.Response()
+    follower.__dict__.update(response.__dict__)  # Same body and data; own timings
+    follower.timings = dict(response.timings, coalesced=True)
+    return follower